@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""ASGI server for the Simple Note App (uvicorn)
+
+The Flask app runs unchanged on a bounded pool of ASGI_THREADS threads,
+which should match the database pool size: a thread more would only wait
+for a connection. Requests beyond that wait on the event loop, where each
+costs a coroutine instead of a thread. While MariaDB is slow, one process
+can hold ASGI_MAX_QUEUE such requests. Past that, or after
+ASGI_QUEUE_TIMEOUT seconds in the queue, it answers 503 with Retry-After
+so that clients and load balancers back off.
+
+Request bodies are read from the client as the app reads wsgi.input, so
+an upload is never buffered whole. Streamed responses (exports, NDJSON
+listings) give back their slot once the headers are ready. Their chunks
+are then pulled on a separate pool of ASGI_STREAM_THREADS, so a
+long-lived stream never holds a slot that a database request needs.
+Each open stream holds one of those threads: beyond ASGI_STREAM_THREADS
+streams, new ones are answered 503. The app runs in each request's own
+context (contextvars) on whichever thread serves it.
+
+GET /api/events is served on the event loop instead (event_stream): the
+stream awaits the process's ChangeBroadcaster, whose single poller thread
+does the database work, so an idle client costs a coroutine and no
+thread. EVENTS_MAX_STREAMS (default 1000) caps them per process.
+
+Adapters such as a2wsgi and asgiref's WsgiToAsgi hold a thread for the
+whole response and have no queue limit, which is why this one exists.
+
+    python3 asgi.py                # or: uvicorn asgi:application
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Try to load environment variables from .env file
+try:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+except ImportError:
+    pass
+
+ASGI_HOST = os.getenv("FLASK_HOST", "0.0.0.0")
+ASGI_PORT = int(os.getenv("FLASK_PORT", 5000))
+ASGI_THREADS = int(os.getenv("ASGI_THREADS", os.getenv("DB_POOL_SIZE", 5)))
+ASGI_MAX_QUEUE = int(os.getenv("ASGI_MAX_QUEUE", 1000))
+ASGI_QUEUE_TIMEOUT = float(os.getenv("ASGI_QUEUE_TIMEOUT", 10))
+ASGI_STREAM_THREADS = int(os.getenv("ASGI_STREAM_THREADS", 64))
+
+
+class ClientDisconnected(OSError):
+    """Raised by RequestBody when the client leaves mid-upload"""
+
+
+class RequestBody:
+    """wsgi.input that receives the ASGI body as the app reads it
+
+    Used from a worker thread; each receive() runs on the event loop.
+    """
+
+    def __init__(self, receive, loop):
+        self.receive = receive
+        self.loop = loop
+        self.buffer = bytearray()
+        self.more = True
+
+    def _fill(self):
+        message = asyncio.run_coroutine_threadsafe(self.receive(), self.loop).result()
+        if message["type"] == "http.disconnect":
+            self.more = False
+            raise ClientDisconnected("client disconnected during the request body")
+        self.buffer += message.get("body", b"")
+        self.more = message.get("more_body", False)
+
+    def read(self, size=-1):
+        while self.more and (size is None or size < 0 or len(self.buffer) < size):
+            self._fill()
+        if size is None or size < 0:
+            size = len(self.buffer)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def readline(self, size=-1):
+        while self.more and b"\n" not in self.buffer:
+            if 0 <= size <= len(self.buffer):
+                break
+            self._fill()
+        end = self.buffer.find(b"\n") + 1 or len(self.buffer)
+        if size is not None and 0 <= size < end:
+            end = size
+        data = bytes(self.buffer[:end])
+        del self.buffer[:end]
+        return data
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI http scope"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        # The body ends where the ASGI messages end, with or without a length
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_TYPE" or name == "CONTENT_LENGTH":
+            key = name
+        else:
+            key = f"HTTP_{name}"
+        if key in environ:
+            # Cookie fields may only be joined with "; " (RFC 6265)
+            separator = "; " if key == "HTTP_COOKIE" else ","
+            value = f"{environ[key]}{separator}{value}"
+        environ[key] = value
+    return environ
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot get a worker slot in time"""
+
+
+class WsgiToAsgi:
+    """Runs a WSGI app under ASGI with a bounded executor and backpressure"""
+
+    def __init__(
+        self,
+        app,
+        threads=ASGI_THREADS,
+        max_queue=ASGI_MAX_QUEUE,
+        queue_timeout=ASGI_QUEUE_TIMEOUT,
+        stream_threads=ASGI_STREAM_THREADS,
+        async_routes=None,
+    ):
+        self.app = app
+        # {path: ASGI handler} for GET routes served on the event loop
+        self.async_routes = async_routes or {}
+        self.threads = max(1, threads)
+        self.stream_threads = max(1, stream_threads)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.executor = ThreadPoolExecutor(self.threads, thread_name_prefix="asgi")
+        self.stream_executor = ThreadPoolExecutor(
+            self.stream_threads, thread_name_prefix="asgi-stream"
+        )
+        self._slots = None  # created on the server's event loop
+
+        self._queued = 0
+        self._running = 0
+        self._streams = 0
+        self._rejected = 0
+        self._timeouts = 0
+
+    def stats(self):
+        return {
+            "threads": self.threads,
+            "running": self._running,
+            "queued": self._queued,
+            "streams": self._streams,
+            "stream_threads": self.stream_threads,
+            "rejected": self._rejected,
+            "queue_timeouts": self._timeouts,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError(f"unsupported ASGI scope type: {scope['type']}")
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Probes the databases: keep it off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, init_worker
+                )
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.stream_executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def acquire_slot(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.threads)
+        if not self._slots.locked():
+            # A free slot: acquire() returns without suspending
+            await self._slots.acquire()
+            return
+        if self._queued >= self.max_queue:
+            self._rejected += 1
+            raise Overloaded("request queue is full")
+        self._queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            raise Overloaded("timed out waiting for a worker thread")
+        finally:
+            self._queued -= 1
+
+    def start_app(self, environ):
+        """Call the app; returns (status, headers, chunks, body, streaming)
+
+        Runs in a worker thread. A response with a Content-Length is read
+        here in full. Any other response is left for stream() to iterate.
+        """
+        started = []
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+            return written.append
+
+        body = self.app(environ, start_response)
+        iterator = iter(body)
+        chunks = written
+        if not started:
+            # start_response may be called as late as the first iteration
+            chunks.append(next(iterator, b""))
+        status, headers = started
+        streaming = not any(name.lower() == "content-length" for name, _ in headers)
+        if not streaming:
+            try:
+                chunks.extend(iterator)
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+        return status, headers, chunks, (body, iterator), streaming
+
+    async def http(self, scope, receive, send):
+        handler = self.async_routes.get(scope["path"])
+        if handler is not None and scope["method"] == "GET":
+            await handler(scope, receive, send)
+            return
+        try:
+            await self.acquire_slot()
+        except Overloaded as err:
+            await self.send_overloaded(send, str(err))
+            return
+
+        loop = asyncio.get_running_loop()
+        # The request's context (its trace) follows it to every thread that
+        # runs its code: start_app, then the stream threads
+        context = contextvars.copy_context()
+        self._running += 1
+        try:
+            environ = wsgi_environ(scope, RequestBody(receive, loop))
+            status, headers, chunks, response, streaming = await loop.run_in_executor(
+                self.executor, context.run, self.start_app, environ
+            )
+        except Exception as err:
+            print(f"❌ ASGI request failed: {err}")
+            await self.send_error(send)
+            return
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+        if streaming and self._streams >= self.stream_threads:
+            # Every stream thread may be taken: refuse before the headers
+            self._rejected += 1
+            await loop.run_in_executor(
+                self.executor, context.run, self.close_body, response
+            )
+            await self.send_overloaded(send, "too many open streams")
+            return
+
+        if streaming:
+            self._streams += 1
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": int(status.split(" ", 1)[0]),
+                    "headers": [
+                        (name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in headers
+                    ],
+                }
+            )
+            for chunk in chunks:
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            if streaming:
+                await self.stream(response, receive, send, context)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if streaming:
+                self._streams -= 1
+                # Releases the stream's DB connection or event subscription
+                await loop.run_in_executor(
+                    self.stream_executor, context.run, self.close_body, response
+                )
+
+    async def stream(self, response, receive, send, context):
+        """Send a streamed body chunk by chunk until it ends or the client leaves"""
+        _, iterator = response
+        loop = asyncio.get_running_loop()
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            while not disconnected.done():
+                chunk = await loop.run_in_executor(
+                    self.stream_executor, context.run, next, iterator, None
+                )
+                if chunk is None:
+                    break
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+        finally:
+            disconnected.cancel()
+
+    @staticmethod
+    def close_body(response):
+        body, _ = response
+        if hasattr(body, "close"):
+            body.close()
+
+    @staticmethod
+    async def wait_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    @staticmethod
+    async def send_overloaded(send, reason):
+        body = f'{{"error": "Server busy, retry later ({reason})"}}'.encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", b"1"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def send_error(send):
+        body = b'{"error": "Internal server error"}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+from frontend import (  # noqa: E402
+    EVENTS_HEARTBEAT,
+    EVENTS_MAX_STREAMS,
+    app,
+    init_worker,
+    note_events,
+)
+from note_events import sse_stream_async  # noqa: E402
+
+
+async def event_stream(scope, receive, send):
+    """GET /api/events without a thread per client
+
+    Sends what frontend.note_event_stream would, from the same broadcaster,
+    but waits for events on the event loop. Flask's hooks (metrics,
+    tracing) do not run for these requests.
+    """
+    if note_events.stats()["subscribers"] >= EVENTS_MAX_STREAMS:
+        body = b'{"error": "Too many event streams"}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+        return
+
+    subscription = note_events.subscribe()
+    disconnected = asyncio.ensure_future(WsgiToAsgi.wait_disconnect(receive))
+    chunks = sse_stream_async(subscription, EVENTS_HEARTBEAT, app.json.dumps)
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                    # Ask reverse proxies not to buffer the stream
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        while True:
+            # An idle client may leave at any time: wait for either
+            next_chunk = asyncio.ensure_future(chunks.__anext__())
+            await asyncio.wait(
+                (next_chunk, disconnected), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not next_chunk.done():
+                next_chunk.cancel()
+                await asyncio.wait((next_chunk,))
+                return
+            try:
+                text = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": text.encode(),
+                    "more_body": True,
+                }
+            )
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        disconnected.cancel()
+        await chunks.aclose()
+        note_events.unsubscribe(subscription)
+
+
+application = WsgiToAsgi(app, async_routes={"/api/events": event_stream})
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    print(
+        f"🚀 Starting uvicorn on http://{ASGI_HOST}:{ASGI_PORT} "
+        f"({ASGI_THREADS} threads, queue {ASGI_MAX_QUEUE})"
+    )
+    uvicorn.run(application, host=ASGI_HOST, port=ASGI_PORT, log_level="info")
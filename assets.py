@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Static assets built once at startup
+
+Every asset is held in memory as bytes together with gzip (and, when the
+brotli package is installed, brotli) variants and a strong ETag, so
+serving one is a dict lookup. Files from the static directory get a
+content hash in their name (app.3f2a9c1b4d5e.css) and can be cached by
+browsers for a year: a deploy that changes them changes their URL.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+# Try to import brotli for the br variants
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+
+def compress(body, encoding):
+    if encoding == "gzip":
+        # mtime=0 keeps the bytes, and so the ETag, identical across restarts
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    raise ValueError(f"unknown encoding: {encoding}")
+
+
+class Asset:
+    """One asset's bytes, precompressed variants and validators"""
+
+    def __init__(self, body, mimetype, cache_control):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        digest = hashlib.sha256(body).hexdigest()
+        self.fingerprint = digest[:12]
+        self.variants = {None: (body, digest[:32])}
+        for encoding in ENCODINGS:
+            if encoding == "br" and not BROTLI_AVAILABLE:
+                continue
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                # A different representation needs its own strong ETag
+                self.variants[encoding] = (compressed, f"{digest[:32]}-{encoding}")
+
+    @property
+    def etags(self):
+        return [etag for _, etag in self.variants.values()]
+
+    def select(self, accept_encodings):
+        """(encoding or None, body, etag) for a werkzeug Accept-Encoding header"""
+        for encoding in ENCODINGS:
+            if encoding in self.variants and accept_encodings.quality(encoding) > 0:
+                return (encoding,) + self.variants[encoding]
+        return (None,) + self.variants[None]
+
+
+class AssetBundle:
+    """Fingerprinted copies of the files in ``static_dir``, served by name"""
+
+    def __init__(self, static_dir, url_prefix="/static/"):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self.files = {}  # fingerprinted name -> Asset
+        self.urls = {}  # source name -> URL
+
+    def add_file(self, name):
+        """Load static_dir/name and return its fingerprinted URL"""
+        with open(os.path.join(self.static_dir, name), "rb") as f:
+            body = f.read()
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if mimetype.startswith("text/") or mimetype.endswith("javascript"):
+            mimetype += "; charset=utf-8"
+        asset = Asset(body, mimetype, IMMUTABLE)
+        stem, ext = os.path.splitext(name)
+        fingerprinted = f"{stem}.{asset.fingerprint}{ext}"
+        self.files[fingerprinted] = asset
+        self.urls[name] = self.url_prefix + fingerprinted
+        return self.urls[name]
+
+    def stats(self):
+        return {
+            name: {
+                encoding or "identity": len(body)
+                for encoding, (body, _) in asset.variants.items()
+            }
+            for name, asset in self.files.items()
+        }
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""Online backups and restores for the notes database
+
+SQLite is copied while the app keeps serving, with the online backup API
+(as one read transaction under WAL, which never blocks writers, or
+BACKUP_PAGES_PER_STEP pages at a time with pauses for writers in between
+in rollback-journal mode) or with VACUUM INTO. MariaDB is streamed through
+mysqldump --single-transaction, a consistent snapshot that takes no locks
+on InnoDB tables. Backups are compressed, written under a temporary name
+and renamed into place, so a half-written file never looks like a backup.
+Old backups are pruned after every run.
+
+Usage (uses the same .env / DB_* settings as frontend.py):
+    python3 backup.py backup [sqlite|mysql]
+    python3 backup.py list
+    python3 backup.py prune
+    python3 backup.py restore <backup file>
+"""
+
+import gzip
+import lzma
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Try to load environment variables from .env file
+try:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+except ImportError:
+    pass
+
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_COMPRESSION = os.getenv("BACKUP_COMPRESSION", "gzip")  # gzip, xz, none
+BACKUP_COMPRESSION_LEVEL = int(os.getenv("BACKUP_COMPRESSION_LEVEL", 6))
+# Retention: keep the newest BACKUP_KEEP backups per backend and drop any
+# older than BACKUP_MAX_AGE_DAYS (0 disables either rule)
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", 7))
+BACKUP_MAX_AGE_DAYS = float(os.getenv("BACKUP_MAX_AGE_DAYS", 30))
+# SQLite: "backup" (online backup API, in steps) or "vacuum" (VACUUM INTO)
+BACKUP_SQLITE_METHOD = os.getenv("BACKUP_SQLITE_METHOD", "backup")
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", 1024))
+BACKUP_STEP_SLEEP = float(os.getenv("BACKUP_STEP_SLEEP", 0.01))
+
+COMPRESSORS = {
+    "gzip": (".gz", lambda path, level: gzip.open(path, "wb", compresslevel=level)),
+    "xz": (".xz", lambda path, level: lzma.open(path, "wb", preset=level)),
+    "none": ("", lambda path, level: open(path, "wb")),
+}
+EXTENSIONS = {"sqlite": ".db", "mysql": ".sql"}
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+# Only files written by this tool are listed and pruned
+BACKUP_NAME = re.compile(
+    r"^(sqlite|mysql)_(\d{8}_\d{6})(?:_\d+)?\.(db|sql)(\.gz|\.xz)?$"
+)
+COPY_CHUNK = 1024 * 1024
+
+
+def open_backup(path):
+    """Open a backup for reading, decompressing by file extension"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+
+def write_atomically(path, write):
+    """Call ``write(file)`` on a temporary file, then rename it to ``path``
+
+    The file is compressed with BACKUP_COMPRESSION and fsynced first, so
+    ``path`` either doesn't exist or holds a complete backup.
+    """
+    _, compressor = COMPRESSORS[BACKUP_COMPRESSION]
+    partial = path + ".partial"
+    try:
+        with compressor(partial, BACKUP_COMPRESSION_LEVEL) as out:
+            write(out)
+        with open(partial, "rb") as written:
+            os.fsync(written.fileno())
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+def quick_check(path):
+    """Raise unless the SQLite file at ``path`` passes PRAGMA quick_check"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise RuntimeError(f"integrity check failed: {result}")
+
+
+def remove_sqlite_files(path):
+    """Remove a scratch database together with its -wal/-shm files"""
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def snapshot_sqlite(db_path, target):
+    """Write a consistent copy of a live SQLite database to ``target``"""
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        if BACKUP_SQLITE_METHOD == "vacuum":
+            # One read transaction; also drops free pages from the copy
+            src.execute("VACUUM INTO ?", (target,))
+        else:
+            dst = sqlite3.connect(target)
+            try:
+                wal = src.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+                # Under WAL a reader never blocks writers, so the copy runs
+                # as one read transaction. In rollback-journal mode it goes
+                # in steps that let writers in between; a write by another
+                # connection makes the next step start over.
+                src.backup(
+                    dst,
+                    pages=-1 if wal else BACKUP_PAGES_PER_STEP,
+                    sleep=BACKUP_STEP_SLEEP,
+                )
+            finally:
+                dst.close()
+    finally:
+        src.close()
+
+    # Make the copy a self-contained file rather than a WAL database
+    copy = sqlite3.connect(target)
+    try:
+        copy.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        copy.close()
+
+
+def backup_sqlite(settings, path):
+    db_path = settings.DATABASE_PATH
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"database file not found: {db_path}")
+    snapshot = path + ".snapshot"
+    try:
+        snapshot_sqlite(db_path, snapshot)
+        quick_check(snapshot)
+
+        def write(out):
+            with open(snapshot, "rb") as src:
+                shutil.copyfileobj(src, out, COPY_CHUNK)
+
+        write_atomically(path, write)
+    finally:
+        remove_sqlite_files(snapshot)
+
+
+def mysql_command(settings, program, *args):
+    """argv and environment for a MariaDB client tool"""
+    argv = [
+        program,
+        f"--host={settings.DB_HOST}",
+        f"--port={settings.DB_PORT}",
+        f"--user={settings.DB_USER}",
+        *args,
+        settings.DB_NAME,
+    ]
+    # Keeps the password out of the process list
+    env = dict(os.environ, MYSQL_PWD=settings.DB_PASSWORD)
+    return argv, env
+
+
+def backup_mysql(settings, path):
+    argv, env = mysql_command(
+        settings,
+        "mysqldump",
+        # One consistent InnoDB snapshot without locking tables
+        "--single-transaction",
+        "--quick",
+        "--routines",
+        "--triggers",
+        "--default-character-set=utf8mb4",
+    )
+
+    def write(out):
+        dump = subprocess.Popen(argv, env=env, stdout=subprocess.PIPE)
+        shutil.copyfileobj(dump.stdout, out, COPY_CHUNK)
+        if dump.wait() != 0:
+            raise RuntimeError(f"mysqldump exited with status {dump.returncode}")
+
+    write_atomically(path, write)
+
+
+def create_backup(settings, backend):
+    """Back up one backend and return the backup's path"""
+    suffix, _ = COMPRESSORS[BACKUP_COMPRESSION]
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    stem = os.path.join(BACKUP_DIR, f"{backend}_{datetime.now():{TIMESTAMP_FORMAT}}")
+    path = stem + EXTENSIONS[backend] + suffix
+    sequence = 1
+    while os.path.exists(path):
+        # Several backups within one second
+        sequence += 1
+        path = f"{stem}_{sequence}{EXTENSIONS[backend]}{suffix}"
+    if backend == "mysql":
+        backup_mysql(settings, path)
+    else:
+        backup_sqlite(settings, path)
+    return path
+
+
+def list_backups():
+    """(backend, taken_at, path) of every backup, oldest first"""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    backups = []
+    for name in os.listdir(BACKUP_DIR):
+        match = BACKUP_NAME.match(name)
+        if match:
+            taken_at = datetime.strptime(match.group(2), TIMESTAMP_FORMAT)
+            backups.append((match.group(1), taken_at, os.path.join(BACKUP_DIR, name)))
+    return sorted(backups, key=lambda backup: (backup[1], backup[2]))
+
+
+def prune_backups():
+    """Apply the retention rules; the newest backup of a backend is kept"""
+    cutoff = (
+        datetime.now() - timedelta(days=BACKUP_MAX_AGE_DAYS)
+        if BACKUP_MAX_AGE_DAYS
+        else None
+    )
+    removed = []
+    for backend in EXTENSIONS:
+        backups = [backup for backup in list_backups() if backup[0] == backend]
+        for index, (_, taken_at, path) in enumerate(reversed(backups)):
+            if index == 0:
+                continue
+            if (BACKUP_KEEP and index >= BACKUP_KEEP) or (cutoff and taken_at < cutoff):
+                os.remove(path)
+                removed.append(path)
+    return removed
+
+
+def restore_sqlite(settings, path):
+    """Replace the SQLite database's contents with a backup
+
+    The backup is decompressed and checked next to the database first. A
+    live database is then overwritten with the backup API in one step: a
+    single write transaction, so every open connection sees either the old
+    or the restored notes, and the WAL stays consistent. (Renaming a file
+    over a WAL database that is in use would pair it with the old
+    database's -wal/-shm files.) If there is no database yet, the checked
+    copy is simply renamed into place.
+    """
+    db_path = settings.DATABASE_PATH
+    staged = db_path + ".restore"
+    try:
+        with open_backup(path) as src, open(staged, "wb") as out:
+            shutil.copyfileobj(src, out, COPY_CHUNK)
+        quick_check(staged)
+
+        if not os.path.exists(db_path):
+            os.replace(staged, db_path)
+            return
+
+        src = sqlite3.connect(f"file:{staged}?mode=ro", uri=True)
+        dst = sqlite3.connect(db_path, timeout=settings.SQLITE_BUSY_TIMEOUT / 1000)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+    finally:
+        remove_sqlite_files(staged)
+
+
+def restore_mysql(settings, path):
+    argv, env = mysql_command(settings, "mysql", "--default-character-set=utf8mb4")
+    client = subprocess.Popen(argv, env=env, stdin=subprocess.PIPE)
+    try:
+        with open_backup(path) as src:
+            shutil.copyfileobj(src, client.stdin, COPY_CHUNK)
+    finally:
+        client.stdin.close()
+    if client.wait() != 0:
+        raise RuntimeError(f"mysql exited with status {client.returncode}")
+
+
+def restore_backup(settings, path, backend):
+    """Restore a backup file and return the backup taken of the current data
+
+    The current data is backed up first so a restore can itself be undone.
+    The changelog is then restarted above its pre-restore version, so
+    clients resync and no cached listing or ETag is taken for the restored
+    data. Running servers keep their cached schema features: restart them
+    when the backup's schema differs.
+    """
+    saved = None
+    past = None
+    if backend == "mysql" or os.path.exists(settings.DATABASE_PATH):
+        saved = create_backup(settings, backend)
+        past = changelog_version(settings, backend)
+    if backend == "mysql":
+        restore_mysql(settings, path)
+    else:
+        restore_sqlite(settings, path)
+    # The restored database may lack features the old one had
+    settings.schema_features.clear()
+    # An older backup may predate the current schema
+    if settings.DB_MIGRATE != "off":
+        settings.run_migrations()
+    conn = backend_connection(settings, backend)
+    try:
+        settings.restart_changes(conn, past)
+    finally:
+        conn.close()
+    # Clears the shared cache when CACHE_URL is set
+    settings.notes_changed()
+    return saved
+
+
+def backend_connection(settings, name):
+    """Connection to the named backend, whichever one is in use"""
+    for backend in (settings.database.primary, settings.database.fallback):
+        if backend is not None and backend.name == name:
+            return backend.connect()
+    raise RuntimeError(f"{name} backend is not configured")
+
+
+def changelog_version(settings, name):
+    """Latest changelog version of the named backend, or None"""
+    conn = backend_connection(settings, name)
+    try:
+        return settings.current_version(conn)
+    finally:
+        conn.close()
+
+
+def backup_path(name):
+    """Resolve a backup given by path or by file name in BACKUP_DIR"""
+    if os.path.exists(name):
+        return name
+    path = os.path.join(BACKUP_DIR, name)
+    if os.path.exists(path):
+        return path
+    raise FileNotFoundError(f"backup not found: {name}")
+
+
+def backup_backend(path):
+    """Backend a backup belongs to, from its name (legacy copies are SQLite)"""
+    match = BACKUP_NAME.match(os.path.basename(path))
+    return match.group(1) if match else "sqlite"
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else None
+    if command not in ("backup", "list", "prune", "restore"):
+        print(__doc__)
+        return 2
+
+    if command == "list":
+        for backend, taken_at, path in list_backups():
+            size = os.path.getsize(path) / 1024
+            print(
+                f"{taken_at:%Y-%m-%d %H:%M:%S}  {backend:<6}  {size:>10.1f} KiB  {path}"
+            )
+        return 0
+    if command == "prune":
+        for path in prune_backups():
+            print(f"🗑️  Removed {path}")
+        return 0
+
+    if command == "restore" and len(argv) < 3:
+        print("❌ Usage: python3 backup.py restore <backup file>")
+        return 2
+
+    # Reuse the app's configuration and backend selection. Its import must
+    # not migrate the database being saved; a restore migrates afterwards,
+    # in the configured mode
+    migrate = os.getenv("DB_MIGRATE", "auto")
+    os.environ["DB_MIGRATE"] = "off"
+    import frontend
+
+    frontend.DB_MIGRATE = migrate
+    frontend.database.start()
+
+    try:
+        if command == "backup":
+            if len(argv) > 2:
+                backend = argv[2]
+            else:
+                current = frontend.database.current()
+                backend = current.name if current else "sqlite"
+            if backend not in EXTENSIONS:
+                print(f"❌ Unknown backend: {backend}")
+                return 2
+            started = time.monotonic()
+            path = create_backup(frontend, backend)
+            print(
+                f"✅ Backup created: {path} "
+                f"({os.path.getsize(path) / 1024:.1f} KiB, "
+                f"{time.monotonic() - started:.2f}s)"
+            )
+            for removed in prune_backups():
+                print(f"🗑️  Removed {removed}")
+            return 0
+
+        path = backup_path(argv[2])
+        backend = backup_backend(path)
+        saved = restore_backup(frontend, path, backend)
+        if saved:
+            print(f"📦 Saved current database: {saved}")
+        print(f"✅ {backend} database restored from: {path}")
+        return 0
+    except Exception as err:
+        print(f"❌ {command} failed: {err}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""Load test and benchmark the notes API
+
+Seeds a database with notes, then drives each scenario for a fixed time
+at the given concurrency. It reports throughput, p50/p95/p99 latency and
+memory, and saves the results as JSON so runs can be compared.
+
+Two modes:
+- client (default): the app runs in this process through the Flask test
+  client, against a throwaway SQLite file (--db) or MariaDB (--backend
+  mysql), preferably a dedicated schema (--mysql-db). No server is needed.
+  This measures the app and database code.
+- http: real requests against a running server (--url), e.g. serve.py.
+  This measures the whole stack. --server-pid adds the server's memory
+  (master plus workers) to the report.
+
+Seeding and the write scenarios only run against the configured database
+(http mode, or --backend mysql without --mysql-db) with --allow-writes.
+Updates and deletes only touch the notes the run seeded, and the notes it
+created are deleted again at the end.
+
+Examples:
+    python3 bench.py --notes 10000 --concurrency 8 --duration 10
+    python3 bench.py --backend mysql --mysql-db notes_bench
+    python3 bench.py --mode http --url http://127.0.0.1:5000 --server-pid 1234 \
+        --allow-writes
+    python3 bench.py --scenarios list,search --compare bench-results/old.json
+"""
+
+import argparse
+import functools
+import http.client
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+SCENARIOS = [
+    "list",
+    "list-large",
+    "search",
+    "get",
+    "create",
+    "update",
+    "delete",
+    "mixed",
+]
+DEFAULT_SCENARIOS = "list,search,get,create,update,delete"
+WRITE_SCENARIOS = {"create", "update", "delete", "mixed"}
+# These pick from the seeded notes
+SEEDED_SCENARIOS = {"update", "delete", "mixed"}
+# Request mix of the "mixed" scenario (a browser session: mostly reads)
+MIXED_WEIGHTS = {"list": 40, "search": 20, "get": 20, "create": 10, "update": 10}
+WORDS = (
+    "meeting project idea shopping travel budget recipe garden music book "
+    "report deadline family weekend server backup release design review"
+).split()
+SEED_BATCH = 1000
+
+
+def random_text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def random_note(rng):
+    return {
+        "title": random_text(rng, 3).title(),
+        "content": random_text(rng, rng.randint(10, 80)),
+        "author": rng.choice(["amr", "sara", "omar", "lina", "youssef"]),
+    }
+
+
+class ClientSession:
+    """One worker's connection to the in-process app"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, method, path, body=None):
+        """(status, response body bytes)"""
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        pass
+
+
+class HttpSession:
+    """One worker's keep-alive HTTP connection to a running server"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def send(self, method, path, body=None):
+        """(status, response body bytes)"""
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect for the next request; this one counts as an error
+            self.connection.close()
+            self.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=30
+            )
+            raise
+        return response.status, data
+
+    def close(self):
+        self.connection.close()
+
+
+class Workload:
+    """Picks the next request of a scenario; shared by all workers"""
+
+    def __init__(self, ids, seed):
+        self.ids = list(ids)
+        # delete runs last by default, so get/update don't hit deleted notes
+        self.deletable = list(ids)
+        random.Random(seed).shuffle(self.deletable)
+        self.created = []
+        self.lock = threading.Lock()
+
+    def note_created(self, body):
+        with self.lock:
+            self.created.append(json.loads(body)["id"])
+
+    def own_notes(self):
+        """Ids of the notes this run seeded or created and has not deleted"""
+        with self.lock:
+            return self.deletable + self.created
+
+    def next_request(self, scenario, rng):
+        if scenario == "mixed":
+            scenario = rng.choices(
+                list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values())
+            )[0]
+        if scenario == "list":
+            return "GET", "/api/notes?limit=50", None
+        if scenario == "list-large":
+            return "GET", "/api/notes?limit=500", None
+        if scenario == "search":
+            return "GET", f"/api/search?q={rng.choice(WORDS)}", None
+        if scenario == "get":
+            return "GET", f"/api/notes/{rng.choice(self.ids)}", None
+        if scenario == "create":
+            return "POST", "/api/notes", random_note(rng)
+        if scenario == "update":
+            return "PUT", f"/api/notes/{rng.choice(self.ids)}", random_note(rng)
+        if scenario == "delete":
+            with self.lock:
+                if not self.deletable:
+                    return None
+                note_id = self.deletable.pop()
+            return "DELETE", f"/api/notes/{note_id}", None
+        raise ValueError(f"unknown scenario: {scenario}")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(
+        len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1)
+    )
+    return sorted_values[index]
+
+
+def rss_kib(pid="self"):
+    """Resident memory of a process in KiB, from /proc"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def server_rss_kib(pid):
+    """Resident memory of a server process and its direct children"""
+    total = rss_kib(pid) or 0
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                total += rss_kib(child) or 0
+    except OSError:
+        pass
+    return total
+
+
+def run_scenario(scenario, make_session, workload, concurrency, duration, seed):
+    """Drive one scenario with ``concurrency`` workers for ``duration`` s"""
+    latencies = []
+    statuses = {}
+    errors = [0]
+    response_bytes = [0]
+    lock = threading.Lock()
+    start = threading.Barrier(concurrency + 1)
+    stop_at = [0.0]
+
+    def worker(index):
+        rng = random.Random(f"{seed}-{scenario}-{index}")
+        session = make_session()
+        mine = []
+        my_statuses = {}
+        my_errors = 0
+        my_bytes = 0
+        start.wait()
+        try:
+            while time.perf_counter() < stop_at[0]:
+                request = workload.next_request(scenario, rng)
+                if request is None:
+                    break
+                began = time.perf_counter()
+                try:
+                    status, body = session.send(*request)
+                except Exception:
+                    my_errors += 1
+                    continue
+                mine.append(time.perf_counter() - began)
+                my_statuses[status] = my_statuses.get(status, 0) + 1
+                my_bytes += len(body)
+                if status >= 400:
+                    my_errors += 1
+                elif request[0] == "POST":
+                    workload.note_created(body)
+        finally:
+            session.close()
+            with lock:
+                latencies.extend(mine)
+                errors[0] += my_errors
+                response_bytes[0] += my_bytes
+                for status, count in my_statuses.items():
+                    statuses[status] = statuses.get(status, 0) + count
+
+    threads = [
+        threading.Thread(target=worker, args=(index,), daemon=True)
+        for index in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    rss_before = rss_kib()
+    began = time.perf_counter()
+    stop_at[0] = began + duration
+    start.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    latencies.sort()
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": ms(sum(latencies) / len(latencies)) if latencies else None,
+            "p50": ms(percentile(latencies, 0.50)),
+            "p95": ms(percentile(latencies, 0.95)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(latencies[-1] if latencies else None),
+        },
+        "response_bytes": response_bytes[0],
+        "rss_kib_before": rss_before,
+        "rss_kib_after": rss_kib(),
+    }
+
+
+def seed_notes(session, count, rng):
+    """Insert ``count`` notes through POST /api/notes/bulk; returns their ids"""
+    ids = []
+    for start in range(0, count, SEED_BATCH):
+        batch = [random_note(rng) for _ in range(min(SEED_BATCH, count - start))]
+        status, body = session.send("POST", "/api/notes/bulk", batch)
+        result = json.loads(body)
+        if status != 200 or result.get("errors"):
+            raise RuntimeError(f"seeding failed ({status}): {result}")
+        ids.extend(result["ids"])
+    return ids
+
+
+def delete_notes(session, ids):
+    """Delete notes through DELETE /api/notes/bulk"""
+    for start in range(0, len(ids), SEED_BATCH):
+        batch = ids[start : start + SEED_BATCH]
+        status, body = session.send("DELETE", "/api/notes/bulk", {"ids": batch})
+        if status != 200:
+            raise RuntimeError(f"cleanup failed ({status}): {body[:200]!r}")
+
+
+def existing_note_ids(session):
+    """Ids already in the database, when not seeding"""
+    status, body = session.send("GET", "/api/notes?fields=id")
+    if status != 200:
+        raise RuntimeError(f"listing notes failed ({status})")
+    return [note["id"] for note in json.loads(body)]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def print_results(results, previous=None):
+    print(
+        f"\n{'scenario':<8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7} {'RSS MiB':>8}"
+    )
+    for name, result in results["scenarios"].items():
+        latency = result["latency_ms"]
+        rss = result.get("server_rss_kib") or result["rss_kib_after"] or 0
+        line = (
+            f"{name:<8} {result['throughput_rps']:>9.1f} {latency['p50'] or 0:>8.2f} "
+            f"{latency['p95'] or 0:>8.2f} {latency['p99'] or 0:>8.2f} "
+            f"{result['errors']:>7} {rss / 1024:>8.1f}"
+        )
+        old = previous["scenarios"].get(name) if previous else None
+        if old and old["throughput_rps"] and old["latency_ms"]["p95"]:
+            rps = (result["throughput_rps"] / old["throughput_rps"] - 1) * 100
+            p95 = ((latency["p95"] or 0) / old["latency_ms"]["p95"] - 1) * 100
+            line += f"   vs previous: {rps:+.1f}% req/s, {p95:+.1f}% p95"
+        print(line)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the notes API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Examples:")[1],
+    )
+    parser.add_argument("--mode", choices=["client", "http"], default="client")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument(
+        "--db", default="bench.db", help="SQLite file for client mode (recreated)"
+    )
+    parser.add_argument(
+        "--mysql-db", help="dedicated MariaDB schema for --backend mysql"
+    )
+    parser.add_argument(
+        "--allow-writes",
+        action="store_true",
+        help="seed and write into the configured database",
+    )
+    parser.add_argument(
+        "--notes", type=int, default=5000, help="notes to seed (0 = use existing)"
+    )
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds per scenario"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=1.0, help="seconds before each scenario"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="disable the response cache"
+    )
+    parser.add_argument(
+        "--server-pid", type=int, help="server PID for memory (http mode)"
+    )
+    parser.add_argument(
+        "--output", help="results file (default bench-results/<time>.json)"
+    )
+    parser.add_argument("--compare", help="previous results file to compare with")
+    args = parser.parse_args(argv)
+    args.scenarios = [
+        name.strip() for name in args.scenarios.split(",") if name.strip()
+    ]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if not args.notes and SEEDED_SCENARIOS & set(args.scenarios):
+        parser.error("update, delete and mixed need seeded notes (--notes > 0)")
+    args.shared = args.mode == "http" or (args.backend == "mysql" and not args.mysql_db)
+    writes = args.notes or WRITE_SCENARIOS & set(args.scenarios)
+    if args.shared and writes and not args.allow_writes:
+        parser.error(
+            "seeding and write scenarios change the configured database: "
+            "pass --allow-writes (or --mysql-db with --backend mysql), or run "
+            "read-only scenarios with --notes 0"
+        )
+    return args
+
+
+def main(argv):
+    args = parse_args(argv)
+
+    if args.mode == "client":
+        # Configure the app before it is imported
+        os.environ["DB_TYPE"] = args.backend
+        if args.backend == "sqlite":
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(args.db + suffix):
+                    os.remove(args.db + suffix)
+            os.environ["DB_PATH"] = args.db
+        elif args.mysql_db:
+            os.environ["DB_NAME"] = args.mysql_db
+        if args.no_cache:
+            os.environ["CACHE_ENABLED"] = "false"
+        import frontend
+
+        make_session = functools.partial(ClientSession, frontend.app)
+    else:
+        make_session = functools.partial(HttpSession, args.url)
+
+    rng = random.Random(args.seed)
+    session = make_session()
+    try:
+        started = time.perf_counter()
+        if args.notes:
+            ids = seed_notes(session, args.notes, rng)
+            print(f"🌱 Seeded {len(ids)} notes in {time.perf_counter() - started:.1f}s")
+        else:
+            ids = existing_note_ids(session)
+            print(f"📋 Using {len(ids)} existing notes")
+    finally:
+        session.close()
+    if not ids:
+        print("❌ No notes to benchmark against")
+        return 1
+
+    workload = Workload(ids, args.seed)
+    results = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "mode": args.mode,
+            "url": args.url if args.mode == "http" else None,
+            "backend": args.backend if args.mode == "client" else None,
+            "notes": len(ids),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "cache": not args.no_cache,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    try:
+        for scenario in args.scenarios:
+            if args.warmup and scenario != "delete":
+                run_scenario(
+                    scenario,
+                    make_session,
+                    workload,
+                    args.concurrency,
+                    args.warmup,
+                    args.seed,
+                )
+            result = run_scenario(
+                scenario,
+                make_session,
+                workload,
+                args.concurrency,
+                args.duration,
+                args.seed,
+            )
+            if args.server_pid:
+                result["server_rss_kib"] = server_rss_kib(args.server_pid)
+            results["scenarios"][scenario] = result
+            print(
+                f"✅ {scenario}: {result['throughput_rps']} req/s, "
+                f"p95 {result['latency_ms']['p95']} ms, {result['errors']} errors"
+            )
+    finally:
+        # The throwaway SQLite file is recreated by the next run
+        if args.mode == "http" or args.backend == "mysql":
+            own = workload.own_notes() if args.notes else workload.created
+            session = make_session()
+            try:
+                delete_notes(session, own)
+            finally:
+                session.close()
+            print(f"🧹 Deleted the {len(own)} notes this run created")
+    results["peak_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as old:
+            previous = json.load(old)
+    print_results(results, previous)
+
+    output = args.output or os.path.join(
+        "bench-results", f"{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as out:
+        json.dump(results, out, indent=2)
+    print(f"\n💾 Results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
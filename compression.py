@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Negotiated response compression (zstd, brotli, gzip)
+
+Buffered responses at least ``min_size`` bytes long are compressed in one
+go. Streamed responses (no Content-Length) are compressed chunk by chunk
+and flushed after every chunk, so NDJSON exports and the like reach the
+client as they are produced. Responses that are already encoded, marked
+no-transform, or not of a compressible type pass through untouched.
+"""
+
+import zlib
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+# Try to import the optional codecs
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/csv",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+)
+
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
+
+class GzipEncoder:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def available_encoders():
+    """Encoders whose codec is installed, in server preference order"""
+    encoders = {}
+    if ZSTD_AVAILABLE:
+        encoders["zstd"] = ZstdEncoder
+    if BROTLI_AVAILABLE:
+        encoders["br"] = BrotliEncoder
+    encoders["gzip"] = GzipEncoder
+    return encoders
+
+
+class ResumedBody:
+    """A response body whose first chunk was already pulled off its iterator"""
+
+    def __init__(self, first, chunks, body):
+        self._first = first
+        self._chunks = chunks
+        self._body = body
+
+    def __iter__(self):
+        if self._first is not None:
+            yield self._first
+        yield from self._chunks
+
+    def close(self):
+        if hasattr(self._body, "close"):
+            self._body.close()
+
+
+class CompressedBody:
+    """Compresses a streamed body incrementally; closes it when closed"""
+
+    def __init__(self, body, encoder):
+        self._body = body
+        self._encoder = encoder
+
+    def __iter__(self):
+        encoder = self._encoder
+        for chunk in self._body:
+            if chunk:
+                data = encoder.compress(chunk) + encoder.flush()
+                if data:
+                    yield data
+        yield encoder.finish()
+
+    def close(self):
+        self._body.close()
+
+
+class CompressionMiddleware:
+    """WSGI middleware compressing responses in the client's preferred encoding
+
+    ``levels`` maps an encoding (zstd, br, gzip) to its compression level.
+    On ties in Accept-Encoding quality, zstd is preferred over brotli over
+    gzip.
+    """
+
+    def __init__(self, app, min_size=1024, levels=None, types=COMPRESSIBLE_TYPES):
+        self.app = app
+        self.min_size = min_size
+        self.levels = dict(DEFAULT_LEVELS, **(levels or {}))
+        self.types = types
+        self.encoders = available_encoders()
+
+    def should_compress(self, status, headers):
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if "Content-Encoding" in headers or "Content-Range" in headers:
+            return False
+        if "no-transform" in headers.get("Cache-Control", ""):
+            return False
+        mimetype = headers.get("Content-Type", "").split(";", 1)[0].strip()
+        return mimetype in self.types
+
+    def __call__(self, environ, start_response):
+        accept = environ.get("HTTP_ACCEPT_ENCODING")
+        if not accept or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+        encoding = parse_accept_header(accept).best_match(list(self.encoders))
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        started = {}
+
+        def deferred_start_response(status, headers, exc_info=None):
+            started.update(status=status, headers=headers, exc_info=exc_info)
+            return lambda data: started.setdefault("written", []).append(data)
+
+        body = self.app(environ, deferred_start_response)
+        chunks = iter(body)
+        first = b"".join(started.pop("written", [])) or None
+        if "status" not in started:
+            # start_response may be called as late as the first iteration
+            first = next(chunks, None)
+        status, headers = started["status"], Headers(started["headers"])
+
+        body = ResumedBody(first, chunks, body)
+        if self.should_compress(status, headers):
+            length = headers.get("Content-Length", type=int)
+            if length is None or length >= self.min_size:
+                return self.compress(encoding, status, headers, body, start_response)
+
+        start_response(status, started["headers"], started["exc_info"])
+        return body
+
+    def compress(self, encoding, status, headers, body, start_response):
+        encoder = self.encoders[encoding](self.levels[encoding])
+        buffered = "Content-Length" in headers
+        headers["Content-Encoding"] = encoding
+        vary = headers.get("Vary", "")
+        if "accept-encoding" not in vary.lower():
+            headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        etag = headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            # The compressed bytes differ: only a weak validator still holds
+            headers["ETag"] = "W/" + etag
+        del headers["Content-Length"]
+
+        if not buffered:
+            start_response(status, headers.to_wsgi_list())
+            return CompressedBody(body, encoder)
+
+        try:
+            parts = [encoder.compress(chunk) for chunk in body]
+            parts.append(encoder.finish())
+        finally:
+            body.close()
+        data = b"".join(parts)
+        headers["Content-Length"] = str(len(data))
+        start_response(status, headers.to_wsgi_list())
+        return [data]
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Database backend selection with a circuit breaker around MySQL"""
+
+import threading
+import time
+
+from db_pool import PoolTimeout
+
+
+class Backend:
+    """One database backend: its name, SQL placeholder and connection pools
+
+    ``pool`` serves writes. An optional ``read_pool`` serves read-only
+    requests; without one, reads share the write pool. ``is_outage(err)``
+    tells whether a checkout error means the server is unreachable (by
+    default any error does).
+    """
+
+    def __init__(self, name, pool, read_pool=None, is_outage=None):
+        self.name = name
+        self.pool = pool
+        self.read_pool = read_pool
+        self.is_outage = is_outage or (lambda err: True)
+        self.placeholder = "%s" if name == "mysql" else "?"
+
+    def connect(self, readonly=False):
+        """Check out a pooled connection (raises on failure)"""
+        if readonly and self.read_pool is not None:
+            return self.read_pool.acquire()
+        return self.pool.acquire()
+
+    def pools(self):
+        """{label: pool} for every pool of this backend"""
+        pools = {self.name: self.pool}
+        if self.read_pool is not None:
+            pools[f"{self.name}_read"] = self.read_pool
+        return pools
+
+    def probe(self):
+        """Return True if a connection can be opened and released"""
+        try:
+            self.connect().close()
+            return True
+        except Exception:
+            return False
+
+    def __repr__(self):
+        return f"Backend({self.name!r})"
+
+
+class BackendSelector:
+    """Resolves the backend once and re-probes the primary in the background
+
+    The primary (MySQL) is guarded by a circuit breaker. While the breaker is
+    closed, requests use the primary. A checkout that fails because the
+    primary is unreachable opens the breaker: requests go straight to the
+    fallback (SQLite), or fail fast when there is none, and a daemon thread
+    probes the primary every ``probe_interval`` seconds until it answers
+    again. Request threads never wait on a dead host.
+
+    An exhausted pool (PoolTimeout) is load, not an outage: it is raised to
+    the caller and never falls back, which would split writes between two
+    databases.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, primary=None, fallback=None, probe_interval=30.0):
+        if primary is None and fallback is None:
+            raise ValueError("at least one database backend is required")
+        self.primary = primary
+        self.fallback = fallback
+        self.probe_interval = probe_interval
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._prober = None
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trips = 0
+        self._last_error = None
+
+    def start(self):
+        """Probe the primary once and pick the starting backend
+
+        Also used after a fork, where the parent's probe thread is gone.
+        """
+        with self._lock:
+            self._state = self.CLOSED
+            self._opened_at = None
+            self._prober = None
+        if self.primary is not None and not self.primary.probe():
+            self._trip("startup probe failed")
+
+    @property
+    def state(self):
+        return self._state
+
+    def current(self):
+        """Backend that new requests should use, or None if none is usable"""
+        if self.primary is not None and self._state == self.CLOSED:
+            return self.primary
+        return self.fallback
+
+    def connect(self, readonly=False):
+        """Check out a connection from the current backend
+
+        Returns None when no backend can hand out a connection. Raises
+        PoolTimeout when the backend's pool stays exhausted.
+        """
+        backend = self.current()
+        if backend is None:
+            return None
+        try:
+            return backend.connect(readonly)
+        except PoolTimeout:
+            raise
+        except Exception as err:
+            if backend is not self.primary or not backend.is_outage(err):
+                print(f"{backend.name} connection error: {err}")
+                return None
+            self._trip(err)
+
+        if self.fallback is None:
+            return None
+        try:
+            return self.fallback.connect(readonly)
+        except PoolTimeout:
+            raise
+        except Exception as err:
+            print(f"{self.fallback.name} connection error: {err}")
+            return None
+
+    def stats(self):
+        """Breaker state for diagnostics"""
+        backend = self.current()
+        return {
+            "backend": backend.name if backend else None,
+            "primary": self.primary.name if self.primary else None,
+            "fallback": self.fallback.name if self.fallback else None,
+            "breaker": self._state,
+            "trips": self._trips,
+            "open_for_s": (
+                round(time.monotonic() - self._opened_at, 1)
+                if self._opened_at is not None
+                else 0.0
+            ),
+            "last_error": self._last_error,
+        }
+
+    def _trip(self, err):
+        with self._lock:
+            self._last_error = str(err)
+            if self._state == self.OPEN:
+                return
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trips += 1
+            fallback = self.fallback.name if self.fallback else "no backend"
+            print(f"⚠️  {self.primary.name} unavailable ({err}); using {fallback}")
+            if self._prober is None or not self._prober.is_alive():
+                self._prober = threading.Thread(
+                    target=self._probe_loop, name="db-backend-probe", daemon=True
+                )
+                self._prober.start()
+
+    def _probe_loop(self):
+        while not self._wake.wait(self.probe_interval):
+            if self.primary.probe():
+                with self._lock:
+                    self._state = self.CLOSED
+                    self._opened_at = None
+                print(f"🎯 {self.primary.name} is reachable again")
+                return
+
+    def stop(self):
+        """Stop the background probe thread"""
+        self._wake.set()
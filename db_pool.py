@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""Connection pooling shared by the MySQL and SQLite backends"""
+
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free before the timeout"""
+
+
+STATEMENT_TYPES = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+def statement_type(sql):
+    """SELECT/INSERT/UPDATE/DELETE or OTHER, for low-cardinality metrics"""
+    words = sql.lstrip(" \t\r\n(").split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in STATEMENT_TYPES else "OTHER"
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that reports every statement to the pool's observers
+
+    A statement is reported once its result is used up: when the last row
+    was fetched, the next statement runs or the cursor is closed. Its time
+    is what was spent inside execute and fetch calls, so on SQLite (where
+    rows are produced while fetching) it covers the whole query.
+    """
+
+    def __init__(self, raw, db_type, observers):
+        self._raw = raw
+        self._db_type = db_type
+        self._observers = observers
+        self._pending = None  # [sql, params, seconds, rows]
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def _report(self, sql, params, seconds, rows, error):
+        for observer in self._observers:
+            observer.query(self._db_type, sql, params, seconds, rows, error)
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, seconds, rows = pending
+            if not rows:
+                rows = max(self._raw.rowcount or 0, 0)
+            self._report(sql, params, seconds, rows, None)
+
+    def _execute(self, method, sql, params):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            result = method(sql, *params)
+        except Exception as err:
+            self._report(
+                sql,
+                params[0] if params else None,
+                time.perf_counter() - started,
+                0,
+                err,
+            )
+            raise
+        self._pending = [
+            sql,
+            params[0] if params else None,
+            time.perf_counter() - started,
+            0,
+        ]
+        return result
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - started
+
+    def execute(self, sql, *params):
+        return self._execute(self._raw.execute, sql, params)
+
+    def executemany(self, sql, *params):
+        return self._execute(self._raw.executemany, sql, params)
+
+    def fetchone(self):
+        row = self._fetch(self._raw.fetchone)
+        if self._pending is not None:
+            if row is None:
+                self._finish()
+            else:
+                self._pending[3] += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._fetch(self._raw.fetchmany, *args)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+            if not rows:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(self._raw.fetchall)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+            self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._raw.close()
+
+
+class PooledConnection:
+    """Wrapper around a raw connection that goes back to its pool on close()"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self.db_type = pool.db_type
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise AttributeError(f"connection already returned to pool ({name})")
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        if self._raw is None:
+            raise AttributeError("connection already returned to pool (cursor)")
+        cursor = self._raw.cursor(*args, **kwargs)
+        if self._pool.observers:
+            return InstrumentedCursor(cursor, self.db_type, self._pool.observers)
+        return cursor
+
+    def close(self):
+        """Return the connection to the pool instead of closing it"""
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def default_health_check(conn):
+    """Cheap liveness probe run on checkout"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections
+
+    Connections are created lazily up to ``max_size``. Idle connections older
+    than ``idle_timeout`` seconds are closed on the next checkout/return, and
+    with ``pre_ping`` every checkout runs ``health_check`` first so a dead
+    server connection is replaced transparently.
+
+    Each of the optional ``observers`` is told about every checkout
+    (``connection_acquired(pool, db_type, seconds)``), failed checkout
+    (``connection_failed(pool, db_type, error)``) and statement run on the
+    connection's cursors (``query(db_type, sql, params, seconds, rows,
+    error)``, see InstrumentedCursor).
+    """
+
+    def __init__(
+        self,
+        db_type,
+        factory,
+        max_size=5,
+        timeout=5.0,
+        idle_timeout=300.0,
+        pre_ping=True,
+        health_check=default_health_check,
+        name=None,
+        observers=(),
+    ):
+        self.db_type = db_type
+        self.name = name or db_type
+        self.observers = tuple(observers)
+        self.factory = factory
+        self.max_size = max(1, int(max_size))
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.health_check = health_check
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw connection, returned_at)
+        self._size = 0  # open connections, idle + in use
+        self._in_use = 0
+
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._created = 0
+        self._evicted = 0
+        self._failed_checks = 0
+        self._checkout_time_total = 0.0
+        self._checkout_time_max = 0.0
+
+    def acquire(self):
+        """Check out a connection, waiting up to ``timeout`` seconds"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        raw = None
+        waited = False
+
+        with self._cond:
+            while True:
+                self._evict_idle_locked()
+                if self._idle:
+                    # LIFO keeps the warmest connections in rotation
+                    raw, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    error = PoolTimeout(
+                        f"{self.db_type} pool exhausted ({self.max_size} connections)"
+                    )
+                    for observer in self.observers:
+                        observer.connection_failed(self.name, self.db_type, error)
+                    raise error
+                self._cond.wait(remaining)
+            if waited:
+                self._waits += 1
+            self._in_use += 1
+
+        try:
+            if raw is not None and self.pre_ping and not self._is_healthy(raw):
+                self._close_quietly(raw)
+                raw = None
+            if raw is None:
+                raw = self.factory()
+                with self._cond:
+                    self._created += 1
+        except Exception as err:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            for observer in self.observers:
+                observer.connection_failed(self.name, self.db_type, err)
+            raise
+
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._checkout_time_total += elapsed
+            self._checkout_time_max = max(self._checkout_time_max, elapsed)
+        for observer in self.observers:
+            observer.connection_acquired(self.name, self.db_type, elapsed)
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """Return a raw connection; it is discarded if it cannot be reset"""
+        try:
+            # Ends any open transaction so the next user gets a fresh snapshot
+            raw.rollback()
+        except Exception:
+            self._close_quietly(raw)
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((raw, time.monotonic()))
+            self._evict_idle_locked()
+            self._cond.notify()
+
+    def dispose(self):
+        """Close every idle connection and forget the ones in use"""
+        with self._cond:
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._size = self._in_use
+            self._cond.notify_all()
+        for raw in idle:
+            self._close_quietly(raw)
+
+    def stats(self):
+        """Snapshot of pool metrics"""
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "backend": self.db_type,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "evicted": self._evicted,
+                "failed_health_checks": self._failed_checks,
+                "checkout_ms_avg": (
+                    round(self._checkout_time_total / checkouts * 1000, 3)
+                    if checkouts
+                    else 0.0
+                ),
+                "checkout_ms_max": round(self._checkout_time_max * 1000, 3),
+            }
+
+    def _evict_idle_locked(self):
+        if not self.idle_timeout:
+            return
+        cutoff = time.monotonic() - self.idle_timeout
+        # Oldest connections sit at the left end of the deque
+        while self._idle and self._idle[0][1] < cutoff:
+            raw, _ = self._idle.popleft()
+            self._size -= 1
+            self._evicted += 1
+            self._close_quietly(raw)
+
+    def _is_healthy(self, raw):
+        try:
+            self.health_check(raw)
+            return True
+        except Exception:
+            with self._cond:
+                self._failed_checks += 1
+            return False
+
+    @staticmethod
+    def _close_quietly(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
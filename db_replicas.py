@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Read-only checkouts spread over MariaDB replicas
+
+A ReplicaSet stands in for a backend's read pool. Each replica has its own
+connection pool; a daemon thread checks every replica's replication status
+each ``check_interval`` seconds and takes it out of rotation while it is
+unreachable, not replicating, or more than ``max_lag`` seconds behind.
+Reads go round-robin over the replicas in rotation and to the primary when
+there are none.
+"""
+
+import itertools
+import threading
+import time
+
+from db_pool import PoolTimeout
+
+# MariaDB >= 10.5 and MySQL >= 8.0.22 know the first; MySQL 8.4 only knows it
+STATUS_STATEMENTS = ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS")
+LAG_COLUMNS = ("Seconds_Behind_Master", "Seconds_Behind_Source")
+
+
+def parse_endpoints(value, default_port):
+    """[(host, port)] from "host[:port],host[:port]" """
+    endpoints = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(":")
+        endpoints.append((host, int(port) if port else default_port))
+    return endpoints
+
+
+class ReplicaUnavailable(Exception):
+    """Raised by a status check when a replica must not serve reads"""
+
+
+class Replica:
+    """One replica's pool and the outcome of its last status check"""
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.healthy = False
+        self.lag = None
+        self.error = "not checked yet"
+        self.checked_at = None
+        self.reads = 0
+        self._statement = None
+
+    def replication_lag(self):
+        """Seconds behind the primary (raises ReplicaUnavailable)"""
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                row = self._status(cursor)
+                if row is None:
+                    raise ReplicaUnavailable("not configured as a replica")
+                columns = [column[0] for column in cursor.description]
+                lag_column = next((c for c in LAG_COLUMNS if c in columns), None)
+                if lag_column is None:
+                    raise ReplicaUnavailable("replication lag not reported")
+                lag = row[columns.index(lag_column)]
+                if lag is None:
+                    raise ReplicaUnavailable("replication is stopped")
+                return float(lag)
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+
+    def _status(self, cursor):
+        statements = (self._statement,) if self._statement else STATUS_STATEMENTS
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+            except Exception:
+                if statement == statements[-1]:
+                    raise
+                continue
+            self._statement = statement
+            rows = cursor.fetchall()
+            return rows[0] if rows else None
+
+    def stats(self):
+        return dict(
+            self.pool.stats(),
+            healthy=self.healthy,
+            lag_s=self.lag,
+            error=self.error,
+            checked_ago_s=(
+                round(time.monotonic() - self.checked_at, 1)
+                if self.checked_at is not None
+                else None
+            ),
+            reads=self.reads,
+        )
+
+
+class ReplicaSet:
+    """Read pool over ``replicas`` ({name: pool}) that falls back to ``primary``
+
+    Only ``acquire()``, ``dispose()`` and ``stats()`` are used by Backend, so
+    a ReplicaSet can be passed wherever a read pool is expected.
+    """
+
+    def __init__(self, primary, replicas, max_lag=5.0, check_interval=5.0):
+        self.primary = primary
+        self.replicas = [Replica(name, pool) for name, pool in replicas.items()]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._next = itertools.count()
+        self._primary_reads = 0
+
+    def start(self):
+        """Check every replica once, then keep checking in the background
+
+        Also used after a fork, where the parent's check thread is gone.
+        """
+        self.check_all()
+        if not self.check_interval:
+            return
+        with self._lock:
+            # Stops a thread left over from an earlier start()
+            self._wake.set()
+            self._wake = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="db-replica-check", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._wake.set()
+
+    def check(self, replica):
+        """Refresh one replica's status; returns whether it serves reads"""
+        try:
+            lag = replica.replication_lag()
+            error = None if lag <= self.max_lag else f"{lag:g}s behind the primary"
+        except Exception as err:
+            lag, error = None, str(err)
+        with self._lock:
+            was_healthy = replica.healthy
+            replica.healthy = error is None
+            replica.lag = lag
+            replica.error = error
+            replica.checked_at = time.monotonic()
+        if was_healthy and error is not None:
+            print(f"⚠️  Replica {replica.name} out of rotation: {error}")
+        elif not was_healthy and error is None:
+            print(f"🎯 Replica {replica.name} serving reads ({lag:g}s behind)")
+        return error is None
+
+    def check_all(self):
+        for replica in self.replicas:
+            self.check(replica)
+
+    def acquire(self):
+        """Check out a connection from a healthy replica, else from the primary"""
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if healthy:
+            start = next(self._next) % len(healthy)
+            for replica in healthy[start:] + healthy[:start]:
+                try:
+                    conn = replica.pool.acquire()
+                except PoolTimeout:
+                    # Busy rather than broken: try the next one
+                    continue
+                except Exception as err:
+                    with self._lock:
+                        replica.healthy = False
+                        replica.error = str(err)
+                    print(f"⚠️  Replica {replica.name} out of rotation: {err}")
+                    continue
+                with self._lock:
+                    replica.reads += 1
+                return conn
+        with self._lock:
+            self._primary_reads += 1
+        return self.primary.acquire()
+
+    def dispose(self):
+        """Dispose of the replica pools (the primary pool is its backend's)"""
+        for replica in self.replicas:
+            replica.pool.dispose()
+
+    def stats(self):
+        with self._lock:
+            primary_reads = self._primary_reads
+        return {
+            "max_lag_s": self.max_lag,
+            "check_interval_s": self.check_interval,
+            "healthy": sum(1 for replica in self.replicas if replica.healthy),
+            "primary_reads": primary_reads,
+            "replicas": {replica.name: replica.stats() for replica in self.replicas},
+        }
+
+    def _run(self):
+        wake = self._wake
+        while not wake.wait(self.check_interval):
+            self.check_all()
@@ -1,9 +1,46 @@
 #!/usr/bin/env python3
 
-from flask import Flask, render_template_string, request, jsonify
+from flask import (
+    Flask,
+    Response,
+    g,
+    has_request_context,
+    make_response,
+    request,
+    jsonify,
+)
+from werkzeug.http import unquote_etag
 import sqlite3
+import csv
+import hashlib
+import io
+import json
 import os
-from datetime import datetime
+import re
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlencode
+
+from assets import REVALIDATE, Asset, AssetBundle
+from compression import CompressionMiddleware
+from db_backend import Backend, BackendSelector
+from db_pool import ConnectionPool, PoolTimeout, default_health_check
+from db_replicas import ReplicaSet, parse_endpoints
+import migrations
+from metrics import PROMETHEUS_AVAILABLE, ROUTE_KEY, Metrics, MetricsMiddleware
+from note_events import ChangeBroadcaster, sse_stream
+from response_cache import LocalCache, RedisCache
+from serialization import (
+    db_timestamp,
+    iso_timestamp,
+    json_provider,
+    map_notes,
+    note_mapper,
+)
+from sqlite_tuning import WalCheckpointer, apply_pragmas
+from profiling import ProfilerBusy, ProfilingMiddleware, StackSampler, is_authorized
+from tracing import RequestTracer, TracingMiddleware
 
 # Try to load environment variables from .env file
 try:
@@ -22,1383 +59,1484 @@ except ImportError:
     MYSQL_AVAILABLE = False
     print("⚠️  mysql-connector-python not installed. SQLite only mode.")
 
-app = Flask(__name__)
+# Static files are served prebuilt and fingerprinted (see assets.py)
+app = Flask(__name__, static_folder=None)
 app.secret_key = "simple_notes_secret_key_2024"
+# auto: orjson when installed, otherwise Flask's default json provider
+JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+app.json = json_provider(app, JSON_ENCODER)
+
+# Response compression; turn off when a reverse proxy already compresses
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))  # bytes
+COMPRESSION_LEVELS = {
+    "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    "br": int(os.getenv("COMPRESSION_BROTLI_LEVEL", 4)),
+    "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3)),
+}
+if COMPRESSION_ENABLED:
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app, COMPRESSION_MIN_SIZE, COMPRESSION_LEVELS
+    )
+
+# Prometheus metrics on /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+if METRICS_ENABLED and not PROMETHEUS_AVAILABLE:
+    print("⚠️  prometheus-client not installed. /metrics disabled.")
+metrics = Metrics() if METRICS_ENABLED and PROMETHEUS_AVAILABLE else None
+if metrics is not None:
+    app.wsgi_app = MetricsMiddleware(app.wsgi_app, metrics)
+
+# Request tracing and slow-query log, as JSON lines in TRACE_LOG (or stderr)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0))  # 0 = off, 1 = all
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 0))  # 0 = off
+TRACE_LOG = os.getenv("TRACE_LOG", "")
+tracer = RequestTracer(TRACE_SAMPLE_RATE, SLOW_QUERY_MS, TRACE_LOG)
+if tracer.enabled:
+    app.wsgi_app = TracingMiddleware(app.wsgi_app, tracer)
+
+# Admin-only profiling; disabled unless a token is set
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", 60))
+stack_sampler = StackSampler()
+if PROFILING_TOKEN:
+    app.wsgi_app = ProfilingMiddleware(app.wsgi_app, PROFILING_TOKEN)
 
 # Database configuration
 DB_TYPE = os.getenv("DB_TYPE", "auto")  # auto, mysql, sqlite
 DATABASE_PATH = os.getenv("DB_PATH", "notes.db")
 
+# SQLite tuning: one serialized writer connection per process, a pool of
+# read-only connections, and a periodic WAL checkpoint
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))  # ms
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))  # bytes
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -16000))  # <0: KiB
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", 4))
+SQLITE_CHECKPOINT_INTERVAL = float(os.getenv("SQLITE_CHECKPOINT_INTERVAL", 60))
+SQLITE_CHECKPOINT_MODE = os.getenv("SQLITE_CHECKPOINT_MODE", "PASSIVE")
+
 # MySQL configuration
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_USER = os.getenv("DB_USER", "notes_user")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "amr")
 DB_NAME = os.getenv("DB_NAME", "notes_db")
 DB_PORT = int(os.getenv("DB_PORT", 3306))
-
-# Current database type in use
-CURRENT_DB_TYPE = None
-
-
-# Database connection helper
-def get_mysql_connection():
-    """Get MySQL database connection"""
-    try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            charset="utf8mb4",
-            collation="utf8mb4_unicode_ci",
-        )
-        return conn
-    except Exception as err:
-        print(f"MySQL connection error: {err}")
-        return None
-
-
-def get_sqlite_connection():
-    """Get SQLite database connection"""
-    try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
-    except sqlite3.Error as err:
-        print(f"SQLite connection error: {err}")
+# Pure-Python driver: slower, but its socket I/O cooperates with gevent
+DB_MYSQL_USE_PURE = os.getenv("DB_MYSQL_USE_PURE", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Connection pool configuration
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Backend selection
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 3))
+DB_PROBE_INTERVAL = float(os.getenv("DB_PROBE_INTERVAL", 30))
+
+# MariaDB read replicas ("host[:port],..."); reads go to replicas at most
+# DB_REPLICA_MAX_LAG seconds behind, writes and everything else to DB_HOST
+DB_REPLICAS = parse_endpoints(os.getenv("DB_REPLICAS", ""), DB_PORT)
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", 5))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", 5))
+# After a write, the same client reads from the primary for this long
+DB_READ_STICKY_SECONDS = int(os.getenv("DB_READ_STICKY_SECONDS", 10))
+READ_PRIMARY_COOKIE = "notes_read_primary"
+
+
+def connect_mysql(host=DB_HOST, port=DB_PORT):
+    """Open a new raw MySQL connection"""
+    return mysql.connector.connect(
+        host=host,
+        port=port,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        charset="utf8mb4",
+        collation="utf8mb4_unicode_ci",
+        connection_timeout=DB_CONNECT_TIMEOUT,
+        use_pure=DB_MYSQL_USE_PURE,
+    )
+
+
+def sqlite_pragmas():
+    """Per-connection PRAGMAs from the SQLITE_* settings"""
+    return [
+        ("busy_timeout", SQLITE_BUSY_TIMEOUT),
+        ("synchronous", SQLITE_SYNCHRONOUS),
+        ("mmap_size", SQLITE_MMAP_SIZE),
+        ("cache_size", SQLITE_CACHE_SIZE),
+    ]
+
+
+def connect_sqlite():
+    """Open a new raw SQLite connection for writing"""
+    # Pooled connections are handed between request threads. IMMEDIATE takes
+    # the write lock at BEGIN, where busy_timeout can wait for it, instead of
+    # failing when a read transaction is upgraded.
+    conn = sqlite3.connect(
+        DATABASE_PATH, check_same_thread=False, isolation_level="IMMEDIATE"
+    )
+    conn.row_factory = sqlite3.Row
+    # The journal mode is stored in the database file; readers follow it
+    apply_pragmas(conn, [("journal_mode", SQLITE_JOURNAL_MODE)] + sqlite_pragmas())
+    return conn
+
+
+def connect_sqlite_readonly():
+    """Open a new raw read-only SQLite connection"""
+    conn = sqlite3.connect(
+        f"file:{DATABASE_PATH}?mode=ro", uri=True, check_same_thread=False
+    )
+    conn.row_factory = sqlite3.Row
+    apply_pragmas(conn, sqlite_pragmas())
+    return conn
+
+
+def ping_mysql(conn):
+    """Health check for pooled MySQL connections"""
+    conn.ping(reconnect=False)
+
+
+# Client errors meaning the server cannot be reached at all
+MYSQL_UNREACHABLE_ERRNOS = (2002, 2003, 2005, 2006, 2013, 2055)
+# Too many connections: the server is up but saturated, like an exhausted pool
+MYSQL_SATURATED_ERRNOS = (1040, 1203)
+
+
+def mysql_unreachable(err):
+    """Whether a checkout error means MySQL is down (trips the breaker)
+
+    Anything else (bad credentials, a saturated server) must not send
+    writes to the SQLite fallback.
+    """
+    errno = getattr(err, "errno", None)
+    if errno in MYSQL_SATURATED_ERRNOS:
+        return False
+    if errno in MYSQL_UNREACHABLE_ERRNOS or isinstance(err, OSError):
+        return True
+    return MYSQL_AVAILABLE and isinstance(
+        err,
+        (
+            mysql.connector.errors.InterfaceError,
+            mysql.connector.errors.OperationalError,
+        ),
+    )
+
+
+def make_pool(
+    db_type, factory, health_check=default_health_check, size=None, name=None
+):
+    """Build a connection pool using the DB_POOL_* settings"""
+    return ConnectionPool(
+        db_type,
+        factory,
+        max_size=size or DB_POOL_SIZE,
+        timeout=DB_POOL_TIMEOUT,
+        idle_timeout=DB_POOL_IDLE_TIMEOUT,
+        pre_ping=DB_POOL_PRE_PING,
+        health_check=health_check,
+        name=name,
+        observers=[
+            observer
+            for observer in (metrics, tracer if tracer.enabled else None)
+            if observer is not None
+        ],
+    )
+
+
+def make_replica_set(primary_pool):
+    """ReplicaSet over the DB_REPLICAS endpoints, or None if there are none"""
+    if not DB_REPLICAS:
         return None
+    pools = {
+        f"{host}:{port}": make_pool(
+            "mysql",
+            lambda host=host, port=port: connect_mysql(host, port),
+            ping_mysql,
+            name=f"mysql_replica_{host}_{port}",
+        )
+        for host, port in DB_REPLICAS
+    }
+    return ReplicaSet(
+        primary_pool,
+        pools,
+        max_lag=DB_REPLICA_MAX_LAG,
+        check_interval=DB_REPLICA_CHECK_INTERVAL,
+    )
+
+
+def make_mysql_backend():
+    pool = make_pool("mysql", connect_mysql, ping_mysql)
+    return Backend(
+        "mysql", pool, read_pool=make_replica_set(pool), is_outage=mysql_unreachable
+    )
+
+
+def make_backend_selector():
+    """Build the backend selector for the configured DB_TYPE"""
+    use_mysql = MYSQL_AVAILABLE and DB_TYPE in ("mysql", "auto")
+    primary = make_mysql_backend() if use_mysql else None
+    fallback = (
+        Backend(
+            "sqlite",
+            # SQLite allows one writer at a time; queue writers in the pool
+            # rather than on the database lock
+            make_pool("sqlite", connect_sqlite, size=1),
+            read_pool=make_pool(
+                "sqlite",
+                connect_sqlite_readonly,
+                size=SQLITE_READ_POOL_SIZE,
+                name="sqlite_read",
+            ),
+        )
+        if DB_TYPE != "mysql"
+        else None
+    )
+    if primary is None and fallback is None:
+        # DB_TYPE=mysql without the connector installed: fail on every request
+        primary = make_mysql_backend()
+    return BackendSelector(primary, fallback, probe_interval=DB_PROBE_INTERVAL)
+
+
+# Resolved once per process. Its startup probe, the replica checks and the
+# WAL checkpointer run in init_worker(), so importing this module (as the
+# CLIs do for its settings) starts no threads
+database = make_backend_selector()
+
+mysql_replicas = database.primary.read_pool if database.primary is not None else None
+
+sqlite_checkpointer = (
+    WalCheckpointer(
+        database.fallback.pool,
+        interval=SQLITE_CHECKPOINT_INTERVAL,
+        mode=SQLITE_CHECKPOINT_MODE,
+    )
+    if database.fallback is not None and SQLITE_JOURNAL_MODE.upper() == "WAL"
+    else None
+)
+
+
+def init_worker():
+    """Reset per-process DB state in a server worker and start its threads
+
+    Connections opened by a parent must not be shared across processes, and
+    its background threads do not exist in the child. Nothing is started at
+    import, since the first round of checks probes every replica
+    synchronously.
+    """
+    for backend in (database.primary, database.fallback):
+        if backend is not None:
+            for pool in backend.pools().values():
+                pool.dispose()
+    database.start()
+    if mysql_replicas is not None:
+        mysql_replicas.start()
+    if sqlite_checkpointer is not None:
+        sqlite_checkpointer.start()
+
+
+def reads_pinned_to_primary():
+    """True while this request's client must read its own recent writes
+
+    Set by a cookie on successful writes (see pin_reads_after_write), so it
+    holds across workers and only for the client that wrote.
+    """
+    return (
+        mysql_replicas is not None
+        and has_request_context()
+        and READ_PRIMARY_COOKIE in request.cookies
+        and database.current() is database.primary
+    )
 
 
-def get_db_connection():
-    """Get database connection - tries MySQL first, then SQLite"""
-    global CURRENT_DB_TYPE
-
-    # If DB_TYPE is specified, use that
-    if DB_TYPE == "mysql" and MYSQL_AVAILABLE:
-        conn = get_mysql_connection()
-        if conn:
-            CURRENT_DB_TYPE = "mysql"
-            return conn
-    elif DB_TYPE == "sqlite":
-        conn = get_sqlite_connection()
-        if conn:
-            CURRENT_DB_TYPE = "sqlite"
-            return conn
-    elif DB_TYPE == "auto":
-        # Try MySQL first if available
-        if MYSQL_AVAILABLE:
-            conn = get_mysql_connection()
-            if conn:
-                CURRENT_DB_TYPE = "mysql"
-                print("🎯 Connected to MySQL/MariaDB")
-                return conn
-
-        # Fallback to SQLite
-        conn = get_sqlite_connection()
-        if conn:
-            CURRENT_DB_TYPE = "sqlite"
-            print("🎯 Connected to SQLite")
-            return conn
-
-    return None
-
-
-# HTML Template with embedded CSS and JavaScript
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🗒️ Simple Note App - Interactive</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #0a0a0a 0%, #1a1a1a 25%, #000000 50%, #1a1a1a 75%, #0a0a0a 100%);
-            background-size: 400% 400%;
-            animation: gradientShift 15s ease infinite;
-            min-height: 100vh;
-            color: #ffffff;
-            overflow-x: hidden;
-        }
-
-        @keyframes gradientShift {
-            0% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-            100% { background-position: 0% 50%; }
-        }
-
-        /* Interactive background canvas */
-        #backgroundCanvas {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100vw;
-            height: 100vh;
-            pointer-events: auto;
-            z-index: 0;
-            cursor: crosshair;
-        }
-
-        /* Interactive background info */
-        .background-info {
-            position: fixed;
-            bottom: 10px;
-            left: 10px;
-            color: rgba(255, 255, 255, 0.3);
-            font-size: 12px;
-            pointer-events: none;
-            z-index: 200;
-        }
-
-
-
-        .btn {
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-            border: none;
-            padding: 14px 28px;
-            border-radius: 30px;
-            cursor: pointer;
-            font-size: 16px;
-            font-weight: 600;
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            box-shadow: 
-                0 6px 20px rgba(102, 126, 234, 0.4),
-                inset 0 1px 0 rgba(255, 255, 255, 0.2);
-            text-decoration: none;
-            display: inline-block;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .btn::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-            transition: left 0.6s ease;
-        }
-
-        .btn:hover::before {
-            left: 100%;
-        }
-
-        .btn:hover {
-            transform: translateY(-3px) scale(1.05);
-            box-shadow: 
-                0 10px 35px rgba(102, 126, 234, 0.6),
-                inset 0 1px 0 rgba(255, 255, 255, 0.3);
-            background: linear-gradient(135deg, #764ba2, #667eea);
-        }
-
-        .btn-danger {
-            background: linear-gradient(135deg, #ff6b6b, #ee5a24);
-            box-shadow: 
-                0 6px 20px rgba(255, 107, 107, 0.4),
-                inset 0 1px 0 rgba(255, 255, 255, 0.2);
-        }
-
-        .btn-danger:hover {
-            background: linear-gradient(135deg, #ee5a24, #ff6b6b);
-            box-shadow: 
-                0 10px 35px rgba(255, 107, 107, 0.6),
-                inset 0 1px 0 rgba(255, 255, 255, 0.3);
-        }
-
-        .container {
-            padding: 20px;
-            max-width: 100vw;
-            min-height: 100vh;
-            position: relative;
-        }
-
-        .note-card {
-            background: linear-gradient(145deg, 
-                rgba(255, 255, 255, 0.1), 
-                rgba(255, 255, 255, 0.05),
-                rgba(255, 255, 255, 0.02)
-            );
-            border-radius: 20px;
-            padding: 25px;
-            margin: 15px;
-            box-shadow: 
-                0 8px 32px rgba(0, 0, 0, 0.6),
-                inset 0 1px 1px rgba(255, 255, 255, 0.3),
-                inset 0 -1px 1px rgba(0, 0, 0, 0.1),
-                0 0 20px rgba(102, 126, 234, 0.3);
-            backdrop-filter: blur(25px) saturate(180%);
-            -webkit-backdrop-filter: blur(25px) saturate(180%);
-            border: 1px solid rgba(255, 255, 255, 0.18);
-            border-top: 1px solid rgba(255, 255, 255, 0.4);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-            position: absolute;
-            cursor: move;
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275), 
-                        z-index 0s, transform 0.2s ease;
-            min-width: 300px;
-            max-width: 380px;
-            word-wrap: break-word;
-            user-select: none;
-            color: #ffffff;
-            overflow: hidden;
-            z-index: 100;
-        }
-
-        .note-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, 
-                rgba(255, 255, 255, 0.3) 0%, 
-                rgba(255, 255, 255, 0.1) 20%, 
-                transparent 40%, 
-                transparent 60%, 
-                rgba(102, 126, 234, 0.05) 80%, 
-                rgba(102, 126, 234, 0.1) 100%
-            );
-            opacity: 0;
-            transition: opacity 0.3s ease;
-            pointer-events: none;
-            border-radius: 20px;
-        }
-
-        .note-card:hover {
-            transform: translateY(-10px) scale(1.02);
-            box-shadow: 
-                0 20px 60px rgba(0, 0, 0, 0.8),
-                inset 0 1px 2px rgba(255, 255, 255, 0.4),
-                inset 0 -1px 2px rgba(0, 0, 0, 0.15),
-                0 0 40px rgba(102, 126, 234, 0.6);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            border-top: 1px solid rgba(255, 255, 255, 0.6);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.15);
-            background: linear-gradient(145deg, 
-                rgba(255, 255, 255, 0.15), 
-                rgba(255, 255, 255, 0.08),
-                rgba(255, 255, 255, 0.04)
-            );
-        }
-
-        .note-card:hover::before {
-            opacity: 1;
-        }
-
-        .note-card.dragging {
-            transform: rotate(8deg) scale(1.08);
-            box-shadow: 
-                0 25px 80px rgba(0, 0, 0, 0.9),
-                inset 0 2px 4px rgba(255, 255, 255, 0.5),
-                inset 0 -2px 4px rgba(0, 0, 0, 0.2),
-                0 0 60px rgba(102, 126, 234, 0.8);
-            z-index: 1000;
-            border: 2px solid rgba(255, 255, 255, 0.4);
-            border-top: 2px solid rgba(255, 255, 255, 0.7);
-            border-bottom: 2px solid rgba(255, 255, 255, 0.2);
-            background: linear-gradient(145deg, 
-                rgba(255, 255, 255, 0.2), 
-                rgba(255, 255, 255, 0.1),
-                rgba(255, 255, 255, 0.05)
-            );
-            animation: pulse-glow 0.8s ease-in-out;
-        }
-
-        @keyframes pulse-glow {
-            0%, 100% {
-                box-shadow: 
-                    0 25px 80px rgba(0, 0, 0, 0.9),
-                    0 0 60px rgba(102, 126, 234, 0.8);
-            }
-            50% {
-                box-shadow: 
-                    0 25px 80px rgba(0, 0, 0, 0.9),
-                    0 0 80px rgba(102, 126, 234, 1);
-            }
-        }
-
-        .note-card:active {
-            transform: scale(0.98);
-            transition: transform 0.1s ease;
-        }
-
-        .note-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            margin-bottom: 20px;
-            border-bottom: 2px solid rgba(102, 126, 234, 0.3);
-            padding-bottom: 15px;
-            position: relative;
-        }
+# Database connection helper
+def get_db_connection(readonly=False):
+    """Get a pooled connection from the current backend
+
+    The connection's ``db_type`` ("mysql" or "sqlite") tells the caller
+    which SQL dialect to use. Pass ``readonly=True`` for requests that only
+    read, so they don't queue behind the SQLite writer and, on MariaDB, can
+    be served by a replica. Returns None if no backend is available.
+    """
+    if readonly and reads_pinned_to_primary():
+        readonly = False
+    return database.connect(readonly)
+
+
+# Note listing helpers
+NOTE_COLUMNS = ["id", "title", "content", "author", "created_at", "updated_at"]
+SNIPPET_LENGTH = int(os.getenv("NOTES_SNIPPET_LENGTH", 150))
+MAX_PAGE_SIZE = int(os.getenv("NOTES_MAX_PAGE_SIZE", 500))
+
+
+def field_expressions(db_type):
+    """SQL expression for every field a client can request via ?fields="""
+    length = "CHAR_LENGTH" if db_type == "mysql" else "LENGTH"
+    expressions = {column: column for column in NOTE_COLUMNS}
+    expressions["snippet"] = f"SUBSTR(content, 1, {SNIPPET_LENGTH})"
+    expressions["content_length"] = f"{length}(content)"
+    return expressions
+
+
+def parse_fields(raw):
+    """Parse ?fields=a,b,c into a list; None means all note columns"""
+    if not raw:
+        return list(NOTE_COLUMNS)
+    fields = [field.strip() for field in raw.split(",") if field.strip()]
+    unknown = set(fields) - set(field_expressions("sqlite"))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def parse_cursor(raw):
+    """Parse an ?after=<created_at>,<id> keyset cursor"""
+    created_at, _, note_id = raw.rpartition(",")
+    if not created_at or not note_id.isdigit():
+        raise ValueError("Invalid cursor, expected after=<created_at>,<id>")
+    return db_timestamp(created_at), int(note_id)
+
+
+# Optional schema features, detected once per process and backend
+SCHEMA_FEATURE_QUERIES = {
+    # Full-text index used by /api/search
+    "fts": {
+        "mysql": "SELECT COUNT(*) FROM information_schema.STATISTICS "
+        "WHERE table_schema = DATABASE() AND table_name = 'notes' "
+        "AND index_type = 'FULLTEXT'",
+        "sqlite": "SELECT COUNT(*) FROM sqlite_master "
+        "WHERE type = 'table' AND name = 'notes_fts'",
+    },
+    # Changelog used by /api/notes/changes
+    "changes": {
+        "mysql": "SELECT COUNT(*) FROM information_schema.TABLES "
+        "WHERE table_schema = DATABASE() AND table_name = 'note_changes'",
+        "sqlite": "SELECT COUNT(*) FROM sqlite_master "
+        "WHERE type = 'table' AND name = 'note_changes'",
+    },
+}
+
+# (db_type, feature) -> bool
+schema_features = {}
+
+
+def has_feature(conn, feature):
+    """Check whether the connection's database has an optional schema feature"""
+    key = (conn.db_type, feature)
+    if key not in schema_features:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(SCHEMA_FEATURE_QUERIES[feature][conn.db_type])
+            schema_features[key] = cursor.fetchone()[0] > 0
+        finally:
+            cursor.close()
+    return schema_features[key]
 
-        .note-header::after {
-            content: '';
-            position: absolute;
-            bottom: -2px;
-            left: 0;
-            width: 0;
-            height: 2px;
-            background: linear-gradient(90deg, #667eea, #764ba2);
-            transition: width 0.3s ease;
-        }
 
-        .note-card:hover .note-header::after {
-            width: 100%;
-        }
+# Schema migrations: auto (apply at startup), check (only report) or off
+DB_MIGRATE = os.getenv("DB_MIGRATE", "auto")
 
-        .note-title {
-            font-size: 1.4em;
-            font-weight: bold;
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            background-clip: text;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            color: #667eea;
-            margin-bottom: 8px;
-            line-height: 1.2;
-            text-shadow: 0 0 10px rgba(102, 126, 234, 0.3);
-        }
 
-        .note-author {
-            font-size: 0.95em;
-            color: #bbbbbb;
-            font-style: italic;
-            opacity: 0.8;
-            transition: opacity 0.3s ease;
-        }
+def run_migrations():
+    """Apply or check schema migrations on every reachable backend
 
-        .note-card:hover .note-author {
-            opacity: 1;
-            color: #dddddd;
-        }
+    The fallback is migrated too, so switching to it never finds a bare
+    database.
+    """
+    for backend in (database.primary, database.fallback):
+        if backend is None:
+            continue
+        if backend is database.primary and database.state == database.OPEN:
+            continue
+        try:
+            conn = backend.connect()
+        except Exception as err:
+            print(f"⚠️  Skipping {backend.name} migrations: {err}")
+            continue
+        try:
+            if DB_MIGRATE == "check":
+                for migration in migrations.pending_migrations(conn):
+                    print(
+                        f"⚠️  {backend.name} migration {migration['version']} "
+                        f"pending: {migration['name']} (run: python3 migrations.py upgrade)"
+                    )
+            else:
+                for migration in migrations.migrate(conn):
+                    print(
+                        f"✅ {backend.name} migration {migration['version']} "
+                        f"applied: {migration['name']}"
+                    )
+        except Exception as err:
+            print(f"❌ {backend.name} migrations failed: {err}")
+        finally:
+            conn.close()
+    # Optional features may have appeared
+    schema_features.clear()
+
+
+if DB_MIGRATE != "off":
+    run_migrations()
+
+
+# Full-text search
+SEARCH_LIMIT = int(os.getenv("NOTES_SEARCH_LIMIT", 100))
+# InnoDB's FULLTEXT index holds no words shorter than innodb_ft_min_token_size
+# and none of its stopwords, so a required term among them matches nothing
+SEARCH_MIN_TOKEN_SIZE = int(os.getenv("NOTES_SEARCH_MIN_TOKEN_SIZE", 3))
+INNODB_FT_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or "
+    "that the this to was what when where who will with und www".split()
+)
+
+
+def fts_expression(terms, db_type):
+    """Build a prefix-matching full-text query where every term must match
+
+    On MariaDB, terms the index cannot hold are left out. Returns None when
+    no term is left, and the caller falls back to a LIKE scan.
+    """
+    if db_type == "mysql":
+        terms = [
+            term
+            for term in terms
+            if len(term) >= SEARCH_MIN_TOKEN_SIZE
+            and term.lower() not in INNODB_FT_STOPWORDS
+        ]
+        if not terms:
+            return None
+        # Boolean mode: +term* = required term, prefix match
+        return " ".join(f"+{term}*" for term in terms)
+    # FTS5: "term"* = prefix match, terms are implicitly ANDed
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+# Change feed
+CHANGES_LIMIT = int(os.getenv("NOTES_CHANGES_LIMIT", 500))
+# MariaDB hands out versions in insert order, but transactions commit in any
+# order. A hole in the versions may be a change that is still in flight.
+# Holes younger than this are waited for; older ones were rolled back.
+CHANGES_SETTLE_SECONDS = int(os.getenv("NOTES_CHANGES_SETTLE_SECONDS", 10))
+CHANGES_SETTLE_SCAN = 256
+# Changelog entries kept; clients further behind get "reset"
+CHANGES_KEEP = int(os.getenv("NOTES_CHANGES_KEEP", 100000))
+CHANGES_PRUNE_INTERVAL = float(os.getenv("NOTES_CHANGES_PRUNE_INTERVAL", 3600))
+
+
+def current_version(conn):
+    """Latest changelog version, or None when the changelog is missing"""
+    if not has_feature(conn, "changes"):
+        return None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM note_changes")
+        return int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
 
-        .note-date {
-            font-size: 0.85em;
-            color: #999999;
-            text-align: right;
-            opacity: 0.7;
-            transition: all 0.3s ease;
-        }
 
-        .note-card:hover .note-date {
-            opacity: 1;
-            color: #bbbbbb;
-        }
+def settled_version(conn, latest=None):
+    """Version up to which every change is committed (or rolled back)
 
-        .note-content {
-            color: #e0e0e0;
-            line-height: 1.7;
-            margin: 20px 0;
-            white-space: pre-wrap;
-            transition: color 0.3s ease;
-        }
+    Clients resume from this rather than the latest version, so a change
+    committed late under a lower version is not skipped. SQLite has one
+    writer, so its versions commit in order. Returns None without a
+    changelog. Pass ``latest`` if it was just read.
+    """
+    if latest is None:
+        latest = current_version(conn)
+    if latest is None or conn.db_type != "mysql":
+        return latest
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT version, changed_at >= NOW() - INTERVAL %s SECOND "
+            "FROM note_changes ORDER BY version DESC LIMIT %s",
+            (CHANGES_SETTLE_SECONDS, CHANGES_SETTLE_SCAN),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
 
-        .note-card:hover .note-content {
-            color: #ffffff;
-        }
+    settled = latest
+    higher = None  # the next higher version, when it is recent
+    for version, recent in rows:
+        if higher is not None and higher > version + 1:
+            # The versions in between may still commit
+            settled = version
+        if not recent:
+            break
+        higher = version
+    return settled
 
-        .note-actions {
-            display: flex;
-            gap: 12px;
-            justify-content: flex-end;
-            margin-top: 20px;
-            border-top: 1px solid rgba(102, 126, 234, 0.2);
-            padding-top: 15px;
-            opacity: 0;
-            transform: translateY(10px);
-            transition: all 0.3s ease;
-        }
 
-        .note-card:hover .note-actions {
-            opacity: 1;
-            transform: translateY(0);
-        }
+def oldest_version(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MIN(version), 1) FROM note_changes")
+        return int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
 
-        .btn-small {
-            padding: 8px 16px;
-            font-size: 12px;
-            border-radius: 20px;
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            border: none;
-            color: white;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            position: relative;
-            overflow: hidden;
-        }
 
-        .btn-small::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-            transition: left 0.5s ease;
-        }
+def fetch_changes(conn, since, limit, fields):
+    """Change feed since a changelog version, or None without a changelog
 
-        .btn-small:hover::before {
-            left: 100%;
-        }
+    Returns the current state of each note changed after ``since``
+    ("upserts"), the ids of deleted notes ("deletes"), the version to resume
+    from and whether more changes are pending. Changes past the settled
+    version are held back until the versions below them have committed. A
+    version that is unknown (future) or already pruned from the changelog
+    yields {"version": settled, "reset": True}.
+    """
+    latest = current_version(conn)
+    if latest is None:
+        return None
+    settled = settled_version(conn, latest)
+    if since > latest or since < oldest_version(conn) - 1:
+        return {"version": settled, "reset": True}
 
-        .btn-small:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-        }
+    cursor = conn.cursor()
+    try:
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        expressions = field_expressions(conn.db_type)
+        # Latest change per note; the joined row is the note's current state
+        cursor.execute(
+            f"""
+            SELECT changes.note_id, changes.version, notes.id,
+                   {", ".join(expressions[field] for field in fields)}
+            FROM (
+                SELECT note_id, MAX(version) AS version FROM note_changes
+                WHERE version > {ph} AND version <= {ph}
+                  AND operation <> 'restore'
+                GROUP BY note_id
+            ) changes
+            LEFT JOIN notes ON notes.id = changes.note_id
+            ORDER BY changes.version
+            LIMIT {ph}
+            """,
+            (since, settled, limit),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
 
-        .modal {
-            display: none;
-            position: fixed;
-            z-index: 3000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(0, 0, 0, 0.8);
-            backdrop-filter: blur(10px);
-        }
+    upserts, deletes = [], []
+    to_note = note_mapper(fields)
+    for row in rows:
+        if row[2] is None:
+            deletes.append(row[0])
+        else:
+            upserts.append(to_note(row[3:]))
+    return {
+        "version": rows[-1][1] if rows else max(since, settled),
+        "upserts": upserts,
+        "deletes": deletes,
+        "has_more": len(rows) == limit,
+    }
+
+
+def prune_changes(conn, batch=10000):
+    """Drop changelog entries older than the newest CHANGES_KEEP
+
+    Deletes at most ``batch`` versions per call and commits. Returns True
+    once nothing is left to prune.
+    """
+    latest = current_version(conn)
+    if latest is None:
+        return True
+    cutoff = latest - CHANGES_KEEP
+    oldest = oldest_version(conn)
+    if cutoff < oldest:
+        return True
+    upto = min(cutoff, oldest + batch - 1)
+    cursor = conn.cursor()
+    try:
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        cursor.execute(f"DELETE FROM note_changes WHERE version <= {ph}", (upto,))
+        conn.commit()
+    finally:
+        cursor.close()
+    return upto == cutoff
 
-        .modal-content {
-            background: linear-gradient(145deg, 
-                rgba(255, 255, 255, 0.12), 
-                rgba(255, 255, 255, 0.08),
-                rgba(255, 255, 255, 0.04)
-            );
-            margin: 5% auto;
-            padding: 40px;
-            border-radius: 25px;
-            width: 90%;
-            max-width: 550px;
-            box-shadow: 
-                0 25px 80px rgba(0, 0, 0, 0.8),
-                inset 0 1px 2px rgba(255, 255, 255, 0.3),
-                inset 0 -1px 2px rgba(0, 0, 0, 0.1),
-                0 0 40px rgba(102, 126, 234, 0.4);
-            backdrop-filter: blur(30px) saturate(180%);
-            -webkit-backdrop-filter: blur(30px) saturate(180%);
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            border-top: 1px solid rgba(255, 255, 255, 0.5);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-            animation: modalSlideIn 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            color: #ffffff;
-        }
 
-        @keyframes modalSlideIn {
-            from { transform: translateY(-50px); opacity: 0; }
-            to { transform: translateY(0); opacity: 1; }
-        }
+def restart_changes(conn, past):
+    """Start the changelog over after a restore; returns the new version
 
-        .form-group {
-            margin-bottom: 20px;
-        }
+    A restore brings back the backup's changelog and may move the latest
+    version backwards. The restored entries are cleared and one marker is
+    left two versions above both ``past`` (the latest version before the
+    restore) and the restored latest version. Every version a client held
+    is then older than the changelog, so the feed answers with a reset, and
+    listing ETags never repeat one from before the restore.
+    """
+    latest = current_version(conn)
+    if latest is None:
+        return None
+    version = max(past or 0, latest) + 2
+    cursor = conn.cursor()
+    try:
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        cursor.execute("DELETE FROM note_changes")
+        cursor.execute(
+            f"INSERT INTO note_changes (version, note_id, operation) "
+            f"VALUES ({ph}, 0, 'restore')",
+            (version,),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+    return version
 
-        .form-group label {
-            display: block;
-            margin-bottom: 10px;
-            font-weight: 600;
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            background-clip: text;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            color: #667eea;
-        }
 
-        .form-group input,
-        .form-group textarea {
-            width: 100%;
-            padding: 15px;
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            border-top: 1px solid rgba(255, 255, 255, 0.4);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-            border-radius: 15px;
-            font-size: 14px;
-            background: linear-gradient(145deg, 
-                rgba(255, 255, 255, 0.08), 
-                rgba(255, 255, 255, 0.04),
-                rgba(255, 255, 255, 0.02)
-            );
-            backdrop-filter: blur(20px);
-            -webkit-backdrop-filter: blur(20px);
-            color: #ffffff;
-            transition: all 0.3s ease;
-        }
+# Streaming responses
+STREAM_BATCH_SIZE = int(os.getenv("NOTES_STREAM_BATCH_SIZE", 500))
 
-        .form-group input::placeholder,
-        .form-group textarea::placeholder {
-            color: rgba(255, 255, 255, 0.5);
-        }
 
-        .form-group input:focus,
-        .form-group textarea:focus {
-            outline: none;
-            border: 1px solid rgba(255, 255, 255, 0.4);
-            border-top: 1px solid rgba(255, 255, 255, 0.6);
-            border-bottom: 1px solid rgba(255, 255, 255, 0.2);
-            box-shadow: 
-                0 0 20px rgba(102, 126, 234, 0.4),
-                inset 0 1px 2px rgba(255, 255, 255, 0.2),
-                inset 0 -1px 2px rgba(0, 0, 0, 0.1);
-            background: linear-gradient(145deg, 
-                rgba(255, 255, 255, 0.12), 
-                rgba(255, 255, 255, 0.06),
-                rgba(255, 255, 255, 0.03)
-            );
-        }
+def requested_stream_format():
+    """Return "ndjson" or "json" when the client asked for a streamed body
 
-        .form-group textarea {
-            resize: vertical;
-            min-height: 120px;
-        }
+    Streaming is selected with ?format=ndjson, ?stream=1 (chunked JSON
+    array) or an "Accept: application/x-ndjson" header.
+    """
+    if request.args.get("format") == "ndjson":
+        return "ndjson"
+    if request.accept_mimetypes.best == "application/x-ndjson":
+        return "ndjson"
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return "json"
+    return None
 
 
+STREAM_MIMETYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def stream_notes(conn, cursor, fields, fmt):
+    """Stream an executed cursor as NDJSON, CSV or a JSON array
+
+    Rows are pulled with fetchmany(), so memory stays bounded by
+    STREAM_BATCH_SIZE regardless of the result size. The response owns the
+    cursor and connection and releases them when the WSGI server closes it,
+    whether the body was fully sent or the client went away.
+    """
+
+    to_note = note_mapper(fields)
+
+    def generate():
+        first = True
+        if fmt == "json":
+            yield "["
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+        while True:
+            rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+            if not rows:
+                break
+            if fmt == "csv":
+                writer.writerows(to_note(row).values() for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                continue
+            chunk = []
+            for row in rows:
+                encoded = app.json.dumps(to_note(row))
+                if fmt == "ndjson":
+                    chunk.append(encoded + "\n")
+                else:
+                    chunk.append(encoded if first else "," + encoded)
+                first = False
+            yield "".join(chunk)
+        if fmt == "json":
+            yield "]"
+
+    def release():
+        cursor.close()
+        conn.close()
 
-        .no-notes {
-            text-align: center;
-            color: rgba(255, 255, 255, 0.7);
-            font-size: 1.8em;
-            margin-top: 150px;
-            text-shadow: 0 0 20px rgba(102, 126, 234, 0.5);
-            animation: pulse 2s ease-in-out infinite alternate;
-        }
+    response = Response(generate(), mimetype=STREAM_MIMETYPES[fmt])
+    response.call_on_close(release)
+    return response
 
-        @keyframes pulse {
-            from { opacity: 0.7; }
-            to { opacity: 1; }
-        }
 
-        .floating-btn {
-            position: fixed;
-            bottom: 30px;
-            right: 30px;
-            width: 70px;
-            height: 70px;
-            border-radius: 50%;
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            color: white;
-            border: none;
-            font-size: 28px;
-            cursor: pointer;
-            box-shadow: 
-                0 10px 30px rgba(0, 0, 0, 0.6),
-                0 0 20px rgba(102, 126, 234, 0.4);
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            z-index: 200;
-            animation: float 3s ease-in-out infinite;
-        }
+# Bulk import
+BULK_BATCH_SIZE = int(os.getenv("NOTES_BULK_BATCH_SIZE", 500))
+BULK_REQUIRED_FIELDS = ("title", "content", "author")
 
-        @keyframes float {
-            0%, 100% { transform: translateY(0px); }
-            50% { transform: translateY(-10px); }
-        }
 
-        /* Top note card highlight */
-        .note-card.top-card {
-            box-shadow: 
-                0 8px 32px rgba(0, 0, 0, 0.6),
-                inset 0 1px 1px rgba(255, 255, 255, 0.4),
-                inset 0 -1px 1px rgba(0, 0, 0, 0.1),
-                0 0 30px rgba(102, 126, 234, 0.5),
-                0 0 60px rgba(102, 126, 234, 0.2);
-            border: 1px solid rgba(255, 255, 255, 0.25);
-            border-top: 1px solid rgba(255, 255, 255, 0.5);
-        }
+def bulk_timestamp(record, field, default):
+    """Optional ISO 8601 timestamp of an imported note"""
+    value = record.get(field)
+    if value is None:
+        return default
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an ISO 8601 timestamp")
+    if parsed.tzinfo is not None:
+        # Stored timestamps are naive server-local time
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def parse_bulk_note(record, now):
+    """Validate one imported note and return its INSERT parameters
+
+    Keys other than the note fields (such as an exported "id") are ignored,
+    so an export can be imported as-is.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    missing = [key for key in BULK_REQUIRED_FIELDS if key not in record]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    for key in BULK_REQUIRED_FIELDS:
+        if not isinstance(record[key], str):
+            raise ValueError(f"{key} must be a string")
+    created_at = bulk_timestamp(record, "created_at", now)
+    updated_at = bulk_timestamp(record, "updated_at", created_at)
+    return (
+        record["title"],
+        record["content"],
+        record["author"],
+        created_at,
+        updated_at,
+    )
+
+
+def insert_notes(rows):
+    """Insert rows in one transaction; returns their ids in order
+
+    Each row is its own INSERT and its id is read back from lastrowid, as
+    a batch's ids need not be consecutive: with innodb_autoinc_lock_mode=2
+    concurrent inserts interleave, auto_increment_increment > 1 (Galera)
+    spaces them out, and triggers may insert rows of their own. The single
+    commit per batch is what the batching saves.
+
+    Calls notes_changed() with its connection once the batch is committed.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
 
-        .floating-btn:hover {
-            transform: scale(1.15) translateY(-5px);
-            box-shadow: 
-                0 15px 40px rgba(0, 0, 0, 0.8),
-                0 0 30px rgba(102, 126, 234, 0.6);
-            background: linear-gradient(135deg, #764ba2, #667eea);
-        }
+    cursor = conn.cursor()
+    try:
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        statement = (
+            "INSERT INTO notes (title, content, author, created_at, updated_at) "
+            f"VALUES ({ph}, {ph}, {ph}, {ph}, {ph})"
+        )
+        ids = []
+        for row in rows:
+            cursor.execute(statement, row)
+            ids.append(cursor.lastrowid)
+        conn.commit()
+        notes_changed(conn)
+        return ids
+    finally:
+        cursor.close()
+        conn.close()
 
-        .floating-btn:active {
-            transform: scale(0.95);
-        }
 
-        @media (max-width: 768px) {
-            .note-card {
-                min-width: 250px;
-                max-width: 300px;
-                margin: 10px;
-            }
-        }
-    </style>
-</head>
-<body>
-
-    <!-- Interactive background canvas -->
-    <canvas id="backgroundCanvas"></canvas>
-  
-    <div class="container" id="notesContainer">
-        <!-- Notes will be loaded here -->
-    </div>
-
-    <div class="background-info">
-        Click on empty space to create polygons! 🔮
-    </div>
-
-    <button class="floating-btn" onclick="showAddModal()" title="Add New Note">+</button>
-
-    <!-- Add/Edit Note Modal -->
-    <div id="noteModal" class="modal">
-        <div class="modal-content">
-            <h2 id="modalTitle" style="background: linear-gradient(135deg, #667eea, #764ba2); background-clip: text; -webkit-background-clip: text; -webkit-text-fill-color: transparent; color: #667eea; margin-bottom: 25px;">➕ Add New Note</h2>
-            <form id="noteForm">
-                <input type="hidden" id="noteId" value="">
-                <div class="form-group">
-                    <label for="title">📌 Title:</label>
-                    <input type="text" id="title" name="title" required maxlength="255">
-                </div>
-                <div class="form-group">
-                    <label for="author">👤 Author:</label>
-                    <input type="text" id="author" name="author" required maxlength="100">
-                </div>
-                <div class="form-group">
-                    <label for="content">📄 Content:</label>
-                    <textarea id="content" name="content" required placeholder="Write your note content here..."></textarea>
-                </div>
-                <div style="text-align: right; margin-top: 25px;">
-                    <button type="button" class="btn btn-danger" onclick="closeModal()">❌ Cancel</button>
-                    <button type="submit" class="btn">💾 Save Note</button>
-                </div>
-            </form>
-        </div>
-    </div>
-
-    <script>
-        let notes = [];
-        let isDragging = false;
-        let currentNote = null;
-        let offset = { x: 0, y: 0 };
-
-        // Interactive background system
-        let canvas, ctx;
-        let nodes = [];
-        let polygons = [];
-        let mouse = { x: 0, y: 0 };
-        let animationId;
-
-        // Z-index management for note cards
-        let highestZIndex = 100;
-
-        // Load notes on page load
-        document.addEventListener('DOMContentLoaded', function() {
-            loadNotes();
-            initInteractiveBackground();
-        });
-
-        // Initialize interactive background
-        function initInteractiveBackground() {
-            canvas = document.getElementById('backgroundCanvas');
-            if (!canvas) {
-                console.error('Canvas not found!');
-                return;
-            }
-            
-            ctx = canvas.getContext('2d');
-            if (!ctx) {
-                console.error('Could not get canvas context!');
-                return;
-            }
-            
-            resizeCanvas();
-            createNodes();
-            animate();
-            
-            // Event listeners
-            window.addEventListener('resize', resizeCanvas);
-            canvas.addEventListener('mousemove', updateMouse);
-            canvas.addEventListener('click', createPolygonOnClick);
-            
-            // Also listen on document for backup
-            document.addEventListener('mousemove', updateMouseGlobal);
-            document.addEventListener('click', handleGlobalClick);
-            
-            console.log('Interactive background initialized!');
-        }
+# Bulk update / delete
+BULK_UPDATE_FIELDS = ("title", "content", "author")
+
+
+def parse_bulk_target(data):
+    """Parse which notes a bulk update or delete applies to
+
+    The body names them with exactly one of:
+    - "ids": [1, 2, ...]
+    - "notes": [{"id": 1, "updated_at": "..."}, ...] for optimistic
+      concurrency: a note only changes if its updated_at still matches
+    - "filter": {"author": "...", "created_before": "<ISO 8601>"}
+
+    Returns (ids, expected, conditions): expected maps id -> updated_at
+    (None without concurrency checks) and conditions are the filter's
+    (column, operator, value) triples.
+    """
+    given = [key for key in ("ids", "notes", "filter") if key in data]
+    if len(given) != 1:
+        raise ValueError("Pass exactly one of ids, notes or filter")
+
+    if "filter" in data:
+        filters = data["filter"]
+        if not isinstance(filters, dict) or not filters:
+            raise ValueError("filter needs author and/or created_before")
+        unknown = set(filters) - {"author", "created_before"}
+        if unknown:
+            raise ValueError(f"Unknown filter: {', '.join(sorted(unknown))}")
+        conditions = []
+        if "author" in filters:
+            if not isinstance(filters["author"], str):
+                raise ValueError("author must be a string")
+            conditions.append(("author", "=", filters["author"]))
+        if "created_before" in filters:
+            before = bulk_timestamp(filters, "created_before", None)
+            conditions.append(("created_at", "<", before))
+        return None, None, conditions
+
+    if "notes" in data:
+        notes = data["notes"]
+        if not isinstance(notes, list) or not notes:
+            raise ValueError("notes must be a non-empty list")
+        expected = {}
+        for note in notes:
+            if not (
+                isinstance(note, dict)
+                and type(note.get("id")) is int
+                and isinstance(note.get("updated_at"), str)
+            ):
+                raise ValueError("Each note needs an integer id and updated_at")
+            expected[note["id"]] = iso_timestamp(note["updated_at"])
+        return list(expected), expected, []
+
+    ids = data["ids"]
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("ids must be a non-empty list")
+    if not all(type(note_id) is int for note_id in ids):
+        raise ValueError("ids must be integers")
+    return list(dict.fromkeys(ids)), None, []
+
+
+def filtered_note_ids(conditions, after_id, limit):
+    """Next ``limit`` ids above ``after_id`` that match a bulk filter"""
+    conn = get_db_connection(readonly=True)
+    if not conn:
+        raise ConnectionError("Database connection failed")
 
-        // Global mouse tracking as backup
-        function updateMouseGlobal(e) {
-            mouse.x = e.clientX;
-            mouse.y = e.clientY;
-        }
+    cursor = conn.cursor()
+    try:
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        where = "".join(f" AND {column} {op} {ph}" for column, op, _ in conditions)
+        cursor.execute(
+            f"SELECT id FROM notes WHERE id > {ph}{where} ORDER BY id LIMIT {ph}",
+            [after_id] + [value for _, _, value in conditions] + [limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
 
-        // Handle clicks on the document
-        function handleGlobalClick(e) {
-            // Only handle if clicking on the background (not on UI elements)
-            const elementUnderMouse = document.elementFromPoint(e.clientX, e.clientY);
-            if (elementUnderMouse && elementUnderMouse.id === 'backgroundCanvas') {
-                createPolygonOnClick(e);
-            }
-        }
 
-        // Resize canvas to fill window
-        function resizeCanvas() {
-            canvas.width = window.innerWidth;
-            canvas.height = window.innerHeight;
-        }
+def modify_notes(ids, statement, params, conditions=(), expected=None):
+    """Run one set-based UPDATE/DELETE over a chunk of ids in a transaction
 
-        // Update mouse position
-        function updateMouse(e) {
-            mouse.x = e.clientX;
-            mouse.y = e.clientY;
-            
-            // Visual feedback - change cursor style based on nearby nodes
-            const nearbyNodes = nodes.filter(node => {
-                const dx = node.x - mouse.x;
-                const dy = node.y - mouse.y;
-                return Math.sqrt(dx * dx + dy * dy) < 150;
-            });
-            
-            if (nearbyNodes.length >= 3) {
-                canvas.style.cursor = 'pointer';
-            } else {
-                canvas.style.cursor = 'crosshair';
-            }
-        }
+    ``statement`` is "DELETE FROM notes" or an "UPDATE notes SET ..." whose
+    placeholders are written as {ph} and filled from ``params``. The filter
+    ``conditions`` are checked again here, so a note edited since it was
+    selected is left alone. With ``expected`` (id -> updated_at) the rows
+    are locked and compared first, and only unchanged notes are modified.
+    Calls notes_changed() with its connection if any note changed.
 
-        // Create floating nodes
-        function createNodes() {
-            const nodeCount = Math.floor((window.innerWidth * window.innerHeight) / 15000);
-            nodes = [];
-            
-            for (let i = 0; i < nodeCount; i++) {
-                nodes.push({
-                    x: Math.random() * canvas.width,
-                    y: Math.random() * canvas.height,
-                    vx: (Math.random() - 0.5) * 0.5,
-                    vy: (Math.random() - 0.5) * 0.5,
-                    radius: Math.random() * 2 + 1,
-                    originalRadius: Math.random() * 2 + 1,
-                    opacity: Math.random() * 0.5 + 0.3
-                });
-            }
-        }
+    Returns (affected, conflicts, not_found).
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
 
-        // Create polygon on mouse click
-        function createPolygonOnClick(e) {
-            // Don't create polygons if clicking on a note card or modal
-            const elementUnderMouse = document.elementFromPoint(e.clientX, e.clientY);
-            if (elementUnderMouse && (
-                elementUnderMouse.closest('.note-card') || 
-                elementUnderMouse.closest('.modal') ||
-                elementUnderMouse.closest('.floating-btn')
-            )) {
-                return;
-            }
+    cursor = conn.cursor()
+    try:
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        conflicts = []
+        not_found = []
+        if expected is not None:
+            marks = ", ".join([ph] * len(ids))
+            if conn.db_type == "mysql":
+                lock = " FOR UPDATE"
+            else:
+                # Take the write lock before reading what we compare against
+                cursor.execute("BEGIN IMMEDIATE")
+                lock = ""
+            cursor.execute(
+                f"SELECT id, updated_at FROM notes WHERE id IN ({marks}){lock}", ids
+            )
+            current = {row[0]: iso_timestamp(row[1]) for row in cursor.fetchall()}
+            not_found = [note_id for note_id in ids if note_id not in current]
+            conflicts = [
+                note_id
+                for note_id in ids
+                if note_id in current and current[note_id] != expected[note_id]
+            ]
+            ids = [
+                note_id
+                for note_id in ids
+                if note_id in current and current[note_id] == expected[note_id]
+            ]
+
+        affected = 0
+        if ids:
+            marks = ", ".join([ph] * len(ids))
+            where = "".join(f" AND {column} {op} {ph}" for column, op, _ in conditions)
+            cursor.execute(
+                statement.format(ph=ph) + f" WHERE id IN ({marks}){where}",
+                list(params) + ids + [value for _, _, value in conditions],
+            )
+            affected = cursor.rowcount
+        conn.commit()
+        if affected:
+            notes_changed(conn)
+        return affected, conflicts, not_found
+    finally:
+        cursor.close()
+        conn.close()
 
-            const clickRadius = 150;
-            const nearbyNodes = nodes.filter(node => {
-                const dx = node.x - mouse.x;
-                const dy = node.y - mouse.y;
-                return Math.sqrt(dx * dx + dy * dy) < clickRadius;
-            });
-
-            if (nearbyNodes.length >= 3) {
-                // Sort nodes by angle from click point to create a proper polygon
-                nearbyNodes.sort((a, b) => {
-                    const angleA = Math.atan2(a.y - mouse.y, a.x - mouse.x);
-                    const angleB = Math.atan2(b.y - mouse.y, b.x - mouse.x);
-                    return angleA - angleB;
-                });
-
-                const polygon = {
-                    nodes: nearbyNodes.slice(0, Math.min(8, nearbyNodes.length)),
-                    life: 120,
-                    maxLife: 120,
-                    pulsePhase: 0
-                };
-                
-                polygons.push(polygon);
-                
-                // Create ripple effect
-                createRipple(mouse.x, mouse.y);
-                
-                // Add screen shake effect
-                document.body.style.animation = 'shake 0.3s ease-in-out';
-                setTimeout(() => {
-                    document.body.style.animation = '';
-                }, 300);
-                
-                // Visual feedback
-                console.log(`Polygon created with ${polygon.nodes.length} nodes!`);
-                
-                // Create multiple ripples for better effect
-                setTimeout(() => createRipple(mouse.x, mouse.y), 200);
-                setTimeout(() => createRipple(mouse.x, mouse.y), 400);
-            }
-        }
 
-        // Add shake animation
-        const shakeStyle = document.createElement('style');
-        shakeStyle.textContent = `
-            @keyframes shake {
-                0%, 100% { transform: translateX(0); }
-                25% { transform: translateX(-2px); }
-                75% { transform: translateX(2px); }
-            }
-        `;
-        document.head.appendChild(shakeStyle);
-
-        // Create ripple effect
-        function createRipple(x, y) {
-            const ripple = {
-                x: x,
-                y: y,
-                radius: 0,
-                maxRadius: 200,
-                life: 60,
-                maxLife: 60
-            };
-            
-            const animateRipple = () => {
-                ripple.life--;
-                ripple.radius += 4;
-                
-                if (ripple.life > 0) {
-                    requestAnimationFrame(animateRipple);
-                }
-            };
-            
-            animateRipple();
-            polygons.push(ripple);
-        }
+def run_bulk_modification(data, statement, params):
+    """Apply a bulk update/delete chunk by chunk and build the response
 
-        // Animation loop
-        function animate() {
-            ctx.clearRect(0, 0, canvas.width, canvas.height);
-            
-            // Update and draw nodes
-            updateNodes();
-            drawNodes();
-            drawConnections();
-            
-            // Update and draw polygons
-            updatePolygons();
-            drawPolygons();
-            
-            // Draw mouse connections
-            drawMouseConnections();
-            
-            animationId = requestAnimationFrame(animate);
-        }
+    Each chunk of NOTES_BULK_BATCH_SIZE notes is its own transaction, so a
+    large cleanup never holds the write lock for long.
+    """
+    try:
+        ids, expected, conditions = parse_bulk_target(data)
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    result = {"affected": 0}
+    if expected is not None:
+        result["conflicts"] = []
+        result["not_found"] = []
+    try:
+        if ids is None:
+            last_id = 0
+            while True:
+                chunk = filtered_note_ids(conditions, last_id, BULK_BATCH_SIZE)
+                if not chunk:
+                    break
+                last_id = chunk[-1]
+                affected, _, _ = modify_notes(chunk, statement, params, conditions)
+                result["affected"] += affected
+        else:
+            for start in range(0, len(ids), BULK_BATCH_SIZE):
+                chunk = ids[start : start + BULK_BATCH_SIZE]
+                chunk_expected = (
+                    {note_id: expected[note_id] for note_id in chunk}
+                    if expected is not None
+                    else None
+                )
+                affected, conflicts, not_found = modify_notes(
+                    chunk, statement, params, expected=chunk_expected
+                )
+                result["affected"] += affected
+                if expected is not None:
+                    result["conflicts"].extend(conflicts)
+                    result["not_found"].extend(not_found)
+        return jsonify(result)
+    except PoolTimeout as err:
+        response = jsonify(dict(result, error=str(err)))
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    except Exception as err:
+        # Chunks committed before the failure stay applied
+        return jsonify(dict(result, error=str(err))), 500
 
-        // Update node positions
-        function updateNodes() {
-            nodes.forEach(node => {
-                // Move nodes
-                node.x += node.vx;
-                node.y += node.vy;
-                
-                // Bounce off edges
-                if (node.x < 0 || node.x > canvas.width) node.vx *= -1;
-                if (node.y < 0 || node.y > canvas.height) node.vy *= -1;
-                
-                // Keep nodes in bounds
-                node.x = Math.max(0, Math.min(canvas.width, node.x));
-                node.y = Math.max(0, Math.min(canvas.height, node.y));
-                
-                // Mouse attraction effect
-                const dx = mouse.x - node.x;
-                const dy = mouse.y - node.y;
-                const distance = Math.sqrt(dx * dx + dy * dy);
-                
-                if (distance < 100) {
-                    const force = (100 - distance) / 100;
-                    node.radius = node.originalRadius * (1 + force);
-                    node.opacity = Math.min(1, node.opacity + force * 0.3);
-                } else {
-                    node.radius = node.originalRadius;
-                    node.opacity = Math.max(0.3, node.opacity - 0.02);
-                }
-            });
-        }
 
-        // Draw nodes
-        function drawNodes() {
-            nodes.forEach(node => {
-                ctx.beginPath();
-                ctx.arc(node.x, node.y, node.radius, 0, Math.PI * 2);
-                ctx.fillStyle = `rgba(102, 126, 234, ${node.opacity})`;
-                ctx.fill();
-                
-                // Add glow effect
-                ctx.beginPath();
-                ctx.arc(node.x, node.y, node.radius * 2, 0, Math.PI * 2);
-                ctx.fillStyle = `rgba(102, 126, 234, ${node.opacity * 0.2})`;
-                ctx.fill();
-            });
-        }
+# Conditional requests (ETag / If-None-Match, Last-Modified)
+def parse_timestamp(value):
+    """Turn a DB timestamp (datetime or text) into an aware datetime"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    # Naive timestamps are written in the server's local time
+    return value.astimezone(timezone.utc)
 
-        // Draw connections between nearby nodes
-        function drawConnections() {
-            const maxDistance = 120;
-            
-            for (let i = 0; i < nodes.length; i++) {
-                for (let j = i + 1; j < nodes.length; j++) {
-                    const dx = nodes[i].x - nodes[j].x;
-                    const dy = nodes[i].y - nodes[j].y;
-                    const distance = Math.sqrt(dx * dx + dy * dy);
-                    
-                    if (distance < maxDistance) {
-                        const opacity = (1 - distance / maxDistance) * 0.3;
-                        
-                        ctx.beginPath();
-                        ctx.moveTo(nodes[i].x, nodes[i].y);
-                        ctx.lineTo(nodes[j].x, nodes[j].y);
-                        ctx.strokeStyle = `rgba(102, 126, 234, ${opacity})`;
-                        ctx.lineWidth = 1;
-                        ctx.stroke();
-                    }
-                }
-            }
-        }
 
-        // Draw mouse connections
-        function drawMouseConnections() {
-            const maxDistance = 150;
-            
-            nodes.forEach(node => {
-                const dx = mouse.x - node.x;
-                const dy = mouse.y - node.y;
-                const distance = Math.sqrt(dx * dx + dy * dy);
-                
-                if (distance < maxDistance) {
-                    const opacity = (1 - distance / maxDistance) * 0.5;
-                    
-                    ctx.beginPath();
-                    ctx.moveTo(mouse.x, mouse.y);
-                    ctx.lineTo(node.x, node.y);
-                    ctx.strokeStyle = `rgba(118, 75, 162, ${opacity})`;
-                    ctx.lineWidth = 2;
-                    ctx.stroke();
-                }
-            });
-        }
+def listing_validator():
+    """Cheap fingerprint of the notes table, or None if the DB is down
 
-        // Update polygons
-        function updatePolygons() {
-            for (let i = polygons.length - 1; i >= 0; i--) {
-                const polygon = polygons[i];
-                polygon.life--;
-                polygon.pulsePhase += 0.1;
-                
-                if (polygon.life <= 0) {
-                    polygons.splice(i, 1);
-                }
-            }
-        }
+    With the changelog this is its latest version, which moves on every
+    write. Without it, row count and MAX(id) change on every insert and
+    delete, and MAX(updated_at) changes on every edit. Read once per
+    request: the response cache and the ETag share it.
+    """
+    if "listing_validator" not in g:
+        g.listing_validator = read_listing_validator()
+    return g.listing_validator
 
-        // Draw polygons
-        function drawPolygons() {
-            polygons.forEach(polygon => {
-                if (polygon.maxRadius) {
-                    // Draw ripple effect
-                    const progress = 1 - polygon.life / polygon.maxLife;
-                    const opacity = polygon.life / polygon.maxLife;
-                    
-                    ctx.beginPath();
-                    ctx.arc(polygon.x, polygon.y, polygon.radius, 0, Math.PI * 2);
-                    ctx.strokeStyle = `rgba(102, 126, 234, ${opacity * 0.8})`;
-                    ctx.lineWidth = 3;
-                    ctx.stroke();
-                    
-                    ctx.beginPath();
-                    ctx.arc(polygon.x, polygon.y, polygon.radius * 0.7, 0, Math.PI * 2);
-                    ctx.strokeStyle = `rgba(118, 75, 162, ${opacity * 0.6})`;
-                    ctx.lineWidth = 2;
-                    ctx.stroke();
-                } else if (polygon.nodes) {
-                    // Draw polygon
-                    const opacity = polygon.life / polygon.maxLife;
-                    const pulse = Math.sin(polygon.pulsePhase) * 0.3 + 0.7;
-                    
-                    // Fill polygon
-                    ctx.beginPath();
-                    ctx.moveTo(polygon.nodes[0].x, polygon.nodes[0].y);
-                    for (let i = 1; i < polygon.nodes.length; i++) {
-                        ctx.lineTo(polygon.nodes[i].x, polygon.nodes[i].y);
-                    }
-                    ctx.closePath();
-                    ctx.fillStyle = `rgba(102, 126, 234, ${opacity * 0.1 * pulse})`;
-                    ctx.fill();
-                    
-                    // Draw polygon outline
-                    ctx.strokeStyle = `rgba(102, 126, 234, ${opacity * 0.6 * pulse})`;
-                    ctx.lineWidth = 2;
-                    ctx.stroke();
-                    
-                    // Draw connecting lines to center
-                    const centerX = polygon.nodes.reduce((sum, node) => sum + node.x, 0) / polygon.nodes.length;
-                    const centerY = polygon.nodes.reduce((sum, node) => sum + node.y, 0) / polygon.nodes.length;
-                    
-                    polygon.nodes.forEach(node => {
-                        ctx.beginPath();
-                        ctx.moveTo(centerX, centerY);
-                        ctx.lineTo(node.x, node.y);
-                        ctx.strokeStyle = `rgba(118, 75, 162, ${opacity * 0.4 * pulse})`;
-                        ctx.lineWidth = 1;
-                        ctx.stroke();
-                    });
-                    
-                    // Draw center point
-                    ctx.beginPath();
-                    ctx.arc(centerX, centerY, 4 * pulse, 0, Math.PI * 2);
-                    ctx.fillStyle = `rgba(118, 75, 162, ${opacity * pulse})`;
-                    ctx.fill();
-                }
-            });
-        }
 
-        // Load all notes from server
-        async function loadNotes() {
-            try {
-                const response = await fetch('/api/notes');
-                notes = await response.json();
-                displayNotes();
-                updateStats();
-            } catch (error) {
-                console.error('Error loading notes:', error);
-                document.getElementById('notesContainer').innerHTML = 
-                    '<div class="no-notes">❌ Error loading notes. Please refresh the page.</div>';
-            }
-        }
+def read_listing_validator():
+    conn = get_db_connection(readonly=True)
+    if not conn:
+        return None
+    try:
+        version = current_version(conn)
+        if version is not None:
+            return f"v{version}"
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*), MAX(id), MAX(updated_at) FROM notes")
+            return "|".join(str(value) for value in cursor.fetchone())
+        finally:
+            cursor.close()
+    except Exception:
+        return None
+    finally:
+        conn.close()
 
-        // Display notes as draggable cards
-        function displayNotes(filteredNotes = null) {
-            const container = document.getElementById('notesContainer');
-            const notesToShow = filteredNotes || notes;
-            
-            if (notesToShow.length === 0) {
-                container.innerHTML = '<div class="no-notes">📝 No notes found. Create your first note!</div>';
-                return;
-            }
 
-            let html = '';
-            notesToShow.forEach((note, index) => {
-                const left = 50 + (index % 4) * 320;
-                const top = 100 + Math.floor(index / 4) * 300;
-                
-                html += `
-                    <div class="note-card" 
-                         id="note-${note.id}" 
-                         style="left: ${left}px; top: ${top}px; z-index: ${100 + index};"
-                         onmousedown="startDrag(event, ${note.id})"
-                         onclick="bringToFront(this)"
-                         ondragstart="return false;">
-                        <div class="note-header">
-                            <div>
-                                <div class="note-title">${escapeHtml(note.title)}</div>
-                                <div class="note-author">by ${escapeHtml(note.author)}</div>
-                            </div>
-                            <div class="note-date">${formatDate(note.created_at)}</div>
-                        </div>
-                        <div class="note-content">${escapeHtml(note.content).substring(0, 150)}${note.content.length > 150 ? '...' : ''}</div>
-                        <div class="note-actions">
-                            <button class="btn btn-small" onclick="viewNote(${note.id})">👁️ View</button>
-                            <button class="btn btn-small" onclick="editNote(${note.id})">✏️ Edit</button>
-                            <button class="btn btn-small btn-danger" onclick="deleteNote(${note.id})">🗑️ Delete</button>
-                        </div>
-                    </div>
-                `;
-            });
-            
-            container.innerHTML = html;
-            updateHighestZIndex(); // Update z-index tracking
-            
-            // Set the most recent note (first in the list) as the top card initially
-            if (notesToShow.length > 0) {
-                const firstCard = document.getElementById(`note-${notesToShow[0].id}`);
-                if (firstCard) {
-                    bringToFront(firstCard);
-                }
+def not_modified(etag):
+    """304 response carrying the validator the client already has"""
+    response = app.response_class(status=304)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def conditional_listing(view):
+    """Tag a listing with an ETag and answer If-None-Match with 304
+
+    The ETag covers both the table state and the query string, and is
+    computed before the view runs: if a write slips in between, the client
+    gets a newer body under an older tag, which only costs a refetch.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if requested_stream_format():
+            return view(*args, **kwargs)
+
+        validator = listing_validator()
+        if validator is None:
+            return view(*args, **kwargs)
+        etag = hashlib.sha1(
+            f"{request.full_path}|{validator}".encode("utf-8")
+        ).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return wrapper
+
+
+# Response cache for note listings and search results
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_TTL = float(os.getenv("CACHE_TTL", 30))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 256))
+CACHE_URL = os.getenv("CACHE_URL", "")  # e.g. redis://localhost:6379/0
+CACHED_HEADERS = (
+    "Content-Type",
+    "X-Next-Cursor",
+    "X-Notes-Version",
+    "Link",
+    "ETag",
+    "Cache-Control",
+)
+
+
+def make_response_cache():
+    """Shared Redis cache when CACHE_URL is set, in-process LRU otherwise"""
+    if CACHE_URL:
+        try:
+            return RedisCache(CACHE_URL, ttl=CACHE_TTL)
+        except RuntimeError as err:
+            print(f"⚠️  Shared cache unavailable ({err}). Using in-process cache.")
+    return LocalCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+
+
+response_cache = make_response_cache()
+
+
+def cached_listing(view):
+    """Serve a GET view from the response cache
+
+    Entries are keyed by the listing validator as well as path and query,
+    so a hit costs one changelog version lookup instead of the query, and
+    a write made by any worker retires every older entry, even in another
+    process's in-memory cache. Streamed responses and errors are never
+    cached. Write routes also invalidate it via notes_changed(). Clients
+    pinned to the primary after a write bypass it.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if (
+            not CACHE_ENABLED
+            or requested_stream_format()
+            # Must see its own write: neither read nor fill the cache
+            or reads_pinned_to_primary()
+        ):
+            return view(*args, **kwargs)
+        validator = listing_validator()
+        if validator is None:
+            return view(*args, **kwargs)
+
+        key = f"{validator}|{request.full_path}"
+        entry = response_cache.get(key)
+        if entry is not None:
+            etag = entry["headers"].get("ETag")
+            if etag and request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+                response = not_modified(unquote_etag(etag)[0])
+            else:
+                response = app.response_class(entry["body"], headers=entry["headers"])
+            response.headers["X-Cache"] = "HIT"
+            return response
+
+        generation = response_cache.generation()
+        response = make_response(view(*args, **kwargs))
+        if (
+            response.status_code == 200
+            and not response.is_streamed
+            and not predates_last_write(validator)
+        ):
+            headers = {
+                name: response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
             }
-        }
+            response_cache.set(
+                key,
+                {"body": response.get_data(as_text=True), "headers": headers},
+                generation,
+            )
+            response.headers["X-Cache"] = "MISS"
+        return response
+
+    return wrapper
+
+
+# Live change events (Server-Sent Events)
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", 1))
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", 15))
+EVENTS_MAX_STREAMS = int(os.getenv("EVENTS_MAX_STREAMS", 1000))
+# Same projection the page uses for its cards
+EVENT_FIELDS = [
+    "id",
+    "title",
+    "author",
+    "created_at",
+    "updated_at",
+    "snippet",
+    "content_length",
+]
+
+
+def poll_changes(since):
+    """Change feed for the broadcaster, using a pooled connection"""
+    conn = get_db_connection(readonly=True)
+    if not conn:
+        return None
+    try:
+        return fetch_changes(conn, since, CHANGES_LIMIT, EVENT_FIELDS)
+    finally:
+        conn.close()
 
-        // Bring note card to front
-        function bringToFront(noteElement) {
-            // Remove top-card class from all cards
-            document.querySelectorAll('.note-card').forEach(card => {
-                card.classList.remove('top-card');
-            });
-            
-            highestZIndex += 1;
-            noteElement.style.zIndex = highestZIndex;
-            
-            // Mark this card as the top card
-            noteElement.classList.add('top-card');
-            
-            // Add subtle visual feedback
-            noteElement.style.transform = 'scale(1.02)';
-            setTimeout(() => {
-                noteElement.style.transform = '';
-            }, 150);
-        }
 
-        // Update highest z-index when notes are loaded
-        function updateHighestZIndex() {
-            const noteCards = document.querySelectorAll('.note-card');
-            noteCards.forEach(card => {
-                const zIndex = parseInt(card.style.zIndex) || 100;
-                if (zIndex > highestZIndex) {
-                    highestZIndex = zIndex;
-                }
-            });
-        }
+def poll_version():
+    """Version the broadcaster starts from"""
+    conn = get_db_connection(readonly=True)
+    if not conn:
+        return None
+    try:
+        return settled_version(conn)
+    finally:
+        conn.close()
 
-        // Start dragging a note
-        function startDrag(e, noteId) {
-            e.preventDefault();
-            isDragging = true;
-            currentNote = document.getElementById(`note-${noteId}`);
-            
-            // Bring the card to front when starting to drag
-            bringToFront(currentNote);
-            
-            const rect = currentNote.getBoundingClientRect();
-            offset.x = e.clientX - rect.left;
-            offset.y = e.clientY - rect.top;
-            
-            currentNote.classList.add('dragging');
-            document.addEventListener('mousemove', drag);
-            document.addEventListener('mouseup', stopDrag);
-        }
 
-        // Drag the note
-        function drag(e) {
-            if (isDragging && currentNote) {
-                const x = e.clientX - offset.x;
-                const y = e.clientY - offset.y;
-                
-                currentNote.style.left = Math.max(0, Math.min(x, window.innerWidth - currentNote.offsetWidth)) + 'px';
-                currentNote.style.top = Math.max(0, Math.min(y, window.innerHeight - currentNote.offsetHeight)) + 'px';
-            }
-        }
+note_events = ChangeBroadcaster(
+    poll_changes, poll_version, interval=EVENTS_POLL_INTERVAL
+)
 
-        // Stop dragging
-        function stopDrag() {
-            if (currentNote) {
-                currentNote.classList.remove('dragging');
-            }
-            isDragging = false;
-            currentNote = null;
-            document.removeEventListener('mousemove', drag);
-            document.removeEventListener('mouseup', stopDrag);
-        }
 
-        // Auto arrange notes in a grid
-        function arrangeNotes() {
-            const noteCards = document.querySelectorAll('.note-card');
-            noteCards.forEach((card, index) => {
-                const left = 50 + (index % 4) * 320;
-                const top = 100 + Math.floor(index / 4) * 300;
-                
-                card.style.transition = 'all 0.5s ease';
-                card.style.left = left + 'px';
-                card.style.top = top + 'px';
-                
-                setTimeout(() => {
-                    card.style.transition = '';
-                }, 500);
-            });
-        }
+# Highest changelog version written through this process. A listing read
+# from a replica that has not caught up with it is not cached.
+last_write_version = 0
 
-        // Search notes (disabled - no search bar)
-        function searchNotes() {
-            // Search functionality removed
-        }
 
-        // Clear search (disabled - no search bar)
-        function clearSearch() {
-            // Clear search functionality removed
-        }
+# When the changelog was last pruned down to CHANGES_KEEP entries
+last_prune = None
 
-        // Show add note modal
-        function showAddModal() {
-            document.getElementById('modalTitle').textContent = '➕ Add New Note';
-            document.getElementById('noteForm').reset();
-            document.getElementById('noteId').value = '';
-            document.getElementById('noteModal').style.display = 'block';
-        }
 
-        // View note in modal
-        function viewNote(id) {
-            const note = notes.find(n => n.id === id);
-            if (note) {
-                // Bring the note card to front when viewing
-                const noteCard = document.getElementById(`note-${id}`);
-                if (noteCard) bringToFront(noteCard);
-                
-                alert(`📄 ${note.title}\n\n👤 Author: ${note.author}\n📅 Created: ${formatDate(note.created_at)}\n\n📝 Content:\n${note.content}`);
-            }
-        }
+def notes_changed(conn=None):
+    """Called by every write route after a successful commit
 
-        // Edit note
-        function editNote(id) {
-            const note = notes.find(n => n.id === id);
-            if (note) {
-                // Bring the note card to front when editing
-                const noteCard = document.getElementById(`note-${id}`);
-                if (noteCard) bringToFront(noteCard);
-                
-                document.getElementById('modalTitle').textContent = '✏️ Edit Note';
-                document.getElementById('noteId').value = note.id;
-                document.getElementById('title').value = note.title;
-                document.getElementById('author').value = note.author;
-                document.getElementById('content').value = note.content;
-                document.getElementById('noteModal').style.display = 'block';
-            }
-        }
+    Pass the write's connection to record the version it produced. It is
+    also used to prune the changelog, a batch per write at most once per
+    CHANGES_PRUNE_INTERVAL.
+    """
+    global last_write_version, last_prune
+    if has_request_context():
+        # Read by pin_reads_after_write, whatever the response's status
+        g.notes_written = True
+    if conn is not None and (
+        last_prune is None or time.monotonic() - last_prune >= CHANGES_PRUNE_INTERVAL
+    ):
+        try:
+            if prune_changes(conn):
+                last_prune = time.monotonic()
+        except Exception as err:
+            print(f"Changelog pruning failed: {err}")
+    if conn is not None and mysql_replicas is not None:
+        try:
+            version = current_version(conn)
+        except Exception:
+            version = None
+        if version is not None and version > last_write_version:
+            last_write_version = version
+    response_cache.invalidate()
+    note_events.notify()
+
+
+def predates_last_write(validator):
+    """Whether a listing validator is older than this process's last write"""
+    return validator.startswith("v") and int(validator[1:]) < last_write_version
+
+
+# Page shell and its CSS/JS, built once per process
+asset_bundle = AssetBundle(os.path.join(app.root_path, "static"))
+index_page = Asset(
+    app.jinja_env.get_template("index.html")
+    .render(
+        css_url=asset_bundle.add_file("app.css"),
+        js_url=asset_bundle.add_file("app.js"),
+    )
+    .encode(),
+    "text/html; charset=utf-8",
+    REVALIDATE,
+)
+
+
+def send_asset(asset):
+    """Serve a prebuilt asset in the best encoding the client accepts"""
+    encoding, body, etag = asset.select(request.accept_encodings)
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, content_type=asset.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = asset.cache_control
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+@app.before_request
+def label_request_route():
+    """Expose the matched route pattern (not the raw path) to metrics and traces"""
+    rule = request.url_rule
+    request.environ[ROUTE_KEY] = rule.rule if rule is not None else None
+
+
+@app.errorhandler(PoolTimeout)
+def database_busy(err):
+    """Every pooled connection stayed busy: ask the client to retry"""
+    response = jsonify({"error": "Database busy, retry later"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
+@app.after_request
+def pin_reads_after_write(response):
+    """Read-your-writes: send this client's reads to the primary for a while
+
+    Replicas may not have the write yet. The cookie expires after
+    DB_READ_STICKY_SECONDS, by which time a replica in rotation (at most
+    DB_REPLICA_MAX_LAG behind) has caught up. It is set whenever the
+    request committed a write (notes_changed), including a bulk request
+    that failed after some of its chunks were committed.
+    """
+    if mysql_replicas is not None and g.get("notes_written"):
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=DB_READ_STICKY_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
 
-        // Delete note
-        async function deleteNote(id) {
-            const note = notes.find(n => n.id === id);
-            if (note && confirm(`🗑️ Are you sure you want to delete "${note.title}"?`)) {
-                try {
-                    const response = await fetch(`/api/notes/${id}`, { method: 'DELETE' });
-                    if (response.ok) {
-                        loadNotes(); // Reload notes
-                    } else {
-                        alert('❌ Error deleting note!');
-                    }
-                } catch (error) {
-                    alert('❌ Error deleting note!');
-                }
-            }
-        }
 
-        // Close modal
-        function closeModal() {
-            document.getElementById('noteModal').style.display = 'none';
-        }
+# Routes
+@app.route("/")
+def index():
+    """Main page with interactive note cards"""
+    return send_asset(index_page)
 
-        // Refresh notes
-        function refreshNotes() {
-            loadNotes();
-        }
 
-        // Update statistics (disabled - no stats bar)
-        function updateStats(count = null) {
-            // Stats functionality removed
-        }
+@app.route("/static/<name>")
+def static_asset(name):
+    """Fingerprinted CSS/JS; the name changes whenever the content does"""
+    asset = asset_bundle.files.get(name)
+    if asset is None:
+        return jsonify({"error": "Not found"}), 404
+    return send_asset(asset)
 
-        // Handle form submission
-        document.getElementById('noteForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const formData = new FormData(e.target);
-            const noteData = {
-                title: formData.get('title'),
-                author: formData.get('author'),
-                content: formData.get('content')
-            };
-            
-            const noteId = document.getElementById('noteId').value;
-            const url = noteId ? `/api/notes/${noteId}` : '/api/notes';
-            const method = noteId ? 'PUT' : 'POST';
-            
-            try {
-                const response = await fetch(url, {
-                    method: method,
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(noteData)
-                });
-                
-                if (response.ok) {
-                    closeModal();
-                    loadNotes(); // Reload notes
-                } else {
-                    alert('❌ Error saving note!');
-                }
-            } catch (error) {
-                alert('❌ Error saving note!');
-            }
-        });
 
-        // Close modal when clicking outside
-        window.onclick = function(event) {
-            const modal = document.getElementById('noteModal');
-            if (event.target === modal) {
-                closeModal();
-            }
-        }
+@app.route("/api/notes", methods=["GET"])
+@cached_listing
+@conditional_listing
+def get_notes():
+    """API endpoint to list notes, newest first
+
+    Optional query parameters:
+    - limit: page size (max NOTES_MAX_PAGE_SIZE); the next page's cursor is
+      returned in the X-Next-Cursor and Link headers
+    - after: keyset cursor "<created_at>,<id>" from the previous page
+    - fields: comma separated projection, e.g. id,title,snippet
+    - format=ndjson / stream=1: stream the rows instead of buffering them
+
+    X-Notes-Version carries the settled changelog version read before the
+    listing, to be passed as ?since= to /api/notes/changes.
+    """
+    stream_format = requested_stream_format()
+    try:
+        fields = parse_fields(request.args.get("fields"))
+        limit = request.args.get("limit", type=int)
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after = request.args.get("after")
+        cursor_key = parse_cursor(after) if after else None
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    conn = get_db_connection(readonly=True)
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
 
-        // Utility functions
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
+    streaming = False
+    try:
+        cursor = conn.cursor()
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        expressions = field_expressions(conn.db_type)
+        version = settled_version(conn)
+
+        # id and created_at are always fetched to build the next cursor
+        columns = fields + [key for key in ("created_at", "id") if key not in fields]
+        query = "SELECT {} FROM notes".format(
+            ", ".join(expressions[column] for column in columns)
+        )
+        params = []
+        if cursor_key:
+            query += f" WHERE created_at < {ph} OR (created_at = {ph} AND id < {ph})"
+            params = [cursor_key[0], cursor_key[0], cursor_key[1]]
+        query += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            query += f" LIMIT {ph}"
+            params.append(limit)
+
+        cursor.execute(query, params)
+        if stream_format:
+            streaming = True
+            return stream_notes(conn, cursor, fields, stream_format)
 
-        function formatDate(dateString) {
-            const date = new Date(dateString);
-            return date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
-        }
-    </script>
-</body>
-</html>
-"""
+        notes_data = cursor.fetchall()
+        with tracer.span("serialize", rows=len(notes_data)):
+            notes_list = map_notes(notes_data, fields)
+
+        with tracer.span("jsonify"):
+            response = jsonify(notes_list)
+        if version is not None:
+            response.headers["X-Notes-Version"] = str(version)
+        if limit is not None and len(notes_data) == limit:
+            last = note_mapper(columns)(notes_data[-1])
+            next_cursor = f"{last['created_at']},{last['id']}"
+            response.headers["X-Next-Cursor"] = next_cursor
+            next_args = request.args.to_dict()
+            next_args["after"] = next_cursor
+            response.headers["Link"] = '<{}?{}>; rel="next"'.format(
+                request.path, urlencode(next_args)
+            )
+        return response
+    except Exception as err:
+        return jsonify({"error": str(err)}), 500
+    finally:
+        if not streaming:
+            cursor.close()
+            conn.close()
+
+
+@app.route("/api/notes/changes")
+def get_note_changes():
+    """API endpoint returning notes changed since a changelog version
+
+    ?since=<version> comes from X-Notes-Version or a previous call's
+    "version". The response lists the current state of every note changed
+    since then ("upserts") and the ids of deleted notes ("deletes"). When
+    "has_more" is true, call again with the returned version. "reset" means
+    the client's version is unknown here and it should reload everything.
+    ?fields= works as on GET /api/notes.
+    """
+    since = request.args.get("since", type=int)
+    if since is None or since < 0:
+        return jsonify({"error": "since must be a changelog version"}), 400
+    limit = request.args.get("limit", CHANGES_LIMIT, type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
 
+    conn = get_db_connection(readonly=True)
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
 
-# Routes
-@app.route("/")
-def index():
-    """Main page with interactive note cards"""
-    return render_template_string(HTML_TEMPLATE)
+    try:
+        changes = fetch_changes(conn, since, limit, fields)
+        if changes is None:
+            return jsonify({"error": "Change tracking is not set up"}), 501
+        return jsonify(changes)
+    except Exception as err:
+        return jsonify({"error": str(err)}), 500
+    finally:
+        conn.close()
 
 
-@app.route("/api/notes", methods=["GET"])
-def get_notes():
-    """API endpoint to get all notes"""
-    conn = get_db_connection()
+@app.route("/api/notes/<int:note_id>", methods=["GET"])
+def get_note(note_id):
+    """API endpoint to get one note with its full content"""
+    conn = get_db_connection(readonly=True)
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
 
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM notes ORDER BY created_at DESC")
-        notes_data = cursor.fetchall()
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        cursor.execute(
+            "SELECT {} FROM notes WHERE id = {}".format(", ".join(NOTE_COLUMNS), ph),
+            (note_id,),
+        )
+        note = cursor.fetchone()
+        if note is None:
+            return jsonify({"error": "Note not found"}), 404
 
-        # Convert to list of dictionaries for JSON serialization
-        notes_list = []
-        for note in notes_data:
-            if CURRENT_DB_TYPE == "mysql":
-                # MySQL connector returns tuples with column access
-                note_dict = {
-                    "id": note[0],
-                    "title": note[1],
-                    "content": note[2],
-                    "author": note[3],
-                    "created_at": str(note[4]),
-                    "updated_at": str(note[5]),
-                }
-            else:
-                # SQLite returns Row objects with dict-like access
-                note_dict = {
-                    "id": note[0],
-                    "title": note[1],
-                    "content": note[2],
-                    "author": note[3],
-                    "created_at": note[4],
-                    "updated_at": note[5],
-                }
-            notes_list.append(note_dict)
-
-        return jsonify(notes_list)
+        note = note_mapper(NOTE_COLUMNS)(note)
+        response = jsonify(note)
+        response.last_modified = max(
+            filter(
+                None, map(parse_timestamp, (note["created_at"], note["updated_at"]))
+            ),
+            default=None,
+        )
+        response.add_etag(weak=True)
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
     except Exception as err:
         return jsonify({"error": str(err)}), 500
     finally:
@@ -1420,21 +1558,23 @@ def create_note():
 
     try:
         cursor = conn.cursor()
-        if CURRENT_DB_TYPE == "mysql":
+        if conn.db_type == "mysql":
             query = """
-            INSERT INTO notes (title, content, author, created_at) 
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO notes (title, content, author, created_at, updated_at) 
+            VALUES (%s, %s, %s, %s, %s)
             """
         else:
             query = """
-            INSERT INTO notes (title, content, author, created_at) 
-            VALUES (?, ?, ?, ?)
+            INSERT INTO notes (title, content, author, created_at, updated_at) 
+            VALUES (?, ?, ?, ?, ?)
             """
 
+        now = datetime.now()
         cursor.execute(
-            query, (data["title"], data["content"], data["author"], datetime.now())
+            query, (data["title"], data["content"], data["author"], now, now)
         )
         conn.commit()
+        notes_changed(conn)
 
         note_id = cursor.lastrowid
         return jsonify({"id": note_id, "message": "Note created successfully"}), 201
@@ -1459,7 +1599,7 @@ def update_note(note_id):
 
     try:
         cursor = conn.cursor()
-        if CURRENT_DB_TYPE == "mysql":
+        if conn.db_type == "mysql":
             query = """
             UPDATE notes 
             SET title = %s, content = %s, author = %s, updated_at = %s
@@ -1480,6 +1620,7 @@ def update_note(note_id):
 
         if cursor.rowcount == 0:
             return jsonify({"error": "Note not found"}), 404
+        notes_changed(conn)
 
         return jsonify({"message": "Note updated successfully"})
     except Exception as err:
@@ -1498,7 +1639,7 @@ def delete_note(note_id):
 
     try:
         cursor = conn.cursor()
-        if CURRENT_DB_TYPE == "mysql":
+        if conn.db_type == "mysql":
             cursor.execute("DELETE FROM notes WHERE id = %s", (note_id,))
         else:
             cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
@@ -1507,6 +1648,7 @@ def delete_note(note_id):
 
         if cursor.rowcount == 0:
             return jsonify({"error": "Note not found"}), 404
+        notes_changed(conn)
 
         return jsonify({"message": "Note deleted successfully"})
     except Exception as err:
@@ -1516,84 +1658,346 @@ def delete_note(note_id):
         conn.close()
 
 
+@app.route("/api/notes/bulk", methods=["POST"])
+def bulk_create_notes():
+    """API endpoint to import many notes at once
+
+    The body is a JSON array of notes, or NDJSON (one note per line,
+    Content-Type: application/x-ndjson), which is read line by line rather
+    than loaded whole. Each note needs title, content and author, and may
+    carry ISO 8601 created_at / updated_at.
+
+    Valid notes are inserted NOTES_BULK_BATCH_SIZE at a time, in one
+    transaction per batch. If a batch fails, its notes are
+    retried one by one so that a bad note does not reject the others.
+    The response lists the new ids in input order, plus an error for
+    every rejected note with its 0-based position in the body.
+    """
+    if request.mimetype == "application/x-ndjson":
+        records = (line for line in request.stream if line.strip())
+        decode = json.loads
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            return jsonify({"error": "Expected a JSON array or NDJSON body"}), 400
+        decode = None
+
+    ids = []
+    errors = []
+
+    def flush(batch):
+        try:
+            ids.extend(insert_notes([params for _, params in batch]))
+        except (ConnectionError, PoolTimeout) as err:
+            errors.extend({"index": index, "error": str(err)} for index, _ in batch)
+        except Exception as err:
+            if len(batch) == 1:
+                errors.append({"index": batch[0][0], "error": str(err)})
+                return
+            for item in batch:
+                flush([item])
+
+    now = datetime.now()
+    batch = []
+    for index, record in enumerate(records):
+        try:
+            params = parse_bulk_note(decode(record) if decode else record, now)
+        except ValueError as err:
+            errors.append({"index": index, "error": str(err)})
+            continue
+        batch.append((index, params))
+        if len(batch) >= BULK_BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    errors.sort(key=lambda error: error["index"])
+    return jsonify({"inserted": len(ids), "ids": ids, "errors": errors})
+
+
+@app.route("/api/notes/bulk", methods=["PATCH"])
+def bulk_update_notes():
+    """API endpoint to update many notes with one statement per chunk
+
+    Body: {"set": {"title"|"content"|"author": ...}} plus the notes to
+    change as "ids", "notes" (with updated_at, for optimistic concurrency)
+    or "filter" (author, created_before). Returns the number of notes
+    changed, and with "notes" also the ids that had changed meanwhile
+    ("conflicts") or no longer exist ("not_found").
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+
+    changes = data.get("set")
+    if not isinstance(changes, dict) or not changes:
+        return jsonify({"error": "set must name the fields to change"}), 400
+    unknown = set(changes) - set(BULK_UPDATE_FIELDS)
+    if unknown:
+        return jsonify({"error": f"Cannot set: {', '.join(sorted(unknown))}"}), 400
+    if not all(isinstance(value, str) for value in changes.values()):
+        return jsonify({"error": "Field values must be strings"}), 400
+
+    fields = [field for field in BULK_UPDATE_FIELDS if field in changes]
+    statement = "UPDATE notes SET {}, updated_at = {{ph}}".format(
+        ", ".join(f"{field} = {{ph}}" for field in fields)
+    )
+    params = [changes[field] for field in fields] + [datetime.now()]
+    return run_bulk_modification(data, statement, params)
+
+
+@app.route("/api/notes/bulk", methods=["DELETE"])
+def bulk_delete_notes():
+    """API endpoint to delete many notes with one statement per chunk
+
+    The body names the notes as "ids", "notes" (with updated_at, for
+    optimistic concurrency) or "filter" (author, created_before), as for
+    PATCH /api/notes/bulk.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    return run_bulk_modification(data, "DELETE FROM notes", [])
+
+
+@app.route("/api/notes/export")
+def export_notes():
+    """API endpoint streaming every note as NDJSON (default) or CSV
+
+    ?format=ndjson|csv and ?fields= (as on GET /api/notes). Notes come out
+    in id order, STREAM_BATCH_SIZE rows at a time, and an NDJSON export can
+    be fed back to POST /api/notes/bulk.
+    """
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
+    conn = get_db_connection(readonly=True)
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor()
+    try:
+        expressions = field_expressions(conn.db_type)
+        cursor.execute(
+            "SELECT {} FROM notes ORDER BY id".format(
+                ", ".join(expressions[field] for field in fields)
+            )
+        )
+        response = stream_notes(conn, cursor, fields, fmt)
+    except Exception as err:
+        cursor.close()
+        conn.close()
+        return jsonify({"error": str(err)}), 500
+
+    filename = f"notes-{datetime.now():%Y%m%d-%H%M%S}.{fmt}"
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 @app.route("/api/search")
+@cached_listing
+@conditional_listing
 def search_notes():
-    """API endpoint to search notes"""
+    """API endpoint to search notes
+
+    Uses the full-text index (FTS5 on SQLite, FULLTEXT on MariaDB) when it
+    exists, ranking by relevance and matching every word as a prefix. Falls
+    back to a LIKE scan otherwise, or when the index has none of the words
+    (see fts_expression). ?limit= caps the number of results.
+    """
     query = request.args.get("q", "").strip()
 
     if not query:
         return jsonify([])
 
-    conn = get_db_connection()
+    limit = request.args.get("limit", SEARCH_LIMIT, type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    conn = get_db_connection(readonly=True)
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
 
+    stream_format = requested_stream_format()
+    streaming = False
     try:
         cursor = conn.cursor()
-        if CURRENT_DB_TYPE == "mysql":
-            search_query = """
-            SELECT * FROM notes 
-            WHERE title LIKE %s OR content LIKE %s OR author LIKE %s
-            ORDER BY created_at DESC
-            """
+        ph = "%s" if conn.db_type == "mysql" else "?"
+        terms = re.findall(r"\w+", query)
+        expression = (
+            fts_expression(terms, conn.db_type)
+            if terms and has_feature(conn, "fts")
+            else None
+        )
+
+        if expression:
+            if conn.db_type == "mysql":
+                match = f"MATCH(title, content, author) AGAINST ({ph} IN BOOLEAN MODE)"
+                search_query = f"""
+                SELECT {", ".join(NOTE_COLUMNS)} FROM notes
+                WHERE {match}
+                ORDER BY {match} DESC, created_at DESC
+                LIMIT {ph}
+                """
+                params = (expression, expression, limit)
+            else:
+                search_query = f"""
+                SELECT {", ".join("notes." + column for column in NOTE_COLUMNS)}
+                FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+                WHERE notes_fts MATCH {ph}
+                ORDER BY notes_fts.rank, notes.created_at DESC
+                LIMIT {ph}
+                """
+                params = (expression, limit)
         else:
-            search_query = """
-            SELECT * FROM notes 
-            WHERE title LIKE ? OR content LIKE ? OR author LIKE ?
+            search_query = f"""
+            SELECT {", ".join(NOTE_COLUMNS)} FROM notes
+            WHERE title LIKE {ph} OR content LIKE {ph} OR author LIKE {ph}
             ORDER BY created_at DESC
+            LIMIT {ph}
             """
+            search_pattern = f"%{query}%"
+            params = (search_pattern, search_pattern, search_pattern, limit)
+
+        cursor.execute(search_query, params)
+        if stream_format:
+            streaming = True
+            return stream_notes(conn, cursor, NOTE_COLUMNS, stream_format)
 
-        search_pattern = f"%{query}%"
-        cursor.execute(search_query, (search_pattern, search_pattern, search_pattern))
         notes_data = cursor.fetchall()
 
-        # Convert to list of dictionaries for JSON serialization
-        notes_list = []
-        for note in notes_data:
-            if CURRENT_DB_TYPE == "mysql":
-                note_dict = {
-                    "id": note[0],
-                    "title": note[1],
-                    "content": note[2],
-                    "author": note[3],
-                    "created_at": str(note[4]),
-                    "updated_at": str(note[5]),
-                }
-            else:
-                note_dict = {
-                    "id": note[0],
-                    "title": note[1],
-                    "content": note[2],
-                    "author": note[3],
-                    "created_at": note[4],
-                    "updated_at": note[5],
-                }
-            notes_list.append(note_dict)
-
-        return jsonify(notes_list)
+        with tracer.span("serialize", rows=len(notes_data)):
+            notes_list = map_notes(notes_data, NOTE_COLUMNS)
+
+        with tracer.span("jsonify"):
+            return jsonify(notes_list)
     except Exception as err:
         return jsonify({"error": str(err)}), 500
     finally:
-        cursor.close()
-        conn.close()
+        if not streaming:
+            cursor.close()
+            conn.close()
+
+
+@app.route("/api/events")
+def note_event_stream():
+    """Server-Sent Events stream of note changes
+
+    Each "changes" event carries the same payload as /api/notes/changes,
+    with card fields. A "resync" event means the client fell behind and
+    should reload. Comment lines keep idle connections alive. This WSGI
+    route holds a thread for as long as the stream is open (under gthread
+    workers, the dev server, or a streamed-response thread). The default
+    serve.py workers run asgi.py, which answers /api/events on its event
+    loop instead and never reaches this view.
+    """
+    if note_events.stats()["subscribers"] >= EVENTS_MAX_STREAMS:
+        return jsonify({"error": "Too many event streams"}), 503
+
+    subscription = note_events.subscribe()
+    response = Response(
+        sse_stream(subscription, EVENTS_HEARTBEAT, app.json.dumps),
+        mimetype="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    # Ask reverse proxies not to buffer the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    response.call_on_close(lambda: note_events.unsubscribe(subscription))
+    return response
+
+
+@app.route("/api/stats")
+def get_stats():
+    """API endpoint exposing connection pool metrics"""
+    return jsonify(
+        {
+            "database": database.stats(),
+            "cache": dict(response_cache.stats(), enabled=CACHE_ENABLED),
+            "events": note_events.stats(),
+            "pools": {
+                label: pool.stats()
+                for backend in (database.primary, database.fallback)
+                if backend is not None
+                for label, pool in backend.pools().items()
+            },
+            "sqlite_checkpoint": (
+                sqlite_checkpointer.stats() if sqlite_checkpointer else None
+            ),
+        }
+    )
+
+
+@app.route("/api/admin/profile", methods=["POST"])
+def profile_worker():
+    """Sample the stacks of the worker serving this request
+
+    ?seconds= (default 10) and ?interval_ms= (default 5). Returns collapsed
+    stacks for flamegraph.pl or speedscope. Only the worker process that
+    answers is profiled.
+    """
+    if not PROFILING_TOKEN:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    if not is_authorized(PROFILING_TOKEN, request.headers.get("Authorization")):
+        return jsonify({"error": "Admin token required"}), 403
+
+    seconds = request.args.get("seconds", 10, type=float)
+    interval_ms = request.args.get("interval_ms", 5, type=float)
+    if not 0 < seconds <= PROFILING_MAX_SECONDS:
+        return (
+            jsonify({"error": f"seconds must be in (0, {PROFILING_MAX_SECONDS}]"}),
+            400,
+        )
+    if not 1 <= interval_ms <= 1000:
+        return jsonify({"error": "interval_ms must be between 1 and 1000"}), 400
+
+    try:
+        stacks, samples = stack_sampler.sample(seconds, interval_ms / 1000)
+    except ProfilerBusy as err:
+        return jsonify({"error": str(err)}), 409
+    response = Response(StackSampler.format(stacks), mimetype="text/plain")
+    response.headers["X-Profile-Samples"] = str(samples)
+    response.headers["X-Profile-Pid"] = str(os.getpid())
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/metrics")
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    if metrics is None:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
 
 
 if __name__ == "__main__":
     # Get port from environment or default to 5000
     port = int(os.getenv("FLASK_PORT", 5000))
+    debug = os.getenv("FLASK_DEBUG", "false").lower() in ("1", "true", "yes")
+
+    init_worker()
 
     # Test database connection on startup
     conn = get_db_connection()
     if conn:
-        db_info = f"{CURRENT_DB_TYPE.upper()}" if CURRENT_DB_TYPE else "Unknown"
-        if CURRENT_DB_TYPE == "mysql":
+        db_info = conn.db_type.upper()
+        if conn.db_type == "mysql":
             db_info += f" ({DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME})"
+            if mysql_replicas is not None:
+                healthy = mysql_replicas.stats()["healthy"]
+                db_info += f", {healthy}/{len(DB_REPLICAS)} read replicas"
         else:
             db_info += f" ({DATABASE_PATH})"
 
         print(f"✅ Database connection successful! Using: {db_info}")
         conn.close()
-        print("🚀 Starting Flask web server...")
+        print("🚀 Starting Flask development server (use serve.py in production)...")
         print(f"🌐 Open your browser and go to: http://localhost:{port}")
         print("🎯 Features:")
         print("   - Interactive floating note cards")
@@ -1610,7 +2014,8 @@ if __name__ == "__main__":
             print("   - Alternative: Set FLASK_PORT=5000 for non-privileged port")
 
         try:
-            app.run(debug=True, host="0.0.0.0", port=port)
+            # Development server only; production runs serve.py
+            app.run(debug=debug, host="0.0.0.0", port=port)
         except PermissionError:
             print("❌ Permission denied to bind to port 80!")
             print("💡 Solutions:")
@@ -36,19 +36,18 @@ mysql -u root -p"$ROOT_PASSWORD" << EOF
 CREATE DATABASE IF NOT EXISTS \`${DB_NAME}\` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 CREATE USER IF NOT EXISTS '${DB_USER}'@'${DB_HOST}' IDENTIFIED BY '${DB_PASSWORD}';
 GRANT ALL PRIVILEGES ON \`${DB_NAME}\`.* TO '${DB_USER}'@'${DB_HOST}';
-USE \`${DB_NAME}\`;
-CREATE TABLE IF NOT EXISTS notes (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    title VARCHAR(255) NOT NULL,
-    content TEXT NOT NULL,
-    author VARCHAR(100) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-);
 FLUSH PRIVILEGES;
 EOF
+status=$?
 
-if [ $? -eq 0 ]; then
+# Create or upgrade the schema (see migrations.py)
+if [ $status -eq 0 ]; then
+    DB_TYPE=mysql DB_HOST="$DB_HOST" DB_USER="$DB_USER" DB_PASSWORD="$DB_PASSWORD" \
+        DB_NAME="$DB_NAME" DB_PORT="$DB_PORT" python3 migrations.py upgrade
+    status=$?
+fi
+
+if [ $status -eq 0 ]; then
     echo "✅ MariaDB database setup complete!"
     echo "Database: ${DB_NAME}"
     echo "User: ${DB_USER}"
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Prometheus metrics for HTTP requests and database access
+
+Served on /metrics in the Prometheus text format. Under serve.py every
+gunicorn worker writes its samples to files in PROMETHEUS_MULTIPROC_DIR,
+so a scrape answered by any worker reports the whole server.
+"""
+
+import os
+import time
+
+from db_pool import statement_type
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+QUERY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.5,
+    1,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# WSGI environ key where the Flask app leaves the matched route pattern
+ROUTE_KEY = "noteapp.route"
+
+
+class Metrics:
+    """The app's metric families, also usable as a connection pool observer"""
+
+    def __init__(self, prefix="noteapp"):
+        self.requests = Counter(
+            f"{prefix}_http_requests_total",
+            "HTTP requests by route and status",
+            ["method", "route", "status"],
+        )
+        self.latency = Histogram(
+            f"{prefix}_http_request_duration_seconds",
+            "Time until the response body was fully sent",
+            ["method", "route"],
+            buckets=LATENCY_BUCKETS,
+        )
+        self.response_bytes = Histogram(
+            f"{prefix}_http_response_bytes",
+            "Response body size",
+            ["route"],
+            buckets=SIZE_BUCKETS,
+        )
+        self.query_time = Histogram(
+            f"{prefix}_db_query_duration_seconds",
+            "Statement execution time by statement type",
+            ["backend", "statement"],
+            buckets=QUERY_BUCKETS,
+        )
+        self.rows_returned = Counter(
+            f"{prefix}_db_rows_returned_total",
+            "Rows fetched from the database",
+            ["backend"],
+        )
+        self.acquire_time = Histogram(
+            f"{prefix}_db_connection_acquire_seconds",
+            "Time to check a connection out of a pool",
+            ["backend", "pool"],
+            buckets=LATENCY_BUCKETS,
+        )
+        self.db_errors = Counter(
+            f"{prefix}_db_errors_total",
+            "Failed connection checkouts and statements",
+            ["backend", "kind"],
+        )
+
+    # Connection pool observer
+    def connection_acquired(self, pool, db_type, seconds):
+        self.acquire_time.labels(db_type, pool).observe(seconds)
+
+    def connection_failed(self, pool, db_type, error):
+        self.db_errors.labels(db_type, "connect").inc()
+
+    def query(self, db_type, sql, params, seconds, rows, error):
+        statement = statement_type(sql)
+        self.query_time.labels(db_type, statement).observe(seconds)
+        if error is not None:
+            self.db_errors.labels(db_type, "query").inc()
+        elif rows and statement == "SELECT":
+            self.rows_returned.labels(db_type).inc(rows)
+
+    def observe_request(self, method, route, status, seconds, size):
+        self.requests.labels(method, route, status).inc()
+        self.latency.labels(method, route).observe(seconds)
+        self.response_bytes.labels(route).observe(size)
+
+    def render(self):
+        """(body, content type) of a scrape"""
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry), CONTENT_TYPE_LATEST
+        return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MeteredBody:
+    """Response iterable that counts the bytes sent and reports on close()"""
+
+    def __init__(self, body, on_close):
+        self._body = body
+        self._on_close = on_close
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self._body:
+            self.size += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self._body, "close"):
+                self._body.close()
+        finally:
+            self._on_close(self.size)
+
+
+class MetricsMiddleware:
+    """WSGI middleware recording every request's route, status, time and size
+
+    Timing stops when the server closes the response, so streamed bodies
+    (NDJSON, exports, SSE) are measured until their last byte.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        status = ["500"]
+
+        def recording_start_response(status_line, headers, exc_info=None):
+            status[0] = status_line.split(" ", 1)[0]
+            return start_response(status_line, headers, exc_info)
+
+        def record(size):
+            self.metrics.observe_request(
+                environ.get("REQUEST_METHOD", "GET"),
+                environ.get(ROUTE_KEY) or "unmatched",
+                status[0],
+                time.perf_counter() - started,
+                size,
+            )
+
+        try:
+            body = self.app(environ, recording_start_response)
+        except Exception:
+            record(0)
+            raise
+        return MeteredBody(body, record)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Versioned schema migrations for the notes database
+
+The same numbered migrations are applied to SQLite and MariaDB, and the
+applied versions are recorded in the schema_migrations table. Every
+statement is idempotent (IF NOT EXISTS), so databases created by older
+setup scripts are adopted as they are rather than recreated.
+
+Usage (uses the same .env / DB_* settings as frontend.py):
+    python3 migrations.py status
+    python3 migrations.py upgrade
+"""
+
+import os
+import sys
+from datetime import datetime
+
+MIGRATIONS = [
+    {
+        "version": 1,
+        "name": "create notes table",
+        "sqlite": [
+            """
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                author TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ],
+        "mysql": [
+            """
+            CREATE TABLE IF NOT EXISTS notes (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                title VARCHAR(255) NOT NULL,
+                content TEXT NOT NULL,
+                author VARCHAR(100) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    ON UPDATE CURRENT_TIMESTAMP
+            ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci
+            """,
+        ],
+    },
+    {
+        "version": 2,
+        "name": "full-text search index",
+        "sqlite": [
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                title, content, author,
+                content='notes', content_rowid='id'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+                INSERT INTO notes_fts(rowid, title, content, author)
+                VALUES (new.id, new.title, new.content, new.author);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+                INSERT INTO notes_fts(notes_fts, rowid, title, content, author)
+                VALUES ('delete', old.id, old.title, old.content, old.author);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+                INSERT INTO notes_fts(notes_fts, rowid, title, content, author)
+                VALUES ('delete', old.id, old.title, old.content, old.author);
+                INSERT INTO notes_fts(rowid, title, content, author)
+                VALUES (new.id, new.title, new.content, new.author);
+            END
+            """,
+            # Backfill the index from existing notes
+            "INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')",
+        ],
+        "mysql": [
+            """
+            ALTER TABLE notes ADD FULLTEXT INDEX IF NOT EXISTS
+                ft_notes_search (title, content, author)
+            """,
+        ],
+    },
+    {
+        "version": 3,
+        "name": "note changelog",
+        "sqlite": [
+            """
+            CREATE TABLE IF NOT EXISTS note_changes (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                note_id INTEGER NOT NULL,
+                operation TEXT NOT NULL,
+                changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_note_changes_note_id
+                ON note_changes (note_id)
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_changes_insert AFTER INSERT ON notes BEGIN
+                INSERT INTO note_changes (note_id, operation) VALUES (new.id, 'upsert');
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_changes_update AFTER UPDATE ON notes BEGIN
+                INSERT INTO note_changes (note_id, operation) VALUES (new.id, 'upsert');
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_changes_delete AFTER DELETE ON notes BEGIN
+                INSERT INTO note_changes (note_id, operation) VALUES (old.id, 'delete');
+            END
+            """,
+        ],
+        "mysql": [
+            """
+            CREATE TABLE IF NOT EXISTS note_changes (
+                version BIGINT AUTO_INCREMENT PRIMARY KEY,
+                note_id INT NOT NULL,
+                operation VARCHAR(10) NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_note_changes_note_id (note_id)
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_changes_insert AFTER INSERT ON notes
+            FOR EACH ROW
+                INSERT INTO note_changes (note_id, operation) VALUES (NEW.id, 'upsert')
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_changes_update AFTER UPDATE ON notes
+            FOR EACH ROW
+                INSERT INTO note_changes (note_id, operation) VALUES (NEW.id, 'upsert')
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS notes_changes_delete AFTER DELETE ON notes
+            FOR EACH ROW
+                INSERT INTO note_changes (note_id, operation) VALUES (OLD.id, 'delete')
+            """,
+        ],
+    },
+    {
+        "version": 4,
+        "name": "listing and filter indexes",
+        # (created_at, id) serves ORDER BY created_at DESC, id DESC and the
+        # keyset cursor; updated_at serves validators and delta sync
+        "sqlite": [
+            "CREATE INDEX IF NOT EXISTS idx_notes_created_at ON notes (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_notes_updated_at ON notes (updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_notes_author ON notes (author)",
+        ],
+        "mysql": [
+            "CREATE INDEX IF NOT EXISTS idx_notes_created_at ON notes (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_notes_updated_at ON notes (updated_at)",
+            "CREATE INDEX IF NOT EXISTS idx_notes_author ON notes (author)",
+        ],
+    },
+]
+
+VERSION_TABLE = {
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """,
+    "mysql": """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL
+        )
+    """,
+}
+
+# MariaDB advisory lock so concurrent workers don't migrate at the same time
+MYSQL_LOCK_NAME = "noteapp_schema_migrations"
+MYSQL_LOCK_TIMEOUT = 60
+
+
+def latest_version():
+    return MIGRATIONS[-1]["version"]
+
+
+def applied_versions(conn):
+    """Set of migration versions recorded in the database"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(VERSION_TABLE[conn.db_type])
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def pending_migrations(conn):
+    """Migrations not yet applied, in order"""
+    applied = applied_versions(conn)
+    conn.commit()
+    return [m for m in MIGRATIONS if m["version"] not in applied]
+
+
+def migrate(conn):
+    """Apply every pending migration and return the ones applied
+
+    On SQLite the whole run holds the write lock (BEGIN IMMEDIATE); on
+    MariaDB it holds an advisory lock. The applied set is re-read under the
+    lock, so concurrent workers apply each migration exactly once.
+    """
+    ph = "%s" if conn.db_type == "mysql" else "?"
+    cursor = conn.cursor()
+    try:
+        if conn.db_type == "mysql":
+            cursor.execute(
+                "SELECT GET_LOCK(%s, %s)", (MYSQL_LOCK_NAME, MYSQL_LOCK_TIMEOUT)
+            )
+            if cursor.fetchone()[0] != 1:
+                raise RuntimeError("could not acquire the migration lock")
+        else:
+            conn.commit()
+            cursor.execute("BEGIN IMMEDIATE")
+
+        applied = []
+        done = applied_versions(conn)
+        for migration in MIGRATIONS:
+            if migration["version"] in done:
+                continue
+            for statement in migration[conn.db_type]:
+                cursor.execute(statement)
+            cursor.execute(
+                f"INSERT INTO schema_migrations (version, name, applied_at) "
+                f"VALUES ({ph}, {ph}, {ph})",
+                (migration["version"], migration["name"], datetime.now()),
+            )
+            if conn.db_type == "mysql":
+                # DDL commits implicitly on MariaDB; record each step as it lands
+                conn.commit()
+            applied.append(migration)
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if conn.db_type == "mysql":
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MYSQL_LOCK_NAME,))
+            cursor.fetchall()
+        cursor.close()
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else "status"
+    if command not in ("status", "upgrade"):
+        print(__doc__)
+        return 2
+
+    # Reuse the app's configuration and connection handling. Its import must
+    # not apply migrations itself, or "status" would upgrade
+    os.environ["DB_MIGRATE"] = "off"
+    import frontend
+
+    conn = frontend.get_db_connection()
+    if not conn:
+        print("❌ Database connection failed!")
+        return 1
+    try:
+        if command == "upgrade":
+            for migration in migrate(conn):
+                print(f"✅ Applied {migration['version']}: {migration['name']}")
+        pending = pending_migrations(conn)
+        current = max(applied_versions(conn), default=0)
+        print(f"📋 {conn.db_type} schema version: {current}/{latest_version()}")
+        for migration in pending:
+            print(f"   pending {migration['version']}: {migration['name']}")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Live note change events fanned out to Server-Sent Events clients"""
+
+import asyncio
+import queue
+import threading
+
+
+class Subscription:
+    """One connected client's bounded event queue"""
+
+    def __init__(self, max_queue):
+        self.events = queue.Queue(maxsize=max_queue)
+        # Set when events were dropped; the client must resync
+        self.overflowed = False
+        # Wakes get_async() on its event loop while it waits
+        self._waker = None
+
+    def get(self, timeout):
+        """Next event, or None if nothing arrived within ``timeout`` seconds"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def get_async(self, timeout):
+        """get() for an event loop: waits without holding a thread"""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        self._waker = lambda: loop.call_soon_threadsafe(ready.set)
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                try:
+                    return self.events.get_nowait()
+                except queue.Empty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(ready.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+                ready.clear()
+        finally:
+            self._waker = None
+
+    def wake(self):
+        """Called by the poller after it queued an event or overflowed"""
+        waker = self._waker
+        if waker is not None:
+            try:
+                waker()
+            except RuntimeError:
+                # The waiting loop has closed
+                pass
+
+
+def format_event(event, dumps):
+    """SSE text for a broadcaster event, or a keep-alive comment for None"""
+    if event is None:
+        return ": ping\n\n"
+    name = "resync" if event.get("reset") else "changes"
+    return f"id: {event['version']}\nevent: {name}\ndata: {dumps(event)}\n\n"
+
+
+SSE_RETRY = "retry: 3000\n\n"
+# Sent when a client fell behind: it should reload instead
+SSE_RESYNC = "event: resync\ndata: {}\n\n"
+
+
+def sse_stream(subscription, heartbeat, dumps):
+    """SSE text for one subscription, blocking a thread between events"""
+    yield SSE_RETRY
+    while not subscription.overflowed:
+        yield format_event(subscription.get(heartbeat), dumps)
+    yield SSE_RESYNC
+
+
+async def sse_stream_async(subscription, heartbeat, dumps):
+    """sse_stream() for an event loop: an idle stream costs no thread"""
+    yield SSE_RETRY
+    while not subscription.overflowed:
+        yield format_event(await subscription.get_async(heartbeat), dumps)
+    yield SSE_RESYNC
+
+
+class ChangeBroadcaster:
+    """Polls the changelog once per process and pushes changes to subscribers
+
+    There is one poller, however many clients are connected, so the database
+    cost does not grow with the number of open tabs. Changes made by other
+    worker processes are picked up on the next poll. Local writes call
+    notify() to skip the wait. The poller only runs while someone is
+    subscribed.
+
+    ``fetch_changes(since)`` must return a change feed dict ("version",
+    "upserts", "deletes", "has_more"), or None when the changelog is
+    unavailable. ``latest_version()`` returns the current version.
+    """
+
+    def __init__(self, fetch_changes, latest_version, interval=1.0, max_queue=100):
+        self.fetch_changes = fetch_changes
+        self.latest_version = latest_version
+        self.interval = interval
+        self.max_queue = max_queue
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers = set()
+        self._poller = None
+        self._version = None
+
+        self._published = 0
+        self._dropped = 0
+
+    def subscribe(self):
+        subscription = Subscription(self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(
+                    target=self._run, name="note-events", daemon=True
+                )
+                self._poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def notify(self):
+        """Poll now instead of waiting for the next interval"""
+        self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "version": self._version,
+                "published": self._published,
+                "dropped": self._dropped,
+            }
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._poller = None
+                    self._version = None
+                    return
+            try:
+                self._poll()
+            except Exception as err:
+                print(f"Note events poll error: {err}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _poll(self):
+        if self._version is None:
+            self._version = self.latest_version()
+            return
+        more = True
+        while more:
+            changes = self.fetch_changes(self._version)
+            if changes is None:
+                return
+            more = changes.get("has_more", False)
+            if changes.get("reset"):
+                self._version = changes["version"]
+                self._publish({"version": self._version, "reset": True})
+                return
+            if changes["upserts"] or changes["deletes"]:
+                self._publish(changes)
+            self._version = changes["version"]
+
+    def _publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._published += 1
+        for subscription in subscribers:
+            try:
+                subscription.events.put_nowait(event)
+            except queue.Full:
+                # Slow client: stop queueing and tell it to resync instead
+                subscription.overflowed = True
+                with self._lock:
+                    self._dropped += 1
+            subscription.wake()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Admin-only profiling of a running worker
+
+Two tools, both behind ``Authorization: Bearer <PROFILING_TOKEN>``:
+
+- StackSampler samples every thread's stack for a few seconds and returns
+  collapsed stacks ("frame;frame;frame count" lines, the input of
+  flamegraph.pl and speedscope).
+- ProfilingMiddleware runs a single request carrying an ``X-Profile``
+  header under cProfile and answers with the pstats report instead of the
+  response.
+
+Nothing is installed unless a token is configured, so a normal deployment
+pays nothing for them.
+"""
+
+import _thread
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import time
+from collections import Counter
+
+PSTATS_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls", "time")
+
+
+def real_thread_primitives():
+    """start_new_thread, sleep and get_ident that bypass gevent's patches
+
+    The sampler must run in an OS thread: a greenlet would only get to run
+    when the code it is meant to observe yields.
+    """
+    try:
+        from gevent import monkey
+
+        if monkey.is_module_patched("threading"):
+            return (
+                monkey.get_original("_thread", "start_new_thread"),
+                monkey.get_original("time", "sleep"),
+                monkey.get_original("_thread", "get_ident"),
+            )
+    except ImportError:
+        pass
+    return _thread.start_new_thread, time.sleep, _thread.get_ident
+
+
+def is_authorized(token, header):
+    """Constant-time check of an Authorization header against the token"""
+    if not token or not header:
+        return False
+    return hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+
+
+def collapse(frame):
+    """A stack as "outermost;...;innermost" frame names"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class ProfilerBusy(Exception):
+    """Raised when a sampling session is already running in this process"""
+
+
+class StackSampler:
+    """On-demand sampling profiler for the current process"""
+
+    def __init__(self):
+        self._busy = _thread.allocate_lock()
+
+    def sample(self, seconds, interval=0.005):
+        """Sample for ``seconds``; returns (Counter of stacks, sample count)"""
+        if not self._busy.acquire(False):
+            raise ProfilerBusy("a profile is already running in this worker")
+        try:
+            start_thread, _, _ = real_thread_primitives()
+            stacks = Counter()
+            state = {"stop": False, "done": False, "samples": 0}
+            start_thread(self._run, (stacks, state, interval))
+            # The caller's sleep: cooperative under gevent
+            time.sleep(seconds)
+            state["stop"] = True
+            while not state["done"]:
+                time.sleep(interval)
+            return stacks, state["samples"]
+        finally:
+            self._busy.release()
+
+    @staticmethod
+    def _run(stacks, state, interval):
+        _, sleep, get_ident = real_thread_primitives()
+        me = get_ident()
+        try:
+            while not state["stop"]:
+                for ident, frame in sys._current_frames().items():
+                    if ident != me:
+                        stacks[collapse(frame)] += 1
+                state["samples"] += 1
+                sleep(interval)
+        finally:
+            state["done"] = True
+
+    @staticmethod
+    def format(stacks):
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """WSGI middleware profiling requests that carry an X-Profile header
+
+    The header's value picks the pstats sort order (default cumulative).
+    The body runs under the profiler without being kept. A streamed body
+    (one without Content-Length, such as SSE) is only read up to its first
+    chunk, since it may be long or never end. The original status is
+    returned in X-Profiled-Status. Under gevent, other
+    greenlets that run on the same thread meanwhile show up in the report.
+    """
+
+    def __init__(self, app, token, top=40):
+        self.app = app
+        self.token = token
+        self.top = top
+
+    def __call__(self, environ, start_response):
+        sort = environ.get("HTTP_X_PROFILE")
+        if sort is None:
+            return self.app(environ, start_response)
+        if not is_authorized(self.token, environ.get("HTTP_AUTHORIZATION")):
+            start_response("403 FORBIDDEN", [("Content-Type", "text/plain")])
+            return [b"profiling requires the admin token\n"]
+        if sort not in PSTATS_SORT_KEYS:
+            sort = "cumulative"
+
+        captured = {}
+        sizes = []
+
+        def capture(status, headers, exc_info=None):
+            captured["status"] = status
+            captured["streamed"] = not any(
+                name.lower() == "content-length" for name, _ in headers
+            )
+            return lambda data: sizes.append(len(data))
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            body = self.app(environ, capture)
+            try:
+                for chunk in body:
+                    sizes.append(len(chunk))
+                    if captured.get("streamed"):
+                        break
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+        finally:
+            profiler.disable()
+
+        summary = f"{captured.get('status')}, {sum(sizes)} bytes"
+        if captured.get("streamed"):
+            summary += " (streamed, profiled to the first chunk)"
+        report = io.StringIO()
+        report.write(
+            f"{environ.get('REQUEST_METHOD')} {environ.get('PATH_INFO')}: {summary}\n"
+        )
+        pstats.Stats(profiler, stream=report).sort_stats(sort).print_stats(self.top)
+        output = report.getvalue().encode()
+        start_response(
+            "200 OK",
+            [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(output))),
+                ("X-Profiled-Status", captured.get("status", "")),
+                ("Cache-Control", "no-store"),
+            ],
+        )
+        return [output]
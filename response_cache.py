@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Caches for serialised note listings and search results"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Try to import the Redis client for the shared cache backend
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class LocalCache:
+    """In-process LRU cache with a TTL on every entry
+
+    Writers call invalidate(), which bumps a generation counter and drops all
+    entries. Readers pass the generation they saw before querying the
+    database to set(), so a result computed before a write can never be
+    stored after it.
+    """
+
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._generation = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "local",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+class RedisCache:
+    """Cache shared by every worker process through Redis
+
+    Keys are namespaced by a generation counter stored in Redis. An
+    invalidation from any worker increments it, so every worker stops
+    reading the old entries at once. The old entries then expire through
+    their TTL.
+    """
+
+    def __init__(self, url, ttl=30.0, prefix="noteapp:cache:"):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+        self._invalidations = 0
+
+    def generation(self):
+        try:
+            return int(self.client.get(self.prefix + "generation") or 0)
+        except redis.RedisError:
+            self._count("_errors")
+            return None
+
+    def get(self, key):
+        generation = self.generation()
+        if generation is None:
+            return None
+        try:
+            raw = self.client.get(f"{self.prefix}{generation}:{key}")
+        except redis.RedisError:
+            self._count("_errors")
+            return None
+        if raw is None:
+            self._count("_misses")
+            return None
+        self._count("_hits")
+        return json.loads(raw)
+
+    def set(self, key, value, generation):
+        if generation is None:
+            return
+        try:
+            self.client.set(
+                f"{self.prefix}{generation}:{key}",
+                json.dumps(value),
+                ex=max(1, int(self.ttl)),
+            )
+        except redis.RedisError:
+            self._count("_errors")
+
+    def invalidate(self):
+        try:
+            self.client.incr(self.prefix + "generation")
+            self._count("_invalidations")
+        except redis.RedisError:
+            self._count("_errors")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "redis",
+                "ttl_s": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "errors": self._errors,
+                "invalidations": self._invalidations,
+            }
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -8,13 +8,5 @@ echo ""
 echo "Enter backup filename to restore:"
 read BACKUP_FILE
 
-# Get current database file from .env or use default
-DB_FILE=$(grep "^DB_PATH=" .env 2>/dev/null | cut -d'=' -f2 || echo "notes.db")
-
-# Restore backup
-if [ -f "./backups/$BACKUP_FILE" ]; then
-    cp "./backups/$BACKUP_FILE" "$DB_FILE"
-    echo "✅ Database restored from: $BACKUP_FILE"
-else
-    echo "❌ Backup file not found: $BACKUP_FILE"
-fi 
\ No newline at end of file
+# Restore while the app keeps running; the current data is backed up first
+python3 backup.py restore "$BACKUP_FILE"
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Result rows to JSON: the note row mapping and the JSON provider
+
+Every route turns rows into notes through note_mapper(), built once per
+field list, so the per-row work is one ``dict(zip())`` plus the timestamp
+columns. Timestamps come out as ISO 8601 whichever backend produced them:
+MySQL returns datetimes, SQLite returns "YYYY-MM-DD HH:MM:SS[.ffffff]"
+text.
+"""
+
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+
+# Try to import orjson for the fast JSON provider
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+
+def iso_timestamp(value):
+    """ISO 8601 text for a DB timestamp (datetime or SQLite text)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.replace(" ", "T", 1)
+    return value.isoformat()
+
+
+def db_timestamp(value):
+    """The form timestamps are stored and compared in: space, not T"""
+    return value.replace("T", " ", 1)
+
+
+@lru_cache(maxsize=128)
+def _note_mapper(fields):
+    timestamps = tuple(field for field in fields if field in TIMESTAMP_FIELDS)
+
+    def to_note(row):
+        note = dict(zip(fields, row))
+        for field in timestamps:
+            value = note[field]
+            if value.__class__ is str:
+                note[field] = value.replace(" ", "T", 1)
+            elif value is not None:
+                note[field] = value.isoformat()
+        return note
+
+    return to_note
+
+
+def note_mapper(fields):
+    """Function turning a result row whose columns are ``fields`` into a note"""
+    return _note_mapper(tuple(fields))
+
+
+def map_notes(rows, fields):
+    to_note = note_mapper(fields)
+    return [to_note(row) for row in rows]
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson
+
+    orjson writes UTF-8 rather than \\u escapes and keeps keys in insertion
+    order (the order of ?fields=) instead of sorting them. Anything orjson
+    cannot encode natively goes through Flask's default conversions.
+    """
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.OPTIONS),
+            mimetype=self.mimetype,
+        )
+
+
+def json_provider(app, encoder="auto"):
+    """JSON provider for JSON_ENCODER: auto (orjson if installed), orjson, json"""
+    if encoder == "orjson" and not ORJSON_AVAILABLE:
+        raise RuntimeError("JSON_ENCODER=orjson but orjson is not installed")
+    if encoder in ("auto", "orjson") and ORJSON_AVAILABLE:
+        return OrjsonProvider(app)
+    return DefaultJSONProvider(app)
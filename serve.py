@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Production server for the Simple Note App (gunicorn)
+
+A master process supervises WEB_WORKERS worker processes. Each builds its
+own database pools (see frontend.init_worker).
+
+By default (WEB_WORKER_CLASS=uvicorn) each worker runs asgi.application
+on an event loop: Flask requests run on a bounded thread pool (see
+asgi.py), while /api/events streams wait for changes as coroutines, so
+idle SSE clients hold no thread and up to EVENTS_MAX_STREAMS of them are
+accepted per worker.
+
+WEB_WORKER_CLASS=gthread runs the WSGI app on WEB_THREADS OS threads per
+worker. An open /api/events stream holds one of those threads, so unless
+EVENTS_MAX_STREAMS is set, each worker accepts at most half of WEB_THREADS
+streams and keeps the rest for requests; a warning at startup says so.
+
+WEB_WORKER_CLASS=gevent runs every connection as a greenlet instead, but
+gevent can only switch greenlets on I/O it has patched. sqlite3 and the C
+extension of mysql-connector block the whole worker while they wait, so
+gevent requires DB_TYPE=mysql and runs the pure-Python MySQL driver.
+SQLite is not supported with it.
+
+    python3 serve.py
+
+Send SIGHUP to the master to reload gracefully: new workers start on the new
+code while old ones finish their in-flight requests.
+
+Workers write their Prometheus samples to METRICS_DIR, so /metrics on any
+worker reports the totals of all of them.
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+
+# Try to load environment variables from .env file
+try:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+except ImportError:
+    pass
+
+PORT = int(os.getenv("FLASK_PORT", 5000))
+HOST = os.getenv("FLASK_HOST", "0.0.0.0")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# uvicorn, gthread, gevent
+WEB_WORKER_CLASS = os.getenv("WEB_WORKER_CLASS", "uvicorn")
+WEB_THREADS = int(os.getenv("WEB_THREADS", 32))
+WEB_WORKER_CONNECTIONS = int(os.getenv("WEB_WORKER_CONNECTIONS", 1000))
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", 30))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+WEB_KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", 5))
+# Recycle workers after this many requests (0 = never) to cap memory growth
+WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", 0))
+# Import the app once in the master and fork it (not with gevent, which must
+# patch the stdlib in each worker before the app is imported)
+WEB_PRELOAD = os.getenv("WEB_PRELOAD", "false").lower() in ("1", "true", "yes")
+WEB_PRELOAD = WEB_PRELOAD and WEB_WORKER_CLASS != "gevent"
+# gunicorn worker class for each WEB_WORKER_CLASS that is not built in
+WORKER_CLASSES = {"uvicorn": "uvicorn.workers.UvicornWorker"}
+METRICS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.path.join(
+    tempfile.gettempdir(), f"noteapp-metrics-{PORT}"
+)
+
+
+def on_starting(server):
+    """Start from empty metrics files: counters restart with the server"""
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR)
+
+
+def post_worker_init(worker):
+    """Give each worker fresh DB pools and start its background threads"""
+    # With preload the app module was imported by the master: connections
+    # and threads it created must not be shared with the children
+    import frontend
+
+    frontend.init_worker()
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauge samples from /metrics"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid, METRICS_DIR)
+
+
+class NoteAppServer(BaseApplication):
+    """Runs frontend:app under gunicorn with settings from the environment"""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if WEB_WORKER_CLASS == "uvicorn":
+            from asgi import application
+
+            return application
+        from frontend import app
+
+        return app
+
+
+def server_options():
+    """gunicorn settings built from the WEB_* environment variables"""
+    options = {
+        "bind": f"{HOST}:{PORT}",
+        "workers": WEB_WORKERS,
+        "worker_class": WORKER_CLASSES.get(WEB_WORKER_CLASS, WEB_WORKER_CLASS),
+        "timeout": WEB_TIMEOUT,
+        "graceful_timeout": WEB_GRACEFUL_TIMEOUT,
+        "keepalive": WEB_KEEPALIVE,
+        "max_requests": WEB_MAX_REQUESTS,
+        "max_requests_jitter": WEB_MAX_REQUESTS // 10,
+        "on_starting": on_starting,
+        "child_exit": child_exit,
+        "accesslog": "-",
+    }
+    if WEB_WORKER_CLASS != "uvicorn":
+        # The ASGI lifespan startup calls init_worker() under uvicorn
+        options["post_worker_init"] = post_worker_init
+    if WEB_WORKER_CLASS == "gevent":
+        options["worker_connections"] = WEB_WORKER_CONNECTIONS
+    else:
+        options["preload_app"] = WEB_PRELOAD
+    if WEB_WORKER_CLASS == "gthread":
+        options["threads"] = WEB_THREADS
+    return options
+
+
+def worker_environment():
+    """Settings the workers need for WEB_WORKER_CLASS; exits if unsupported"""
+    if WEB_WORKER_CLASS == "gevent":
+        if os.getenv("DB_TYPE", "auto") != "mysql":
+            print(
+                "❌ WEB_WORKER_CLASS=gevent requires DB_TYPE=mysql: sqlite3 calls "
+                "block every greenlet of the worker"
+            )
+            sys.exit(1)
+        # The C extension's socket I/O is invisible to gevent
+        os.environ["DB_MYSQL_USE_PURE"] = "true"
+    elif WEB_WORKER_CLASS == "gthread":
+        # Every open /api/events stream holds a thread: keep half for requests
+        streams = os.environ.setdefault(
+            "EVENTS_MAX_STREAMS", str(max(1, WEB_THREADS // 2))
+        )
+        print(
+            f"⚠️  gthread workers accept at most {streams} /api/events streams "
+            "each (EVENTS_MAX_STREAMS); the default uvicorn workers hold no "
+            "thread per stream"
+        )
+
+
+if __name__ == "__main__":
+    worker_environment()
+    # Must be set before any process imports prometheus_client
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = METRICS_DIR
+    options = server_options()
+    print(
+        f"🚀 Starting gunicorn on http://{options['bind']} "
+        f"({WEB_WORKERS} {WEB_WORKER_CLASS} workers)"
+    )
+    NoteAppServer(options).run()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""Incremental snapshots stored as content-addressed, deduplicated chunks
+
+Every snapshot is a complete, restorable copy of the database, but it
+only adds the chunks that changed since earlier snapshots:
+
+- SQLite: a consistent copy of the database file (see backup.py) is cut
+  into fixed SNAPSHOT_CHUNK_SIZE pieces. These line up with database
+  pages, so a snapshot stores roughly the pages written since the last
+  one.
+- MariaDB: a mysqldump with one row per line is cut at line boundaries
+  chosen by the line's content. An inserted, changed or deleted row only
+  changes the chunk around it.
+
+Chunks are zlib-compressed and named by the SHA-256 of their content
+under SNAPSHOT_DIR/chunks/. Each snapshot is a JSON manifest under
+SNAPSHOT_DIR/manifests/ that lists its chunks in order.
+
+Usage (uses the same .env / DB_* settings as frontend.py):
+    python3 snapshots.py create [sqlite|mysql]
+    python3 snapshots.py list
+    python3 snapshots.py restore <snapshot id> [output file]
+    python3 snapshots.py verify [snapshot id]
+    python3 snapshots.py prune
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+import backup
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(backup.BACKUP_DIR, "snapshots"))
+# Fixed chunk size for SQLite files; a multiple of the page size
+SNAPSHOT_CHUNK_SIZE = int(os.getenv("SNAPSHOT_CHUNK_SIZE", 64 * 1024))
+# Content-defined chunks of a MariaDB dump: a line ends a chunk when its
+# hash is divisible by SNAPSHOT_LINE_DIVISOR (within the min/max sizes)
+SNAPSHOT_LINE_DIVISOR = int(os.getenv("SNAPSHOT_LINE_DIVISOR", 64))
+SNAPSHOT_MIN_CHUNK = int(os.getenv("SNAPSHOT_MIN_CHUNK", 16 * 1024))
+SNAPSHOT_MAX_CHUNK = int(os.getenv("SNAPSHOT_MAX_CHUNK", 256 * 1024))
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", 30))  # per backend, 0 = all
+
+SNAPSHOT_ID_FORMAT = "%Y%m%d_%H%M%S"
+
+
+class ChunkStore:
+    """Directory of zlib-compressed chunks named by their SHA-256"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data):
+        """Store a chunk unless present; returns (digest, stored_bytes)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        partial = path + ".partial"
+        with open(partial, "wb") as out:
+            out.write(compressed)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(partial, path)
+        return digest, len(compressed)
+
+    def get(self, digest):
+        """Read a chunk back, raising ValueError if it is damaged"""
+        with open(self.path(digest), "rb") as chunk:
+            try:
+                data = zlib.decompress(chunk.read())
+            except zlib.error as err:
+                raise ValueError(f"chunk {digest} is corrupt: {err}")
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"chunk {digest} does not match its hash")
+        return data
+
+    def digests(self):
+        """Every chunk digest in the store"""
+        if not os.path.isdir(self.root):
+            return set()
+        return {
+            name
+            for prefix in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, prefix))
+            for name in os.listdir(os.path.join(self.root, prefix))
+            if not name.endswith(".partial")
+        }
+
+    def remove(self, digest):
+        os.remove(self.path(digest))
+
+
+store = ChunkStore(os.path.join(SNAPSHOT_DIR, "chunks"))
+MANIFEST_DIR = os.path.join(SNAPSHOT_DIR, "manifests")
+
+
+@contextmanager
+def store_lock():
+    """Serialize snapshot writers with pruning
+
+    Without it, prune could delete a chunk that a running snapshot found
+    already stored but has not listed in its manifest yet.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(os.path.join(SNAPSHOT_DIR, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def fixed_chunks(stream, size):
+    while True:
+        data = stream.read(size)
+        if not data:
+            return
+        yield data
+
+
+def line_chunks(stream):
+    """Content-defined chunks of a text stream, cut after whole lines"""
+    chunk = []
+    length = 0
+    for line in stream:
+        chunk.append(line)
+        length += len(line)
+        boundary = zlib.crc32(line) % SNAPSHOT_LINE_DIVISOR == 0
+        if length >= SNAPSHOT_MAX_CHUNK or (boundary and length >= SNAPSHOT_MIN_CHUNK):
+            yield b"".join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def store_chunks(chunks, manifest):
+    """Store chunks and record them in the manifest"""
+    whole = hashlib.sha256()
+    for data in chunks:
+        digest, stored = store.put(data)
+        whole.update(data)
+        manifest["chunks"].append(digest)
+        manifest["size"] += len(data)
+        manifest["new_chunks"] += 1 if stored else 0
+        manifest["new_bytes"] += stored
+    manifest["sha256"] = whole.hexdigest()
+
+
+def snapshot_sqlite(settings, manifest):
+    db_path = settings.DATABASE_PATH
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"database file not found: {db_path}")
+    copy = os.path.join(SNAPSHOT_DIR, f"{manifest['id']}.db")
+    try:
+        backup.snapshot_sqlite(db_path, copy)
+        backup.quick_check(copy)
+        with open(copy, "rb") as src:
+            store_chunks(fixed_chunks(src, SNAPSHOT_CHUNK_SIZE), manifest)
+    finally:
+        backup.remove_sqlite_files(copy)
+
+
+def snapshot_mysql(settings, manifest):
+    argv, env = backup.mysql_command(
+        settings,
+        "mysqldump",
+        "--single-transaction",
+        "--quick",
+        "--routines",
+        "--triggers",
+        "--default-character-set=utf8mb4",
+        # One row per line and no timestamp, so unchanged rows dedupe
+        "--skip-extended-insert",
+        "--skip-dump-date",
+    )
+    dump = subprocess.Popen(argv, env=env, stdout=subprocess.PIPE)
+    try:
+        store_chunks(line_chunks(dump.stdout), manifest)
+    finally:
+        dump.stdout.close()
+        if dump.wait() != 0:
+            raise RuntimeError(f"mysqldump exited with status {dump.returncode}")
+
+
+def write_manifest(manifest):
+    os.makedirs(MANIFEST_DIR, exist_ok=True)
+    path = os.path.join(MANIFEST_DIR, f"{manifest['id']}.json")
+    partial = path + ".partial"
+    with open(partial, "w") as out:
+        json.dump(manifest, out, indent=1)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(partial, path)
+
+
+def create_snapshot(settings, backend):
+    """Take a snapshot of one backend and return its manifest"""
+    snapshot_id = f"{backend}_{datetime.now():{SNAPSHOT_ID_FORMAT}}"
+    while os.path.exists(os.path.join(MANIFEST_DIR, f"{snapshot_id}.json")):
+        time.sleep(0.2)
+        snapshot_id = f"{backend}_{datetime.now():{SNAPSHOT_ID_FORMAT}}"
+    manifest = {
+        "id": snapshot_id,
+        "backend": backend,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "chunk_size": SNAPSHOT_CHUNK_SIZE if backend == "sqlite" else None,
+        "size": 0,
+        "new_chunks": 0,
+        "new_bytes": 0,
+        "chunks": [],
+    }
+    with store_lock():
+        if backend == "mysql":
+            snapshot_mysql(settings, manifest)
+        else:
+            snapshot_sqlite(settings, manifest)
+        write_manifest(manifest)
+    return manifest
+
+
+def load_manifests():
+    """Every snapshot manifest, oldest first"""
+    if not os.path.isdir(MANIFEST_DIR):
+        return []
+    manifests = []
+    for name in sorted(os.listdir(MANIFEST_DIR)):
+        if name.endswith(".json"):
+            with open(os.path.join(MANIFEST_DIR, name)) as manifest:
+                manifests.append(json.load(manifest))
+    return sorted(manifests, key=lambda manifest: manifest["created_at"])
+
+
+def load_manifest(snapshot_id):
+    path = os.path.join(MANIFEST_DIR, f"{snapshot_id}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"snapshot not found: {snapshot_id}")
+    with open(path) as manifest:
+        return json.load(manifest)
+
+
+def rebuild(manifest, path):
+    """Reassemble a snapshot into ``path`` and check its overall hash"""
+    whole = hashlib.sha256()
+    with open(path, "wb") as out:
+        for digest in manifest["chunks"]:
+            data = store.get(digest)
+            whole.update(data)
+            out.write(data)
+    if whole.hexdigest() != manifest["sha256"]:
+        raise ValueError(f"snapshot {manifest['id']} does not match its hash")
+
+
+def verify(manifests):
+    """Check every chunk the manifests use; returns {snapshot id: [errors]}"""
+    checked = {}
+    problems = {}
+    for manifest in manifests:
+        for digest in manifest["chunks"]:
+            if digest not in checked:
+                try:
+                    store.get(digest)
+                    checked[digest] = None
+                except FileNotFoundError:
+                    checked[digest] = f"chunk {digest} is missing"
+                except ValueError as err:
+                    checked[digest] = str(err)
+            if checked[digest]:
+                problems.setdefault(manifest["id"], []).append(checked[digest])
+    return problems
+
+
+def prune_snapshots():
+    """Drop snapshots beyond SNAPSHOT_KEEP, then chunks nothing uses"""
+    removed = []
+    with store_lock():
+        manifests = load_manifests()
+        for backend in backup.EXTENSIONS:
+            own = [m for m in manifests if m["backend"] == backend]
+            expired = own[:-SNAPSHOT_KEEP] if SNAPSHOT_KEEP else []
+            for manifest in expired:
+                os.remove(os.path.join(MANIFEST_DIR, f"{manifest['id']}.json"))
+                removed.append(manifest["id"])
+        used = {
+            digest for manifest in load_manifests() for digest in manifest["chunks"]
+        }
+        unused = store.digests() - used
+        for digest in unused:
+            store.remove(digest)
+    return removed, len(unused)
+
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else None
+    if command not in ("create", "list", "restore", "verify", "prune"):
+        print(__doc__)
+        return 2
+
+    if command == "list":
+        for manifest in load_manifests():
+            print(
+                f"{manifest['id']:<24} {manifest['size'] / 1024:>10.1f} KiB  "
+                f"{len(manifest['chunks']):>6} chunks  "
+                f"+{manifest['new_bytes'] / 1024:.1f} KiB new"
+            )
+        return 0
+    if command == "verify":
+        try:
+            manifests = [load_manifest(argv[2])] if len(argv) > 2 else load_manifests()
+        except FileNotFoundError as err:
+            print(f"❌ {err}")
+            return 1
+        problems = verify(manifests)
+        for snapshot_id, errors in problems.items():
+            print(f"❌ {snapshot_id}: {len(errors)} damaged chunk(s)")
+            for error in errors[:5]:
+                print(f"   {error}")
+        if not problems:
+            print(f"✅ {len(manifests)} snapshot(s) verified")
+        return 1 if problems else 0
+    if command == "prune":
+        removed, chunks = prune_snapshots()
+        for snapshot_id in removed:
+            print(f"🗑️  Removed snapshot {snapshot_id}")
+        print(f"🗑️  Removed {chunks} unused chunk(s)")
+        return 0
+
+    if command == "restore" and len(argv) < 3:
+        print("❌ Usage: python3 snapshots.py restore <snapshot id> [output file]")
+        return 2
+
+    # Reuse the app's configuration and backend selection. Its import must
+    # not migrate the database being saved; a restore migrates afterwards,
+    # in the configured mode
+    migrate = os.getenv("DB_MIGRATE", "auto")
+    os.environ["DB_MIGRATE"] = "off"
+    import frontend
+
+    frontend.DB_MIGRATE = migrate
+    frontend.database.start()
+
+    try:
+        if command == "create":
+            if len(argv) > 2:
+                backend = argv[2]
+            else:
+                current = frontend.database.current()
+                backend = current.name if current else "sqlite"
+            if backend not in backup.EXTENSIONS:
+                print(f"❌ Unknown backend: {backend}")
+                return 2
+            started = time.monotonic()
+            manifest = create_snapshot(frontend, backend)
+            print(
+                f"✅ Snapshot {manifest['id']}: {len(manifest['chunks'])} chunks, "
+                f"{manifest['new_chunks']} new "
+                f"({manifest['new_bytes'] / 1024:.1f} KiB stored of "
+                f"{manifest['size'] / 1024:.1f} KiB, "
+                f"{time.monotonic() - started:.2f}s)"
+            )
+            return 0
+
+        manifest = load_manifest(argv[2])
+        extension = backup.EXTENSIONS[manifest["backend"]]
+        if len(argv) > 3:
+            rebuild(manifest, argv[3])
+            print(f"✅ Snapshot {manifest['id']} written to {argv[3]}")
+            return 0
+
+        staged = os.path.join(SNAPSHOT_DIR, f"{manifest['id']}.restore{extension}")
+        try:
+            rebuild(manifest, staged)
+            saved = backup.restore_backup(frontend, staged, manifest["backend"])
+        finally:
+            backup.remove_sqlite_files(staged)
+        if saved:
+            print(f"📦 Saved current database: {saved}")
+        print(
+            f"✅ {manifest['backend']} database restored from snapshot {manifest['id']}"
+        )
+        return 0
+    except Exception as err:
+        print(f"❌ {command} failed: {err}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
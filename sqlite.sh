@@ -11,23 +11,8 @@ DB_FILE="/shared/notes.db"
 
 echo "Database file: $DB_FILE"
 
-# Remove any existing database for clean setup
-if [ -f "$DB_FILE" ]; then
-    echo "Removing existing database for fresh setup..."
-    rm -f "$DB_FILE"
-fi
-
-# Create SQLite database and table
-sqlite3 "$DB_FILE" << 'EOF'
-CREATE TABLE IF NOT EXISTS notes (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    title TEXT NOT NULL,
-    content TEXT NOT NULL,
-    author TEXT NOT NULL,
-    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-EOF
+# Create or upgrade the schema in place; existing notes are kept
+DB_TYPE=sqlite DB_PATH="$DB_FILE" python3 migrations.py upgrade
 
 if [ $? -eq 0 ]; then
     echo "✅ SQLite database setup complete!"
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""SQLite connection tuning and background WAL checkpoints"""
+
+import threading
+import time
+
+
+def apply_pragmas(conn, pragmas):
+    """Run ``PRAGMA name=value`` for every (name, value) pair in order"""
+    cursor = conn.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+            cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class WalCheckpointer:
+    """Checkpoints the write-ahead log every ``interval`` seconds
+
+    SQLite checkpoints on its own once the WAL reaches wal_autocheckpoint
+    pages, but only from a committing writer and never while a reader is
+    still using old pages, so under steady read load the WAL can keep
+    growing. A PASSIVE checkpoint copies whatever it can without waiting on
+    readers or writers; TRUNCATE also resets the WAL file to zero bytes.
+
+    The checkpoint runs on a connection checked out from ``pool`` (the
+    writer pool), so it never races the process's own writes.
+    """
+
+    MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+    def __init__(self, pool, interval=60.0, mode="PASSIVE"):
+        mode = mode.upper()
+        if mode not in self.MODES:
+            raise ValueError(f"unknown checkpoint mode: {mode}")
+        self.pool = pool
+        self.interval = interval
+        self.mode = mode
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+        self._runs = 0
+        self._busy = 0
+        self._errors = 0
+        self._last = None
+        self._last_ms = 0.0
+
+    def start(self):
+        """Start the checkpoint thread (again after a fork)"""
+        if not self.interval:
+            return
+        with self._lock:
+            # Stops a thread left over from an earlier start()
+            self._wake.set()
+            self._wake = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="sqlite-checkpoint", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._wake.set()
+
+    def checkpoint(self):
+        """Run one checkpoint and return (busy, wal_pages, checkpointed_pages)"""
+        started = time.monotonic()
+        conn = self.pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"PRAGMA wal_checkpoint({self.mode})")
+                result = tuple(cursor.fetchone())
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        with self._lock:
+            self._runs += 1
+            self._busy += 1 if result[0] else 0
+            self._last = result
+            self._last_ms = (time.monotonic() - started) * 1000
+        return result
+
+    def stats(self):
+        with self._lock:
+            busy, wal_pages, checkpointed = self._last or (None, None, None)
+            return {
+                "mode": self.mode,
+                "interval_s": self.interval,
+                "running": self._thread is not None and self._thread.is_alive(),
+                "runs": self._runs,
+                "busy": self._busy,
+                "errors": self._errors,
+                "last_wal_pages": wal_pages,
+                "last_checkpointed_pages": checkpointed,
+                "last_ms": round(self._last_ms, 3),
+            }
+
+    def _run(self):
+        wake = self._wake
+        while not wake.wait(self.interval):
+            try:
+                self.checkpoint()
+            except Exception as err:
+                with self._lock:
+                    self._errors += 1
+                print(f"SQLite checkpoint error: {err}")
@@ -0,0 +1,764 @@
+let notes = [];
+let notesVersion = null;
+let isDragging = false;
+let currentNote = null;
+let offset = { x: 0, y: 0 };
+
+// Interactive background system
+let canvas, ctx;
+let nodes = [];
+let polygons = [];
+let mouse = { x: 0, y: 0 };
+let animationId;
+
+// Z-index management for note cards
+let highestZIndex = 100;
+
+// Load notes on page load
+document.addEventListener('DOMContentLoaded', function() {
+    loadNotes();
+    subscribeToChanges();
+    initInteractiveBackground();
+});
+
+// Initialize interactive background
+function initInteractiveBackground() {
+    canvas = document.getElementById('backgroundCanvas');
+    if (!canvas) {
+        console.error('Canvas not found!');
+        return;
+    }
+
+    ctx = canvas.getContext('2d');
+    if (!ctx) {
+        console.error('Could not get canvas context!');
+        return;
+    }
+
+    resizeCanvas();
+    createNodes();
+    animate();
+
+    // Event listeners
+    window.addEventListener('resize', resizeCanvas);
+    canvas.addEventListener('mousemove', updateMouse);
+    canvas.addEventListener('click', createPolygonOnClick);
+
+    // Also listen on document for backup
+    document.addEventListener('mousemove', updateMouseGlobal);
+    document.addEventListener('click', handleGlobalClick);
+
+    console.log('Interactive background initialized!');
+}
+
+// Global mouse tracking as backup
+function updateMouseGlobal(e) {
+    mouse.x = e.clientX;
+    mouse.y = e.clientY;
+}
+
+// Handle clicks on the document
+function handleGlobalClick(e) {
+    // Only handle if clicking on the background (not on UI elements)
+    const elementUnderMouse = document.elementFromPoint(e.clientX, e.clientY);
+    if (elementUnderMouse && elementUnderMouse.id === 'backgroundCanvas') {
+        createPolygonOnClick(e);
+    }
+}
+
+// Resize canvas to fill window
+function resizeCanvas() {
+    canvas.width = window.innerWidth;
+    canvas.height = window.innerHeight;
+}
+
+// Update mouse position
+function updateMouse(e) {
+    mouse.x = e.clientX;
+    mouse.y = e.clientY;
+
+    // Visual feedback - change cursor style based on nearby nodes
+    const nearbyNodes = nodes.filter(node => {
+        const dx = node.x - mouse.x;
+        const dy = node.y - mouse.y;
+        return Math.sqrt(dx * dx + dy * dy) < 150;
+    });
+
+    if (nearbyNodes.length >= 3) {
+        canvas.style.cursor = 'pointer';
+    } else {
+        canvas.style.cursor = 'crosshair';
+    }
+}
+
+// Create floating nodes
+function createNodes() {
+    const nodeCount = Math.floor((window.innerWidth * window.innerHeight) / 15000);
+    nodes = [];
+
+    for (let i = 0; i < nodeCount; i++) {
+        nodes.push({
+            x: Math.random() * canvas.width,
+            y: Math.random() * canvas.height,
+            vx: (Math.random() - 0.5) * 0.5,
+            vy: (Math.random() - 0.5) * 0.5,
+            radius: Math.random() * 2 + 1,
+            originalRadius: Math.random() * 2 + 1,
+            opacity: Math.random() * 0.5 + 0.3
+        });
+    }
+}
+
+// Create polygon on mouse click
+function createPolygonOnClick(e) {
+    // Don't create polygons if clicking on a note card or modal
+    const elementUnderMouse = document.elementFromPoint(e.clientX, e.clientY);
+    if (elementUnderMouse && (
+        elementUnderMouse.closest('.note-card') || 
+        elementUnderMouse.closest('.modal') ||
+        elementUnderMouse.closest('.floating-btn')
+    )) {
+        return;
+    }
+
+    const clickRadius = 150;
+    const nearbyNodes = nodes.filter(node => {
+        const dx = node.x - mouse.x;
+        const dy = node.y - mouse.y;
+        return Math.sqrt(dx * dx + dy * dy) < clickRadius;
+    });
+
+    if (nearbyNodes.length >= 3) {
+        // Sort nodes by angle from click point to create a proper polygon
+        nearbyNodes.sort((a, b) => {
+            const angleA = Math.atan2(a.y - mouse.y, a.x - mouse.x);
+            const angleB = Math.atan2(b.y - mouse.y, b.x - mouse.x);
+            return angleA - angleB;
+        });
+
+        const polygon = {
+            nodes: nearbyNodes.slice(0, Math.min(8, nearbyNodes.length)),
+            life: 120,
+            maxLife: 120,
+            pulsePhase: 0
+        };
+
+        polygons.push(polygon);
+
+        // Create ripple effect
+        createRipple(mouse.x, mouse.y);
+
+        // Add screen shake effect
+        document.body.style.animation = 'shake 0.3s ease-in-out';
+        setTimeout(() => {
+            document.body.style.animation = '';
+        }, 300);
+
+        // Visual feedback
+        console.log(`Polygon created with ${polygon.nodes.length} nodes!`);
+
+        // Create multiple ripples for better effect
+        setTimeout(() => createRipple(mouse.x, mouse.y), 200);
+        setTimeout(() => createRipple(mouse.x, mouse.y), 400);
+    }
+}
+
+// Add shake animation
+const shakeStyle = document.createElement('style');
+shakeStyle.textContent = `
+    @keyframes shake {
+        0%, 100% { transform: translateX(0); }
+        25% { transform: translateX(-2px); }
+        75% { transform: translateX(2px); }
+    }
+`;
+document.head.appendChild(shakeStyle);
+
+// Create ripple effect
+function createRipple(x, y) {
+    const ripple = {
+        x: x,
+        y: y,
+        radius: 0,
+        maxRadius: 200,
+        life: 60,
+        maxLife: 60
+    };
+
+    const animateRipple = () => {
+        ripple.life--;
+        ripple.radius += 4;
+
+        if (ripple.life > 0) {
+            requestAnimationFrame(animateRipple);
+        }
+    };
+
+    animateRipple();
+    polygons.push(ripple);
+}
+
+// Animation loop
+function animate() {
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+    // Update and draw nodes
+    updateNodes();
+    drawNodes();
+    drawConnections();
+
+    // Update and draw polygons
+    updatePolygons();
+    drawPolygons();
+
+    // Draw mouse connections
+    drawMouseConnections();
+
+    animationId = requestAnimationFrame(animate);
+}
+
+// Update node positions
+function updateNodes() {
+    nodes.forEach(node => {
+        // Move nodes
+        node.x += node.vx;
+        node.y += node.vy;
+
+        // Bounce off edges
+        if (node.x < 0 || node.x > canvas.width) node.vx *= -1;
+        if (node.y < 0 || node.y > canvas.height) node.vy *= -1;
+
+        // Keep nodes in bounds
+        node.x = Math.max(0, Math.min(canvas.width, node.x));
+        node.y = Math.max(0, Math.min(canvas.height, node.y));
+
+        // Mouse attraction effect
+        const dx = mouse.x - node.x;
+        const dy = mouse.y - node.y;
+        const distance = Math.sqrt(dx * dx + dy * dy);
+
+        if (distance < 100) {
+            const force = (100 - distance) / 100;
+            node.radius = node.originalRadius * (1 + force);
+            node.opacity = Math.min(1, node.opacity + force * 0.3);
+        } else {
+            node.radius = node.originalRadius;
+            node.opacity = Math.max(0.3, node.opacity - 0.02);
+        }
+    });
+}
+
+// Draw nodes
+function drawNodes() {
+    nodes.forEach(node => {
+        ctx.beginPath();
+        ctx.arc(node.x, node.y, node.radius, 0, Math.PI * 2);
+        ctx.fillStyle = `rgba(102, 126, 234, ${node.opacity})`;
+        ctx.fill();
+
+        // Add glow effect
+        ctx.beginPath();
+        ctx.arc(node.x, node.y, node.radius * 2, 0, Math.PI * 2);
+        ctx.fillStyle = `rgba(102, 126, 234, ${node.opacity * 0.2})`;
+        ctx.fill();
+    });
+}
+
+// Draw connections between nearby nodes
+function drawConnections() {
+    const maxDistance = 120;
+
+    for (let i = 0; i < nodes.length; i++) {
+        for (let j = i + 1; j < nodes.length; j++) {
+            const dx = nodes[i].x - nodes[j].x;
+            const dy = nodes[i].y - nodes[j].y;
+            const distance = Math.sqrt(dx * dx + dy * dy);
+
+            if (distance < maxDistance) {
+                const opacity = (1 - distance / maxDistance) * 0.3;
+
+                ctx.beginPath();
+                ctx.moveTo(nodes[i].x, nodes[i].y);
+                ctx.lineTo(nodes[j].x, nodes[j].y);
+                ctx.strokeStyle = `rgba(102, 126, 234, ${opacity})`;
+                ctx.lineWidth = 1;
+                ctx.stroke();
+            }
+        }
+    }
+}
+
+// Draw mouse connections
+function drawMouseConnections() {
+    const maxDistance = 150;
+
+    nodes.forEach(node => {
+        const dx = mouse.x - node.x;
+        const dy = mouse.y - node.y;
+        const distance = Math.sqrt(dx * dx + dy * dy);
+
+        if (distance < maxDistance) {
+            const opacity = (1 - distance / maxDistance) * 0.5;
+
+            ctx.beginPath();
+            ctx.moveTo(mouse.x, mouse.y);
+            ctx.lineTo(node.x, node.y);
+            ctx.strokeStyle = `rgba(118, 75, 162, ${opacity})`;
+            ctx.lineWidth = 2;
+            ctx.stroke();
+        }
+    });
+}
+
+// Update polygons
+function updatePolygons() {
+    for (let i = polygons.length - 1; i >= 0; i--) {
+        const polygon = polygons[i];
+        polygon.life--;
+        polygon.pulsePhase += 0.1;
+
+        if (polygon.life <= 0) {
+            polygons.splice(i, 1);
+        }
+    }
+}
+
+// Draw polygons
+function drawPolygons() {
+    polygons.forEach(polygon => {
+        if (polygon.maxRadius) {
+            // Draw ripple effect
+            const progress = 1 - polygon.life / polygon.maxLife;
+            const opacity = polygon.life / polygon.maxLife;
+
+            ctx.beginPath();
+            ctx.arc(polygon.x, polygon.y, polygon.radius, 0, Math.PI * 2);
+            ctx.strokeStyle = `rgba(102, 126, 234, ${opacity * 0.8})`;
+            ctx.lineWidth = 3;
+            ctx.stroke();
+
+            ctx.beginPath();
+            ctx.arc(polygon.x, polygon.y, polygon.radius * 0.7, 0, Math.PI * 2);
+            ctx.strokeStyle = `rgba(118, 75, 162, ${opacity * 0.6})`;
+            ctx.lineWidth = 2;
+            ctx.stroke();
+        } else if (polygon.nodes) {
+            // Draw polygon
+            const opacity = polygon.life / polygon.maxLife;
+            const pulse = Math.sin(polygon.pulsePhase) * 0.3 + 0.7;
+
+            // Fill polygon
+            ctx.beginPath();
+            ctx.moveTo(polygon.nodes[0].x, polygon.nodes[0].y);
+            for (let i = 1; i < polygon.nodes.length; i++) {
+                ctx.lineTo(polygon.nodes[i].x, polygon.nodes[i].y);
+            }
+            ctx.closePath();
+            ctx.fillStyle = `rgba(102, 126, 234, ${opacity * 0.1 * pulse})`;
+            ctx.fill();
+
+            // Draw polygon outline
+            ctx.strokeStyle = `rgba(102, 126, 234, ${opacity * 0.6 * pulse})`;
+            ctx.lineWidth = 2;
+            ctx.stroke();
+
+            // Draw connecting lines to center
+            const centerX = polygon.nodes.reduce((sum, node) => sum + node.x, 0) / polygon.nodes.length;
+            const centerY = polygon.nodes.reduce((sum, node) => sum + node.y, 0) / polygon.nodes.length;
+
+            polygon.nodes.forEach(node => {
+                ctx.beginPath();
+                ctx.moveTo(centerX, centerY);
+                ctx.lineTo(node.x, node.y);
+                ctx.strokeStyle = `rgba(118, 75, 162, ${opacity * 0.4 * pulse})`;
+                ctx.lineWidth = 1;
+                ctx.stroke();
+            });
+
+            // Draw center point
+            ctx.beginPath();
+            ctx.arc(centerX, centerY, 4 * pulse, 0, Math.PI * 2);
+            ctx.fillStyle = `rgba(118, 75, 162, ${opacity * pulse})`;
+            ctx.fill();
+        }
+    });
+}
+
+// Card fields only: full content is fetched on demand by fetchNote()
+const NOTE_CARD_FIELDS = 'id,title,author,created_at,updated_at,snippet,content_length';
+const NOTES_PAGE_SIZE = 200;
+
+// Last copy of every page we fetched: url -> { etag, notes, next }
+const pageCache = new Map();
+
+// Fetch one page, revalidating our copy with If-None-Match
+async function fetchPage(url) {
+    const cached = pageCache.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(url, { headers });
+    if (response.status === 304 && cached) {
+        return { page: cached, changed: false };
+    }
+    const page = {
+        etag: response.headers.get('ETag'),
+        notes: await response.json(),
+        next: response.headers.get('X-Next-Cursor'),
+        version: response.headers.get('X-Notes-Version')
+    };
+    if (page.etag) pageCache.set(url, page);
+    return { page, changed: true };
+}
+
+// Load all notes from server, one keyset page at a time
+async function loadNotes() {
+    try {
+        let loaded = [];
+        let cursor = null;
+        let changed = false;
+        let version = null;
+        do {
+            let url = `/api/notes?fields=${NOTE_CARD_FIELDS}&limit=${NOTES_PAGE_SIZE}`;
+            if (cursor) url += `&after=${encodeURIComponent(cursor)}`;
+            const result = await fetchPage(url);
+            loaded = loaded.concat(result.page.notes);
+            cursor = result.page.next;
+            // The first page's version predates every later page
+            if (version === null) version = result.page.version;
+            changed = changed || result.changed;
+        } while (cursor);
+        notesVersion = version;
+        // Nothing changed on the server: keep the cards as they are
+        if (changed || loaded.length !== notes.length) {
+            notes = loaded;
+            displayNotes();
+        }
+        updateStats();
+    } catch (error) {
+        console.error('Error loading notes:', error);
+        document.getElementById('notesContainer').innerHTML = 
+            '<div class="no-notes">❌ Error loading notes. Please refresh the page.</div>';
+    }
+}
+
+// Patch the local notes array with a change feed payload
+function applyChanges(changes) {
+    const removed = new Set(changes.deletes);
+    changes.upserts.forEach(note => removed.add(note.id));
+    notes = notes.filter(note => !removed.has(note.id)).concat(changes.upserts);
+    notes.sort((a, b) => (b.created_at || '').localeCompare(a.created_at || '') || b.id - a.id);
+    notesVersion = Math.max(notesVersion, changes.version);
+    pageCache.clear();
+}
+
+// Apply server-side changes since notesVersion without a full reload
+async function syncNotes() {
+    if (notesVersion === null) return loadNotes();
+    try {
+        let more = true;
+        while (more) {
+            const response = await fetch(
+                `/api/notes/changes?since=${notesVersion}&fields=${NOTE_CARD_FIELDS}`);
+            if (!response.ok) return loadNotes();
+            const changes = await response.json();
+            if (changes.reset) return loadNotes();
+            applyChanges(changes);
+            more = changes.has_more;
+        }
+        displayNotes();
+        updateStats();
+    } catch (error) {
+        loadNotes();
+    }
+}
+
+// Live updates pushed by the server for changes made in other tabs
+function subscribeToChanges() {
+    if (!window.EventSource) return;
+    const events = new EventSource('/api/events');
+    // Catch up on anything missed while (re)connecting
+    events.onopen = () => syncNotes();
+    events.addEventListener('changes', (e) => {
+        if (notesVersion === null) return;
+        applyChanges(JSON.parse(e.data));
+        displayNotes();
+        updateStats();
+    });
+    events.addEventListener('resync', () => loadNotes());
+}
+
+// Display notes as draggable cards
+function displayNotes(filteredNotes = null) {
+    const container = document.getElementById('notesContainer');
+    const notesToShow = filteredNotes || notes;
+
+    if (notesToShow.length === 0) {
+        container.innerHTML = '<div class="no-notes">📝 No notes found. Create your first note!</div>';
+        return;
+    }
+
+    let html = '';
+    notesToShow.forEach((note, index) => {
+        const left = 50 + (index % 4) * 320;
+        const top = 100 + Math.floor(index / 4) * 300;
+
+        html += `
+            <div class="note-card" 
+                 id="note-${note.id}" 
+                 style="left: ${left}px; top: ${top}px; z-index: ${100 + index};"
+                 onmousedown="startDrag(event, ${note.id})"
+                 onclick="bringToFront(this)"
+                 ondragstart="return false;">
+                <div class="note-header">
+                    <div>
+                        <div class="note-title">${escapeHtml(note.title)}</div>
+                        <div class="note-author">by ${escapeHtml(note.author)}</div>
+                    </div>
+                    <div class="note-date">${formatDate(note.created_at)}</div>
+                </div>
+                <div class="note-content">${escapeHtml(note.snippet)}${note.content_length > note.snippet.length ? '...' : ''}</div>
+                <div class="note-actions">
+                    <button class="btn btn-small" onclick="viewNote(${note.id})">👁️ View</button>
+                    <button class="btn btn-small" onclick="editNote(${note.id})">✏️ Edit</button>
+                    <button class="btn btn-small btn-danger" onclick="deleteNote(${note.id})">🗑️ Delete</button>
+                </div>
+            </div>
+        `;
+    });
+
+    container.innerHTML = html;
+    updateHighestZIndex(); // Update z-index tracking
+
+    // Set the most recent note (first in the list) as the top card initially
+    if (notesToShow.length > 0) {
+        const firstCard = document.getElementById(`note-${notesToShow[0].id}`);
+        if (firstCard) {
+            bringToFront(firstCard);
+        }
+    }
+}
+
+// Bring note card to front
+function bringToFront(noteElement) {
+    // Remove top-card class from all cards
+    document.querySelectorAll('.note-card').forEach(card => {
+        card.classList.remove('top-card');
+    });
+
+    highestZIndex += 1;
+    noteElement.style.zIndex = highestZIndex;
+
+    // Mark this card as the top card
+    noteElement.classList.add('top-card');
+
+    // Add subtle visual feedback
+    noteElement.style.transform = 'scale(1.02)';
+    setTimeout(() => {
+        noteElement.style.transform = '';
+    }, 150);
+}
+
+// Update highest z-index when notes are loaded
+function updateHighestZIndex() {
+    const noteCards = document.querySelectorAll('.note-card');
+    noteCards.forEach(card => {
+        const zIndex = parseInt(card.style.zIndex) || 100;
+        if (zIndex > highestZIndex) {
+            highestZIndex = zIndex;
+        }
+    });
+}
+
+// Start dragging a note
+function startDrag(e, noteId) {
+    e.preventDefault();
+    isDragging = true;
+    currentNote = document.getElementById(`note-${noteId}`);
+
+    // Bring the card to front when starting to drag
+    bringToFront(currentNote);
+
+    const rect = currentNote.getBoundingClientRect();
+    offset.x = e.clientX - rect.left;
+    offset.y = e.clientY - rect.top;
+
+    currentNote.classList.add('dragging');
+    document.addEventListener('mousemove', drag);
+    document.addEventListener('mouseup', stopDrag);
+}
+
+// Drag the note
+function drag(e) {
+    if (isDragging && currentNote) {
+        const x = e.clientX - offset.x;
+        const y = e.clientY - offset.y;
+
+        currentNote.style.left = Math.max(0, Math.min(x, window.innerWidth - currentNote.offsetWidth)) + 'px';
+        currentNote.style.top = Math.max(0, Math.min(y, window.innerHeight - currentNote.offsetHeight)) + 'px';
+    }
+}
+
+// Stop dragging
+function stopDrag() {
+    if (currentNote) {
+        currentNote.classList.remove('dragging');
+    }
+    isDragging = false;
+    currentNote = null;
+    document.removeEventListener('mousemove', drag);
+    document.removeEventListener('mouseup', stopDrag);
+}
+
+// Auto arrange notes in a grid
+function arrangeNotes() {
+    const noteCards = document.querySelectorAll('.note-card');
+    noteCards.forEach((card, index) => {
+        const left = 50 + (index % 4) * 320;
+        const top = 100 + Math.floor(index / 4) * 300;
+
+        card.style.transition = 'all 0.5s ease';
+        card.style.left = left + 'px';
+        card.style.top = top + 'px';
+
+        setTimeout(() => {
+            card.style.transition = '';
+        }, 500);
+    });
+}
+
+// Search notes (disabled - no search bar)
+function searchNotes() {
+    // Search functionality removed
+}
+
+// Clear search (disabled - no search bar)
+function clearSearch() {
+    // Clear search functionality removed
+}
+
+// Show add note modal
+function showAddModal() {
+    document.getElementById('modalTitle').textContent = '➕ Add New Note';
+    document.getElementById('noteForm').reset();
+    document.getElementById('noteId').value = '';
+    document.getElementById('noteModal').style.display = 'block';
+}
+
+// Fetch one note with its full content
+async function fetchNote(id) {
+    const response = await fetch(`/api/notes/${id}`);
+    return response.ok ? response.json() : null;
+}
+
+// View note in modal
+async function viewNote(id) {
+    const note = await fetchNote(id);
+    if (note) {
+        // Bring the note card to front when viewing
+        const noteCard = document.getElementById(`note-${id}`);
+        if (noteCard) bringToFront(noteCard);
+
+        alert(`📄 ${note.title}\n\n👤 Author: ${note.author}\n📅 Created: ${formatDate(note.created_at)}\n\n📝 Content:\n${note.content}`);
+    }
+}
+
+// Edit note
+async function editNote(id) {
+    const note = await fetchNote(id);
+    if (note) {
+        // Bring the note card to front when editing
+        const noteCard = document.getElementById(`note-${id}`);
+        if (noteCard) bringToFront(noteCard);
+
+        document.getElementById('modalTitle').textContent = '✏️ Edit Note';
+        document.getElementById('noteId').value = note.id;
+        document.getElementById('title').value = note.title;
+        document.getElementById('author').value = note.author;
+        document.getElementById('content').value = note.content;
+        document.getElementById('noteModal').style.display = 'block';
+    }
+}
+
+// Delete note
+async function deleteNote(id) {
+    const note = notes.find(n => n.id === id);
+    if (note && confirm(`🗑️ Are you sure you want to delete "${note.title}"?`)) {
+        try {
+            const response = await fetch(`/api/notes/${id}`, { method: 'DELETE' });
+            if (response.ok) {
+                syncNotes(); // Apply the change locally
+            } else {
+                alert('❌ Error deleting note!');
+            }
+        } catch (error) {
+            alert('❌ Error deleting note!');
+        }
+    }
+}
+
+// Close modal
+function closeModal() {
+    document.getElementById('noteModal').style.display = 'none';
+}
+
+// Refresh notes
+function refreshNotes() {
+    loadNotes();
+}
+
+// Update statistics (disabled - no stats bar)
+function updateStats(count = null) {
+    // Stats functionality removed
+}
+
+// Handle form submission
+document.getElementById('noteForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const noteData = {
+        title: formData.get('title'),
+        author: formData.get('author'),
+        content: formData.get('content')
+    };
+
+    const noteId = document.getElementById('noteId').value;
+    const url = noteId ? `/api/notes/${noteId}` : '/api/notes';
+    const method = noteId ? 'PUT' : 'POST';
+
+    try {
+        const response = await fetch(url, {
+            method: method,
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(noteData)
+        });
+
+        if (response.ok) {
+            closeModal();
+            syncNotes(); // Apply the change locally
+        } else {
+            alert('❌ Error saving note!');
+        }
+    } catch (error) {
+        alert('❌ Error saving note!');
+    }
+});
+
+// Close modal when clicking outside
+window.onclick = function(event) {
+    const modal = document.getElementById('noteModal');
+    if (event.target === modal) {
+        closeModal();
+    }
+}
+
+// Utility functions
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function formatDate(dateString) {
+    const date = new Date(dateString);
+    return date.toLocaleDateString() + ' ' + date.toLocaleTimeString([], {hour: '2-digit', minute:'2-digit'});
+}
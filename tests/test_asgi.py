@@ -0,0 +1,315 @@
+import asyncio
+import contextvars
+import json
+import threading
+import time
+
+import asgi
+from asgi import WsgiToAsgi, application
+
+
+def scope(method="GET", path="/", query=b"", headers=()):
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+    }
+
+
+async def call(adapter, method="GET", path="/", body=b"", headers=(), chunks=None):
+    """Run one request; returns (status, headers, body)
+
+    The body is sent in the given chunks (default: one message). The client
+    stays connected until the response ends.
+    """
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True}
+        for chunk in (chunks or [body])
+    ]
+    messages[-1]["more_body"] = False
+    sent = []
+    connected = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await connected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await adapter(scope(method, path, headers=headers), receive, send)
+    start = sent[0]
+    response_headers = {
+        name.decode(): value.decode() for name, value in start["headers"]
+    }
+    return (
+        start["status"],
+        response_headers,
+        b"".join(message.get("body", b"") for message in sent[1:]),
+    )
+
+
+def plain_app(environ, start_response):
+    body = f"{environ['REQUEST_METHOD']} {environ['PATH_INFO']}".encode()
+    body += b" " + environ["wsgi.input"].read()
+    start_response(
+        "200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))]
+    )
+    return [body]
+
+
+def streamed_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "application/x-ndjson")])
+    return (b"%d\n" % index for index in range(3))
+
+
+class BlockingApp:
+    """WSGI app that holds its thread until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, environ, start_response):
+        self.started.set()
+        self.release.wait(5)
+        return plain_app(environ, start_response)
+
+
+def test_buffered_response_with_the_request_body():
+    adapter = WsgiToAsgi(plain_app, threads=1)
+    status, headers, body = asyncio.run(
+        call(adapter, "POST", "/api/notes", chunks=[b"ab", b"cd"])
+    )
+    assert status == 200
+    assert headers["content-type"] == "text/plain"
+    assert body == b"POST /api/notes abcd"
+
+
+def test_streamed_response_is_sent_in_chunks():
+    adapter = WsgiToAsgi(streamed_app, threads=1)
+    status, headers, body = asyncio.run(call(adapter))
+    assert status == 200
+    assert "content-length" not in headers
+    assert body == b"0\n1\n2\n"
+    assert adapter.stats()["streams"] == 0
+
+
+def test_full_queue_answers_503():
+    app = BlockingApp()
+    adapter = WsgiToAsgi(app, threads=1, max_queue=0)
+
+    async def run():
+        first = asyncio.ensure_future(call(adapter))
+        await asyncio.get_running_loop().run_in_executor(None, app.started.wait, 5)
+        rejected = await call(adapter)
+        app.release.set()
+        return await first, rejected
+
+    (status, _, _), (rejected, headers, body) = asyncio.run(run())
+    assert status == 200
+    assert rejected == 503
+    assert headers["retry-after"] == "1"
+    assert b"queue is full" in body
+    assert adapter.stats()["rejected"] == 1
+
+
+def test_queue_timeout_answers_503():
+    app = BlockingApp()
+    adapter = WsgiToAsgi(app, threads=1, max_queue=10, queue_timeout=0.05)
+
+    async def run():
+        first = asyncio.ensure_future(call(adapter))
+        await asyncio.get_running_loop().run_in_executor(None, app.started.wait, 5)
+        timed_out = await call(adapter)
+        app.release.set()
+        await first
+        return timed_out
+
+    status, _, body = asyncio.run(run())
+    assert status == 503
+    assert b"timed out" in body
+    assert adapter.stats()["queue_timeouts"] == 1
+    assert adapter.stats()["queued"] == 0
+
+
+def test_app_error_answers_500():
+    def failing_app(environ, start_response):
+        raise RuntimeError("boom")
+
+    status, _, body = asyncio.run(call(WsgiToAsgi(failing_app)))
+    assert status == 500
+    assert b"Internal server error" in body
+
+
+def test_application_serves_the_api(client, create_note):
+    create_note("over asgi")
+    status, headers, body = asyncio.run(call(application, path="/api/notes"))
+    assert status == 200
+    assert headers["content-type"] == "application/json"
+    assert b"over asgi" in body
+
+
+class Stream:
+    """Streamed WSGI body that yields once released and records its close"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.closed = False
+
+    def __iter__(self):
+        self.started.set()
+        self.release.wait(5)
+        yield b"done\n"
+
+    def close(self):
+        self.closed = True
+
+
+def test_streams_past_the_stream_threads_answer_503():
+    streams = []
+
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/event-stream")])
+        streams.append(Stream())
+        return streams[-1]
+
+    adapter = WsgiToAsgi(app, threads=2, stream_threads=1)
+
+    async def run():
+        first = asyncio.ensure_future(call(adapter))
+        while not streams or not streams[0].started.is_set():
+            await asyncio.sleep(0.01)
+        rejected = await call(adapter)
+        streams[0].release.set()
+        return await first, rejected
+
+    (status, _, body), (rejected, headers, reason) = asyncio.run(run())
+    assert status == 200 and body == b"done\n"
+    assert rejected == 503
+    assert headers["retry-after"] == "1"
+    assert b"too many open streams" in reason
+    # Both bodies are closed: the refused one before any header was sent
+    assert [stream.closed for stream in streams] == [True, True]
+    assert adapter.stats()["streams"] == 0
+
+
+def test_request_body_is_read_as_the_app_asks_for_it():
+    lines = []
+
+    def app(environ, start_response):
+        for line in environ["wsgi.input"]:
+            lines.append(line)
+        start_response("204 No Content", [("Content-Length", "0")])
+        return []
+
+    chunks = [b"first\nsec", b"ond\n", b"third"]
+    status, _, _ = asyncio.run(call(WsgiToAsgi(app), "POST", chunks=chunks))
+    assert status == 204
+    assert lines == [b"first\n", b"second\n", b"third"]
+
+
+def test_repeated_cookie_headers_are_joined_with_semicolons():
+    seen = {}
+
+    def app(environ, start_response):
+        seen.update(environ)
+        return plain_app(environ, start_response)
+
+    headers = [("cookie", "a=1"), ("cookie", "b=2"), ("accept", "x"), ("accept", "y")]
+    asyncio.run(call(WsgiToAsgi(app), headers=headers))
+    assert seen["HTTP_COOKIE"] == "a=1; b=2"
+    assert seen["HTTP_ACCEPT"] == "x,y"
+    assert seen["wsgi.input_terminated"] is True
+
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_app_runs_in_the_request_context_on_every_thread():
+    def app(environ, start_response):
+        # Set while the app starts, as the tracer does, and read by the
+        # chunks that stream threads pull later
+        request_id.set(environ["PATH_INFO"])
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return (f"{request_id.get()}\n".encode() for _ in range(2))
+
+    adapter = WsgiToAsgi(app, threads=1, stream_threads=2)
+
+    async def run():
+        return await asyncio.gather(
+            call(adapter, path="/one"), call(adapter, path="/two")
+        )
+
+    (_, _, first), (_, _, second) = asyncio.run(run())
+    assert first == b"/one\n/one\n"
+    assert second == b"/two\n/two\n"
+    assert request_id.get() is None
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_events_are_served_on_the_event_loop(
+    client, create_note, frontend, monkeypatch
+):
+    monkeypatch.setattr(asgi, "EVENTS_HEARTBEAT", 0.05)
+
+    def wsgi_app(environ, start_response):
+        raise AssertionError("/api/events must not reach the WSGI app")
+
+    adapter = WsgiToAsgi(wsgi_app, async_routes={"/api/events": asgi.event_stream})
+    sent = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        left = asyncio.Event()
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await left.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if b"event: changes" in message.get("body", b""):
+                left.set()
+
+        stream = asyncio.ensure_future(
+            adapter(scope(path="/api/events"), receive, send)
+        )
+        await loop.run_in_executor(
+            None, wait_for, lambda: frontend.note_events.stats()["version"] is not None
+        )
+        note_id = await loop.run_in_executor(None, create_note, "pushed")
+        await asyncio.wait_for(stream, 2)
+        return note_id
+
+    note_id = asyncio.run(run())
+    assert sent[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in sent[0]["headers"]
+    body = b"".join(message.get("body", b"") for message in sent[1:]).decode()
+    assert body.startswith("retry: 3000\n\n")
+    data = body.split("event: changes\ndata: ", 1)[1].split("\n", 1)[0]
+    assert json.loads(data)["upserts"][0]["id"] == note_id
+    # Unsubscribed as soon as the client left, not at the next heartbeat
+    assert frontend.note_events.stats()["subscribers"] == 0
+
+
+def test_events_past_the_limit_answer_503(monkeypatch):
+    monkeypatch.setattr(asgi, "EVENTS_MAX_STREAMS", 0)
+    status, _, body = asyncio.run(call(application, path="/api/events"))
+    assert status == 503
+    assert b"Too many event streams" in body
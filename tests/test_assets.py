@@ -0,0 +1,62 @@
+import gzip
+import re
+
+import pytest
+
+from assets import BROTLI_AVAILABLE, IMMUTABLE, Asset
+
+
+def asset_urls(client):
+    page = client.get("/").get_data(as_text=True)
+    return re.findall(r'(/static/app\.[0-9a-f]{12}\.(?:css|js))"', page)
+
+
+def test_page_links_fingerprinted_assets(client):
+    response = client.get("/")
+    assert response.headers["Cache-Control"] == "no-cache"
+    urls = asset_urls(client)
+    assert len(urls) == 2
+    for url in urls:
+        asset = client.get(url)
+        assert asset.status_code == 200
+        assert asset.headers["Cache-Control"] == IMMUTABLE
+
+
+def test_unknown_or_stale_asset_names_are_404(client):
+    assert client.get("/static/app.css").status_code == 404
+    assert client.get("/static/app.000000000000.css").status_code == 404
+
+
+def test_precompressed_variant_matches_the_file(client):
+    css = next(url for url in asset_urls(client) if url.endswith(".css"))
+    plain = client.get(css, headers={"Accept-Encoding": "identity"})
+    zipped = client.get(css, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(zipped.data) == plain.data
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli not installed")
+def test_brotli_is_preferred(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+
+
+def test_etag_answers_304(client):
+    etag = client.get("/", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    response = client.get(
+        "/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_variants_are_stable_and_only_kept_when_smaller():
+    body = b"body { color: red; }\n" * 100
+    assert (
+        Asset(body, "text/css", IMMUTABLE).etags
+        == Asset(body, "text/css", IMMUTABLE).etags
+    )
+    assert list(Asset(b"x", "text/plain", IMMUTABLE).variants) == [None]
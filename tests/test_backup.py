@@ -0,0 +1,88 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import backup
+
+
+@pytest.fixture
+def backup_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(backup, "BACKUP_DIR", str(tmp_path))
+    return tmp_path
+
+
+def titles(client):
+    return [note["title"] for note in client.get("/api/notes").get_json()]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "xz", "none"])
+def test_backup_restores_the_notes_it_was_taken_of(
+    client, create_note, frontend, backup_dir, monkeypatch, compression
+):
+    monkeypatch.setattr(backup, "BACKUP_COMPRESSION", compression)
+    create_note("kept")
+    path = backup.create_backup(frontend, "sqlite")
+    assert backup.list_backups()[0][2] == path
+
+    create_note("after the backup")
+    backup.restore_sqlite(frontend, path)
+    frontend.notes_changed()
+    assert titles(client) == ["kept"]
+
+
+def test_restore_saves_the_current_data_and_resets_the_feed(
+    client, create_note, frontend, backup_dir
+):
+    create_note("kept")
+    path = backup.create_backup(frontend, "sqlite")
+    create_note("after the backup")
+    since = int(client.get("/api/notes").headers["X-Notes-Version"])
+
+    saved = backup.restore_backup(frontend, path, "sqlite")
+    assert titles(client) == ["kept"]
+    assert int(client.get("/api/notes").headers["X-Notes-Version"]) > since
+    feed = client.get(f"/api/notes/changes?since={since}").get_json()
+    assert feed["reset"] is True
+
+    # The data replaced by the restore can itself be restored
+    backup.restore_backup(frontend, saved, "sqlite")
+    assert titles(client) == ["after the backup", "kept"]
+
+
+def test_corrupt_backup_is_not_restored(client, create_note, frontend, backup_dir):
+    create_note("kept")
+    path = backup_dir / "sqlite_20240101_000000.db"
+    path.write_bytes(b"not a database" * 100)
+    with pytest.raises(Exception):
+        backup.restore_sqlite(frontend, str(path))
+    assert titles(client) == ["kept"]
+    assert not os.path.exists(frontend.DATABASE_PATH + ".restore")
+
+
+def test_prune_keeps_the_newest_backups(backup_dir, monkeypatch):
+    monkeypatch.setattr(backup, "BACKUP_KEEP", 2)
+    monkeypatch.setattr(backup, "BACKUP_MAX_AGE_DAYS", 0)
+    now = datetime.now()
+    names = [
+        f"sqlite_{now - timedelta(hours=hours):%Y%m%d_%H%M%S}.db.gz"
+        for hours in (3, 2, 1)
+    ]
+    for name in names:
+        (backup_dir / name).write_bytes(b"")
+    (backup_dir / "unrelated.txt").write_bytes(b"")
+
+    removed = backup.prune_backups()
+    assert [os.path.basename(path) for path in removed] == [names[0]]
+    assert sorted(os.listdir(backup_dir)) == sorted(names[1:] + ["unrelated.txt"])
+
+
+def test_old_backups_expire_but_the_newest_is_kept(backup_dir, monkeypatch):
+    monkeypatch.setattr(backup, "BACKUP_KEEP", 0)
+    monkeypatch.setattr(backup, "BACKUP_MAX_AGE_DAYS", 1)
+    old = datetime.now() - timedelta(days=3)
+    for days in (1, 0):
+        name = f"sqlite_{old - timedelta(days=days):%Y%m%d_%H%M%S}.db"
+        (backup_dir / name).write_bytes(b"")
+    assert len(backup.prune_backups()) == 1
+    assert len(backup.list_backups()) == 1
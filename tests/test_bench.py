@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+import bench
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert bench.percentile(values, 0.50) == 50
+    assert bench.percentile(values, 0.99) == 99
+    assert bench.percentile([7], 0.95) == 7
+    assert bench.percentile([], 0.5) is None
+
+
+def test_each_note_is_deleted_once():
+    workload = bench.Workload([1, 2, 3], seed=1)
+    rng = random.Random(1)
+    paths = [workload.next_request("delete", rng)[1] for _ in range(3)]
+    assert sorted(paths) == [f"/api/notes/{note_id}" for note_id in (1, 2, 3)]
+    assert workload.next_request("delete", rng) is None
+
+
+def test_unknown_scenarios_are_rejected():
+    with pytest.raises(SystemExit):
+        bench.parse_args(["--scenarios", "list,nonsense"])
+
+
+def test_scenario_reports_latency_and_statuses(client, create_note, frontend):
+    ids = [create_note(f"note {index}") for index in range(3)]
+    workload = bench.Workload(ids, seed=1)
+    result = bench.run_scenario(
+        "get",
+        lambda: bench.ClientSession(frontend.app),
+        workload,
+        concurrency=2,
+        duration=0.2,
+        seed=1,
+    )
+    assert result["requests"] > 0
+    assert result["errors"] == 0
+    assert result["statuses"] == {"200": result["requests"]}
+    latency = result["latency_ms"]
+    assert latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--mode", "http"],
+        ["--mode", "http", "--notes", "0", "--scenarios", "list,create"],
+        ["--backend", "mysql"],
+    ],
+)
+def test_writes_to_the_configured_database_need_consent(argv):
+    with pytest.raises(SystemExit):
+        bench.parse_args(argv)
+    bench.parse_args(argv + ["--allow-writes"])
+
+
+def test_read_only_and_throwaway_runs_need_no_consent():
+    bench.parse_args(["--mode", "http", "--notes", "0", "--scenarios", "list,get"])
+    bench.parse_args(["--backend", "mysql", "--mysql-db", "notes_bench"])
+    bench.parse_args([])
+
+
+def test_run_cleans_up_only_its_own_notes(client, create_note, frontend):
+    existing = create_note("not the benchmark's")
+    seeded = bench.seed_notes(bench.ClientSession(frontend.app), 3, random.Random(1))
+    workload = bench.Workload(seeded, seed=1)
+    bench.run_scenario(
+        "create",
+        lambda: bench.ClientSession(frontend.app),
+        workload,
+        concurrency=1,
+        duration=0.05,
+        seed=1,
+    )
+    assert len(workload.own_notes()) > len(seeded)
+
+    bench.delete_notes(bench.ClientSession(frontend.app), workload.own_notes())
+    assert [note["id"] for note in client.get("/api/notes").get_json()] == [existing]
@@ -0,0 +1,178 @@
+import csv
+import io
+import json
+
+
+def note(title, **extra):
+    return dict({"title": title, "content": "c", "author": "amr"}, **extra)
+
+
+def test_json_array_import(client):
+    response = client.post("/api/notes/bulk", json=[note("a"), note("b")])
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result["inserted"] == 2
+    assert len(result["ids"]) == 2
+    assert result["errors"] == []
+
+
+def test_ndjson_import_reports_bad_lines_by_position(client):
+    lines = [
+        json.dumps(note("a")),
+        "",
+        "{not json",
+        json.dumps({"title": "missing fields"}),
+        json.dumps(note("b", created_at="2024-01-02T03:04:05Z")),
+    ]
+    response = client.post(
+        "/api/notes/bulk",
+        data="\n".join(lines) + "\n",
+        content_type="application/x-ndjson",
+    )
+    result = response.get_json()
+    assert result["inserted"] == 2
+    # Blank lines are skipped and do not count as positions
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+
+    imported = client.get(f"/api/notes/{result['ids'][1]}").get_json()
+    assert imported["created_at"].startswith("2024-01-02")
+
+
+def test_import_rejects_a_non_array_body(client):
+    response = client.post("/api/notes/bulk", json={"title": "a"})
+    assert response.status_code == 400
+
+
+def test_import_keeps_input_order_across_batches(client, frontend, monkeypatch):
+    monkeypatch.setattr(frontend, "BULK_BATCH_SIZE", 2)
+    notes = [note(f"note {index}") for index in range(5)]
+    ids = client.post("/api/notes/bulk", json=notes).get_json()["ids"]
+    titles = [
+        client.get(f"/api/notes/{note_id}").get_json()["title"] for note_id in ids
+    ]
+    assert titles == [n["title"] for n in notes]
+
+
+def test_import_invalidates_cached_listings(client):
+    assert client.get("/api/notes").get_json() == []
+    client.post("/api/notes/bulk", json=[note("a")])
+    assert [n["title"] for n in client.get("/api/notes").get_json()] == ["a"]
+
+
+def test_ndjson_export_round_trips_through_import(client):
+    client.post("/api/notes/bulk", json=[note("a"), note("b", author="sara")])
+    with client.get("/api/notes/export") as response:
+        assert "attachment" in response.headers["Content-Disposition"]
+        exported = response.get_data(as_text=True)
+    result = client.post(
+        "/api/notes/bulk", data=exported, content_type="application/x-ndjson"
+    ).get_json()
+    assert result["inserted"] == 2
+    assert result["errors"] == []
+
+
+def test_csv_export_quotes_its_fields(client):
+    client.post("/api/notes/bulk", json=[note('say "hi", twice', content="a\nb")])
+    with client.get("/api/notes/export?format=csv&fields=title,content") as response:
+        assert response.mimetype == "text/csv"
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows == [["title", "content"], ['say "hi", twice', "a\nb"]]
+
+
+def test_export_rejects_unknown_formats(client):
+    assert client.get("/api/notes/export?format=xml").status_code == 400
+
+
+def test_bulk_update_with_optimistic_concurrency(client):
+    ids = client.post("/api/notes/bulk", json=[note("a"), note("b")]).get_json()["ids"]
+    first, second = (client.get(f"/api/notes/{note_id}").get_json() for note_id in ids)
+
+    # Someone else edits the second note in the meantime
+    client.put(
+        f"/api/notes/{second['id']}",
+        json={"title": "theirs", "content": "c", "author": "amr"},
+    )
+    response = client.patch(
+        "/api/notes/bulk",
+        json={
+            "set": {"author": "sara"},
+            "notes": [
+                {"id": first["id"], "updated_at": first["updated_at"]},
+                {"id": second["id"], "updated_at": second["updated_at"]},
+                {"id": 999999, "updated_at": first["updated_at"]},
+            ],
+        },
+    )
+    result = response.get_json()
+    assert result["affected"] == 1
+    assert result["conflicts"] == [second["id"]]
+    assert result["not_found"] == [999999]
+    assert client.get(f"/api/notes/{first['id']}").get_json()["author"] == "sara"
+    assert client.get(f"/api/notes/{second['id']}").get_json()["author"] == "amr"
+
+
+def test_bulk_update_validates_its_body(client):
+    assert client.patch("/api/notes/bulk", json=[]).status_code == 400
+    assert (
+        client.patch("/api/notes/bulk", json={"set": {"id": 5}, "ids": [1]}).status_code
+        == 400
+    )
+    assert (
+        client.patch(
+            "/api/notes/bulk", json={"set": {"title": "x"}, "ids": [1], "filter": {}}
+        ).status_code
+        == 400
+    )
+    assert (
+        client.patch(
+            "/api/notes/bulk", json={"set": {"title": "x"}, "ids": ["1"]}
+        ).status_code
+        == 400
+    )
+
+
+def test_bulk_delete_by_filter(client):
+    client.post(
+        "/api/notes/bulk",
+        json=[note("a"), note("b", author="sara"), note("c", author="sara")],
+    )
+    response = client.delete("/api/notes/bulk", json={"filter": {"author": "sara"}})
+    assert response.get_json()["affected"] == 2
+    assert [n["title"] for n in client.get("/api/notes").get_json()] == ["a"]
+
+
+def test_bulk_delete_by_ids(client):
+    ids = client.post(
+        "/api/notes/bulk", json=[note("a"), note("b"), note("c")]
+    ).get_json()["ids"]
+    response = client.delete("/api/notes/bulk", json={"ids": [ids[0], ids[2], 999999]})
+    assert response.get_json() == {"affected": 2}
+    assert [n["id"] for n in client.get("/api/notes").get_json()] == [ids[1]]
+
+
+def run_sql(frontend, statement):
+    conn = frontend.get_db_connection()
+    try:
+        conn.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_import_ids_survive_gaps_in_the_sequence(client, frontend):
+    # A row inserted behind the import's back, between two of its rows
+    run_sql(
+        frontend,
+        "CREATE TRIGGER shadow_note AFTER INSERT ON notes WHEN NEW.title = 'a' "
+        "BEGIN INSERT INTO notes (title, content, author, created_at, updated_at) "
+        "VALUES ('shadow', 'c', 'amr', NEW.created_at, NEW.updated_at); END",
+    )
+    try:
+        response = client.post("/api/notes/bulk", json=[note("a"), note("b")])
+    finally:
+        run_sql(frontend, "DROP TRIGGER shadow_note")
+    ids = response.get_json()["ids"]
+    titles = [
+        client.get(f"/api/notes/{note_id}").get_json()["title"] for note_id in ids
+    ]
+    assert titles == ["a", "b"]
@@ -0,0 +1,126 @@
+def notes_version(client):
+    return int(client.get("/api/notes").headers["X-Notes-Version"])
+
+
+def changes(client, since, **params):
+    query = "".join(f"&{name}={value}" for name, value in params.items())
+    response = client.get(f"/api/notes/changes?since={since}{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_feed_lists_upserts_and_deletes_since_a_version(client, create_note):
+    kept = create_note("kept")
+    removed = create_note("removed")
+    since = notes_version(client)
+
+    client.put(
+        f"/api/notes/{kept}", json={"title": "edited", "content": "c", "author": "amr"}
+    )
+    client.delete(f"/api/notes/{removed}")
+    added = create_note("added")
+
+    feed = changes(client, since, fields="id,title")
+    assert feed["upserts"] == [
+        {"id": kept, "title": "edited"},
+        {"id": added, "title": "added"},
+    ]
+    assert feed["deletes"] == [removed]
+    assert not feed["has_more"]
+    assert feed["version"] == notes_version(client)
+    assert changes(client, feed["version"])["upserts"] == []
+
+
+def test_feed_pages_with_has_more(client, create_note):
+    since = notes_version(client)
+    for index in range(3):
+        create_note(f"note {index}")
+    first = changes(client, since, limit=2)
+    assert len(first["upserts"]) == 2
+    assert first["has_more"]
+    rest = changes(client, first["version"], limit=2)
+    assert len(rest["upserts"]) == 1
+    assert not rest["has_more"]
+
+
+def test_unknown_future_version_resets(client):
+    feed = changes(client, notes_version(client) + 100)
+    assert feed["reset"] is True
+
+
+def test_pruned_version_resets(client, create_note, frontend, monkeypatch):
+    since = notes_version(client)
+    for index in range(3):
+        create_note(f"note {index}")
+
+    monkeypatch.setattr(frontend, "CHANGES_KEEP", 1)
+    conn = frontend.get_db_connection()
+    try:
+        while not frontend.prune_changes(conn):
+            pass
+    finally:
+        conn.close()
+
+    assert changes(client, since)["reset"] is True
+    latest = notes_version(client)
+    assert "reset" not in changes(client, latest - 1)
+
+
+def test_restore_restarts_the_feed_above_every_known_version(
+    client, create_note, frontend
+):
+    create_note("before")
+    since = notes_version(client)
+    etag = client.get("/api/notes").headers["ETag"]
+
+    conn = frontend.get_db_connection()
+    try:
+        restarted = frontend.restart_changes(conn, since)
+    finally:
+        conn.close()
+    frontend.notes_changed()
+
+    assert restarted > since
+    assert changes(client, since)["reset"] is True
+    # The restore marker is not a change to any note
+    marker = changes(client, restarted - 1)
+    assert marker["upserts"] == [] and marker["deletes"] == []
+    assert marker["version"] == restarted
+    assert client.get("/api/notes", headers={"If-None-Match": etag}).status_code == 200
+
+
+class ChangelogScan:
+    """MariaDB connection stub answering settled_version()'s scan"""
+
+    db_type = "mysql"
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def test_recent_holes_hold_the_feed_back(frontend):
+    # Version 11 is missing and 12 is recent: 11 may still commit
+    scan = ChangelogScan([(12, True), (10, True), (9, True)])
+    assert frontend.settled_version(scan, latest=12) == 10
+
+
+def test_old_holes_are_rolled_back_writes(frontend):
+    scan = ChangelogScan([(12, False), (10, False)])
+    assert frontend.settled_version(scan, latest=12) == 12
+
+
+def test_since_is_required(client):
+    assert client.get("/api/notes/changes").status_code == 400
+    assert client.get("/api/notes/changes?since=-1").status_code == 400
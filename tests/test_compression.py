@@ -0,0 +1,87 @@
+import gzip
+import zlib
+
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from compression import BROTLI_AVAILABLE, ZSTD_AVAILABLE, CompressionMiddleware
+
+BODY = b'{"notes": "' + b"x" * 4000 + b'"}'
+
+
+def buffered_app(environ, start_response):
+    start_response(
+        "200 OK",
+        [("Content-Type", "application/json"), ("Content-Length", str(len(BODY)))],
+    )
+    return [BODY]
+
+
+def streamed_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "application/x-ndjson")])
+    return (b'{"id": %d}\n' % index for index in range(3))
+
+
+def get(app, accept_encoding=None, min_size=1024):
+    client = Client(CompressionMiddleware(app, min_size=min_size), Response)
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+    return client.get("/", headers=headers)
+
+
+def test_gzip_when_it_is_all_the_client_takes():
+    response = get(buffered_app, "gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    assert gzip.decompress(response.data) == BODY
+
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli not installed")
+def test_quality_values_pick_the_encoding():
+    response = get(buffered_app, "gzip;q=0.5, br;q=0.9")
+    assert response.headers["Content-Encoding"] == "br"
+
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_ties_prefer_zstd():
+    response = get(buffered_app, "gzip, br, zstd")
+    assert response.headers["Content-Encoding"] == "zstd"
+
+
+def test_no_acceptable_encoding_passes_through():
+    for accept in (None, "identity", "gzip;q=0", "compress"):
+        response = get(buffered_app, accept)
+        assert "Content-Encoding" not in response.headers
+        assert response.data == BODY
+
+
+def test_small_responses_stay_uncompressed():
+    response = get(buffered_app, "gzip", min_size=len(BODY) + 1)
+    assert "Content-Encoding" not in response.headers
+
+
+def test_streamed_responses_are_compressed_chunk_by_chunk():
+    response = get(streamed_app, "gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    data = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(response.data)
+    assert data == b'{"id": 0}\n{"id": 1}\n{"id": 2}\n'
+
+
+def test_app_listing_negotiates_encoding(client, create_note):
+    for index in range(30):
+        create_note(f"note {index}", content="words " * 20)
+    response = client.get("/api/notes", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].startswith("W/")
+    assert len(gzip.decompress(response.data)) > len(response.data)
+
+    plain = client.get("/api/notes")
+    assert "Content-Encoding" not in plain.headers
+
+
+def test_precompressed_assets_pass_through(client):
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b"<html" in gzip.decompress(response.data).lower()
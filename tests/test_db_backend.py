@@ -0,0 +1,112 @@
+import sqlite3
+import time
+
+import pytest
+
+from db_backend import Backend, BackendSelector
+from db_pool import ConnectionPool, PoolTimeout
+
+
+class Server:
+    """Connection factory whose availability the test controls"""
+
+    def __init__(self):
+        self.error = None
+
+    def connect(self):
+        if self.error is not None:
+            raise self.error
+        return sqlite3.connect(":memory:")
+
+
+def make_backend(name, server, max_size=2, is_outage=None):
+    pool = ConnectionPool(
+        "sqlite", server.connect, max_size=max_size, timeout=0.05, pre_ping=False
+    )
+    return Backend(name, pool, is_outage=is_outage)
+
+
+@pytest.fixture
+def servers():
+    return Server(), Server()
+
+
+@pytest.fixture
+def selector(servers):
+    mysql, sqlite = servers
+    selector = BackendSelector(
+        make_backend("mysql", mysql, is_outage=lambda err: isinstance(err, OSError)),
+        make_backend("sqlite", sqlite),
+        probe_interval=0.05,
+    )
+    yield selector
+    selector.stop()
+
+
+def test_uses_the_primary_while_it_answers(selector):
+    selector.start()
+    conn = selector.connect()
+    assert selector.current().name == "mysql"
+    conn.close()
+
+
+def test_unreachable_primary_trips_to_the_fallback(selector, servers):
+    servers[0].error = OSError("connection refused")
+    conn = selector.connect()
+    assert conn is not None
+    conn.close()
+    assert selector.state == selector.OPEN
+    assert selector.current().name == "sqlite"
+
+
+def test_failed_startup_probe_trips(selector, servers):
+    servers[0].error = OSError("connection refused")
+    selector.start()
+    assert selector.state == selector.OPEN
+
+
+def test_breaker_closes_once_the_primary_is_back(selector, servers):
+    servers[0].error = OSError("connection refused")
+    selector.connect().close()
+    assert selector.state == selector.OPEN
+
+    servers[0].error = None
+    deadline = time.monotonic() + 2
+    while selector.state != selector.CLOSED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert selector.state == selector.CLOSED
+    assert selector.current().name == "mysql"
+
+
+def test_exhausted_pool_is_raised_without_tripping(selector):
+    held = [selector.connect(), selector.connect()]
+    with pytest.raises(PoolTimeout):
+        selector.connect()
+    assert selector.state == selector.CLOSED
+    assert selector.current().name == "mysql"
+    for conn in held:
+        conn.close()
+
+
+def test_other_primary_errors_do_not_trip(selector, servers):
+    servers[0].error = ValueError("access denied")
+    assert selector.connect() is None
+    assert selector.state == selector.CLOSED
+
+
+def test_no_fallback_fails_fast():
+    server = Server()
+    server.error = OSError("connection refused")
+    selector = BackendSelector(make_backend("mysql", server), probe_interval=60)
+    try:
+        assert selector.connect() is None
+        assert selector.state == selector.OPEN
+        assert selector.current() is None
+    finally:
+        selector.stop()
+
+
+def test_stats_report_the_resolved_backend(client):
+    database = client.get("/api/stats").get_json()["database"]
+    assert database["backend"] == "sqlite"
+    assert database["breaker"] == "closed"
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeout
+
+
+def make_pool(**options):
+    options.setdefault("max_size", 2)
+    options.setdefault("timeout", 0.1)
+    return ConnectionPool("sqlite", lambda: sqlite3.connect(":memory:"), **options)
+
+
+def test_released_connections_are_reused():
+    pool = make_pool()
+    conn = pool.acquire()
+    raw = conn._raw
+    conn.close()
+    again = pool.acquire()
+    assert again._raw is raw
+    again.close()
+    stats = pool.stats()
+    assert stats["created"] == 1
+    assert stats["checkouts"] == 2
+
+
+def test_exhausted_pool_times_out():
+    pool = make_pool(max_size=1)
+    held = pool.acquire()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.1
+    assert pool.stats()["timeouts"] == 1
+    held.close()
+    pool.acquire().close()
+
+
+def test_release_wakes_a_waiting_checkout():
+    pool = make_pool(max_size=1, timeout=5.0)
+    held = pool.acquire()
+    acquired = []
+
+    def waiter():
+        conn = pool.acquire()
+        acquired.append(conn)
+        conn.close()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired
+    held.close()
+    thread.join(2)
+    assert acquired
+    assert pool.stats()["waits"] == 1
+
+
+def test_failed_connect_frees_its_slot():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("connection refused")
+        return sqlite3.connect(":memory:")
+
+    pool = ConnectionPool("sqlite", factory, max_size=1, timeout=0.1)
+    with pytest.raises(OSError):
+        pool.acquire()
+    pool.acquire().close()
+
+
+def test_dead_connection_is_replaced_on_checkout():
+    pool = make_pool()
+    conn = pool.acquire()
+    conn.close()
+    # Closing the raw connection makes the pre-ping fail
+    pool._idle[-1][0].close()
+    pool.acquire().close()
+    stats = pool.stats()
+    assert stats["failed_health_checks"] == 1
+    assert stats["created"] == 2
+
+
+def test_stats_endpoint_reports_the_pools(client, create_note):
+    create_note()
+    pools = client.get("/api/stats").get_json()["pools"]
+    assert pools["sqlite"]["checkouts"] >= 1
+    assert pools["sqlite"]["in_use"] == 0
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from note_events import ChangeBroadcaster
+
+
+class Changelog:
+    """In-memory stand-in for the note_changes table"""
+
+    def __init__(self):
+        self.version = 0
+        self.changes = []
+
+    def write(self, note_id):
+        self.version += 1
+        self.changes.append((self.version, note_id))
+
+    def fetch(self, since):
+        upserts = [
+            {"id": note_id} for version, note_id in self.changes if version > since
+        ]
+        return {
+            "version": self.version,
+            "upserts": upserts,
+            "deletes": [],
+            "has_more": False,
+        }
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def changelog():
+    return Changelog()
+
+
+@pytest.fixture
+def broadcaster(changelog):
+    return ChangeBroadcaster(
+        changelog.fetch, lambda: changelog.version, interval=0.02, max_queue=2
+    )
+
+
+def test_subscribers_receive_each_change_once(broadcaster, changelog):
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+    wait_for(lambda: broadcaster.stats()["version"] == 0)
+    changelog.write(7)
+    broadcaster.notify()
+    for subscription in (first, second):
+        event = subscription.get(1)
+        assert event["upserts"] == [{"id": 7}]
+        assert subscription.get(0.05) is None
+    broadcaster.unsubscribe(first)
+    broadcaster.unsubscribe(second)
+
+
+def test_slow_subscriber_is_told_to_resync(broadcaster, changelog):
+    subscription = broadcaster.subscribe()
+    wait_for(lambda: broadcaster.stats()["version"] == 0)
+    for note_id in range(3):
+        changelog.write(note_id)
+        wait_for(lambda: broadcaster.stats()["version"] == changelog.version)
+    assert subscription.overflowed
+    assert broadcaster.stats()["dropped"] == 1
+    broadcaster.unsubscribe(subscription)
+
+
+def test_poller_stops_without_subscribers(broadcaster):
+    broadcaster.unsubscribe(broadcaster.subscribe())
+    wait_for(lambda: broadcaster.stats()["version"] is None)
+    assert broadcaster.stats()["subscribers"] == 0
+
+
+def sse_events(response):
+    """(event name, data) for each message of a streamed SSE response"""
+    for chunk in response.iter_encoded():
+        fields = dict(
+            line.split(": ", 1)
+            for line in chunk.decode().splitlines()
+            if ": " in line and not line.startswith(":")
+        )
+        yield fields.get("event"), fields.get("data")
+
+
+def test_event_stream_pushes_changes(client, create_note, frontend, monkeypatch):
+    monkeypatch.setattr(frontend, "EVENTS_HEARTBEAT", 0.05)
+    with client.get("/api/events") as response:
+        assert response.mimetype == "text/event-stream"
+        events = sse_events(response)
+        next(events)
+        wait_for(lambda: frontend.note_events.stats()["version"] is not None)
+        note_id = create_note("pushed")
+        for name, data in events:
+            if name == "changes":
+                break
+        assert json.loads(data)["upserts"][0]["id"] == note_id
+    wait_for(lambda: frontend.note_events.stats()["subscribers"] == 0)
+
+
+def test_async_subscribers_wait_on_the_event_loop(broadcaster, changelog):
+    async def run():
+        subscription = broadcaster.subscribe()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, wait_for, lambda: broadcaster.stats()["version"] == 0
+        )
+        assert await subscription.get_async(0.05) is None
+        waiting = asyncio.ensure_future(subscription.get_async(2))
+        await asyncio.sleep(0)
+        changelog.write(7)
+        broadcaster.notify()
+        try:
+            return await waiting
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    assert asyncio.run(run())["upserts"] == [{"id": 7}]
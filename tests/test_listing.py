@@ -0,0 +1,166 @@
+def titles(response):
+    return [note["title"] for note in response.get_json()]
+
+
+def test_cached_listing_is_invalidated_by_writes(client, create_note):
+    create_note("first")
+    assert client.get("/api/notes").headers["X-Cache"] == "MISS"
+    cached = client.get("/api/notes")
+    assert cached.headers["X-Cache"] == "HIT"
+    assert titles(cached) == ["first"]
+
+    note_id = create_note("second")
+    response = client.get("/api/notes")
+    assert response.headers["X-Cache"] == "MISS"
+    assert titles(response) == ["second", "first"]
+
+    client.put(
+        f"/api/notes/{note_id}",
+        json={"title": "edited", "content": "c", "author": "amr"},
+    )
+    assert titles(client.get("/api/notes")) == ["edited", "first"]
+
+    client.delete(f"/api/notes/{note_id}")
+    assert titles(client.get("/api/notes")) == ["first"]
+
+
+def test_cached_search_is_invalidated_by_writes(client, create_note):
+    create_note("garden plans")
+    assert len(client.get("/api/search?q=garden").get_json()) == 1
+    assert client.get("/api/search?q=garden").headers["X-Cache"] == "HIT"
+    create_note("garden tools")
+    assert len(client.get("/api/search?q=garden").get_json()) == 2
+
+
+def test_keyset_cursor_walks_every_page_once(client, create_note):
+    created = [create_note(f"note {index}") for index in range(7)]
+
+    seen = []
+    url = "/api/notes?limit=3&fields=id,title"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(note["id"] for note in response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        url = f"/api/notes?limit=3&fields=id,title&after={cursor}" if cursor else None
+
+    assert seen == list(reversed(created))
+
+
+def test_next_page_link_carries_the_cursor(client, create_note):
+    for index in range(3):
+        create_note(f"note {index}")
+    response = client.get("/api/notes?limit=2")
+    cursor = response.headers["X-Next-Cursor"]
+    assert "after=" in response.headers["Link"]
+    assert 'rel="next"' in response.headers["Link"]
+    assert len(client.get(f"/api/notes?limit=2&after={cursor}").get_json()) == 1
+
+
+def test_fields_project_the_listing(client, create_note):
+    create_note("first", content="word " * 100)
+    (note,) = client.get("/api/notes?fields=id,title").get_json()
+    assert set(note) == {"id", "title"}
+    (note,) = client.get("/api/notes?fields=snippet,content_length").get_json()
+    assert len(note["snippet"]) < note["content_length"] == len("word " * 100)
+
+
+def test_bad_cursor_is_rejected(client):
+    for cursor in ("nonsense", "2024-01-01T00:00:00,abc", ",5"):
+        response = client.get(f"/api/notes?after={cursor}")
+        assert response.status_code == 400
+        assert "cursor" in response.get_json()["error"]
+
+
+def test_bad_limit_and_fields_are_rejected(client):
+    assert client.get("/api/notes?limit=0").status_code == 400
+    assert client.get("/api/notes?fields=id,password").status_code == 400
+
+
+def test_single_note_carries_the_full_content(client, create_note):
+    note_id = create_note("first", content="word " * 100)
+    note = client.get(f"/api/notes/{note_id}").get_json()
+    assert note["content"] == "word " * 100
+
+
+def test_listing_etag_answers_304_until_a_write(client, create_note):
+    create_note("first")
+    response = client.get("/api/notes")
+    etag = response.headers["ETag"]
+    assert etag.startswith("W/")
+
+    headers = {"If-None-Match": etag}
+    assert client.get("/api/notes", headers=headers).status_code == 304
+    # Another query string is another representation
+    assert client.get("/api/notes?limit=1", headers=headers).status_code == 200
+
+    create_note("second")
+    response = client.get("/api/notes", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_single_note_etag_and_last_modified(client, create_note):
+    note_id = create_note("first")
+    response = client.get(f"/api/notes/{note_id}")
+    assert response.status_code == 200
+    assert response.headers["Last-Modified"]
+    etag = response.headers["ETag"]
+
+    assert (
+        client.get(f"/api/notes/{note_id}", headers={"If-None-Match": etag}).status_code
+        == 304
+    )
+
+    client.put(
+        f"/api/notes/{note_id}",
+        json={"title": "edited", "content": "c", "author": "amr"},
+    )
+    response = client.get(f"/api/notes/{note_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["title"] == "edited"
+
+
+def test_cached_hit_keeps_the_etag(client, create_note):
+    create_note("first")
+    etag = client.get("/api/notes").headers["ETag"]
+    hit = client.get("/api/notes")
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.headers["ETag"] == etag
+
+
+def test_missing_note_is_404(client):
+    assert client.get("/api/notes/999999").status_code == 404
+
+
+def test_streamed_listings_bypass_the_cache(client, create_note):
+    create_note("first")
+    client.get("/api/notes?format=ndjson").close()
+    with client.get("/api/notes?format=ndjson") as response:
+        assert "X-Cache" not in response.headers
+
+
+def test_write_from_another_process_retires_cached_listings(
+    client, create_note, frontend
+):
+    create_note("first")
+    client.get("/api/notes")
+    assert client.get("/api/notes").headers["X-Cache"] == "HIT"
+
+    # Another worker's write: this process's notes_changed() never runs
+    conn = frontend.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO notes (title, content, author, created_at, updated_at)"
+            " VALUES ('second', 'c', 'amr', '2030-01-01 00:00:00',"
+            " '2030-01-01 00:00:00')"
+        )
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+    response = client.get("/api/notes")
+    assert response.headers["X-Cache"] == "MISS"
+    assert titles(response) == ["second", "first"]
@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+from db_pool import ConnectionPool, statement_type
+from metrics import MeteredBody
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+
+def sample(name, **labels):
+    return prometheus_client.REGISTRY.get_sample_value(name, labels) or 0
+
+
+class Observer:
+    """Records the pool's observer calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name,) + args)
+
+
+def test_pool_reports_checkouts_and_finished_queries():
+    observer = Observer()
+    pool = ConnectionPool(
+        "sqlite", lambda: sqlite3.connect(":memory:"), name="mem", observers=[observer]
+    )
+    with pool.acquire() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 UNION SELECT 2")
+        cursor.fetchall()
+        with pytest.raises(sqlite3.Error):
+            cursor.execute("SELECT * FROM missing", ("secret",))
+    names = [call[0] for call in observer.calls]
+    assert names == ["connection_acquired", "query", "query"]
+    assert observer.calls[0][1:3] == ("mem", "sqlite")
+    # (db_type, sql, params, seconds, rows, error)
+    _, db_type, sql, params, _, rows, error = observer.calls[1]
+    assert (db_type, sql, params, rows, error) == (
+        "sqlite",
+        "SELECT 1 UNION SELECT 2",
+        None,
+        2,
+        None,
+    )
+    _, _, _, params, _, rows, error = observer.calls[2]
+    assert params == ("secret",)
+    assert isinstance(error, sqlite3.Error)
+
+
+def test_statement_types_have_low_cardinality():
+    assert statement_type("  (SELECT 1)") == "SELECT"
+    assert statement_type("insert into notes") == "INSERT"
+    assert statement_type("PRAGMA wal_checkpoint") == "OTHER"
+
+
+def test_requests_are_labelled_by_route_pattern(client, create_note):
+    # Requests are recorded when the server closes the response
+    note_id = create_note()
+    labels = dict(method="GET", route="/api/notes/<int:note_id>", status="200")
+    before = sample("noteapp_http_requests_total", **labels)
+    client.get(f"/api/notes/{note_id}").close()
+    assert sample("noteapp_http_requests_total", **labels) == before + 1
+
+    unmatched = dict(method="GET", route="unmatched", status="404")
+    before = sample("noteapp_http_requests_total", **unmatched)
+    client.get("/no/such/page").close()
+    assert sample("noteapp_http_requests_total", **unmatched) == before + 1
+
+
+def test_database_access_is_measured(client):
+    selects = dict(backend="sqlite", statement="SELECT")
+    before = sample("noteapp_db_query_duration_seconds_count", **selects)
+    client.get("/api/notes?limit=5")
+    assert sample("noteapp_db_query_duration_seconds_count", **selects) > before
+    checkouts = sample(
+        "noteapp_db_connection_acquire_seconds_count", backend="sqlite", pool="sqlite"
+    )
+    assert checkouts > 0
+
+
+def test_scrape_is_prometheus_text(client):
+    client.get("/api/notes").close()
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert b"noteapp_http_request_duration_seconds_bucket" in response.data
+
+
+def test_streamed_body_is_measured_when_closed():
+    sizes = []
+    body = MeteredBody(iter([b"ab", b"cde"]), sizes.append)
+    assert b"".join(body) == b"abcde"
+    assert sizes == []
+    body.close()
+    assert sizes == [5]
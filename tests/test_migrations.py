@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import migrations
+from conftest import ROOT
+from db_pool import ConnectionPool
+
+
+@pytest.fixture
+def connect(tmp_path):
+    """Pooled connection factory for a database file of the test's own"""
+    path = str(tmp_path / "notes.db")
+    pool = ConnectionPool("sqlite", lambda: sqlite3.connect(path), max_size=1)
+    yield pool.acquire
+    pool.dispose()
+
+
+def test_migrations_apply_once_in_order(connect):
+    with connect() as conn:
+        applied = migrations.migrate(conn)
+        assert [m["version"] for m in applied] == [
+            m["version"] for m in migrations.MIGRATIONS
+        ]
+        assert migrations.migrate(conn) == []
+        assert migrations.pending_migrations(conn) == []
+        assert max(migrations.applied_versions(conn)) == migrations.latest_version()
+
+
+def test_database_from_the_old_setup_script_is_adopted(connect):
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(migrations.MIGRATIONS[0]["sqlite"][0])
+        cursor.execute(
+            "INSERT INTO notes (title, content, author) VALUES ('kept', 'c', 'amr')"
+        )
+        conn.commit()
+        migrations.migrate(conn)
+        # The full-text index is backfilled from notes that already existed
+        cursor.execute("SELECT rowid FROM notes_fts WHERE notes_fts MATCH 'kept'")
+        assert cursor.fetchall() == [(1,)]
+        cursor.close()
+
+
+def test_pending_migrations_are_reported_without_being_applied(connect):
+    with connect() as conn:
+        assert len(migrations.pending_migrations(conn)) == len(migrations.MIGRATIONS)
+        assert migrations.applied_versions(conn) == set()
+
+
+def test_app_database_is_migrated_at_startup(frontend):
+    conn = frontend.get_db_connection()
+    try:
+        assert migrations.pending_migrations(conn) == []
+    finally:
+        conn.close()
+
+
+def run_cli(tmp_path, *argv):
+    env = dict(os.environ, DB_PATH=str(tmp_path / "cli.db"), DB_MIGRATE="auto")
+    return subprocess.run(
+        [sys.executable, *argv],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def test_status_does_not_migrate(tmp_path):
+    output = run_cli(tmp_path, "migrations.py", "status")
+    assert "schema version: 0/" in output
+    conn = sqlite3.connect(tmp_path / "cli.db")
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    finally:
+        conn.close()
+    assert "notes" not in tables
+    assert "Applied 1:" in run_cli(tmp_path, "migrations.py", "upgrade")
+
+
+def test_importing_the_app_for_its_settings_starts_no_threads(tmp_path):
+    code = (
+        "import os, threading; os.environ['DB_MIGRATE'] = 'off'; import frontend; "
+        "print(threading.active_count())"
+    )
+    assert run_cli(tmp_path, "-c", code).split()[-1] == "1"
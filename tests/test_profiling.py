@@ -0,0 +1,79 @@
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from profiling import ProfilingMiddleware, is_authorized
+
+ADMIN = {"Authorization": "Bearer secret"}
+
+
+@pytest.fixture
+def admin(frontend, monkeypatch):
+    monkeypatch.setattr(frontend, "PROFILING_TOKEN", "secret")
+
+
+def profiled_client(frontend):
+    return Client(ProfilingMiddleware(frontend.app.wsgi_app, "secret"), Response)
+
+
+def test_token_is_checked():
+    assert is_authorized("secret", "Bearer secret")
+    assert not is_authorized("secret", "Bearer guess")
+    assert not is_authorized("", "Bearer ")
+    assert not is_authorized("secret", None)
+
+
+def test_request_with_x_profile_gets_the_report(client, create_note, frontend):
+    create_note()
+    app_client = profiled_client(frontend)
+    assert app_client.get("/api/notes").mimetype == "application/json"
+
+    response = app_client.get(
+        "/api/notes", headers=dict(ADMIN, **{"X-Profile": "tottime"})
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Profiled-Status"] == "200 OK"
+    report = response.get_data(as_text=True)
+    assert report.startswith("GET /api/notes: 200 OK")
+    assert "Ordered by: internal time" in report
+
+
+def test_streams_are_profiled_to_their_first_chunk(client, frontend):
+    app_client = profiled_client(frontend)
+    headers = dict(ADMIN, **{"X-Profile": "cumulative"})
+    response = app_client.get("/api/events", headers=headers)
+    assert response.headers["X-Profiled-Status"] == "200 OK"
+    assert "profiled to the first chunk" in response.get_data(as_text=True)
+    assert frontend.note_events.stats()["subscribers"] == 0
+
+
+def test_x_profile_without_the_token_is_forbidden(client, frontend):
+    app_client = profiled_client(frontend)
+    response = app_client.get("/api/notes", headers={"X-Profile": "cumulative"})
+    assert response.status_code == 403
+
+
+def test_sampling_endpoint_returns_collapsed_stacks(client, admin):
+    response = client.post(
+        "/api/admin/profile?seconds=0.1&interval_ms=5", headers=ADMIN
+    )
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    stack, count = response.get_data(as_text=True).splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "profile_worker (frontend.py" in response.get_data(as_text=True)
+
+
+def test_sampling_endpoint_checks_its_input(client, frontend, admin):
+    assert client.post("/api/admin/profile").status_code == 403
+    assert client.post("/api/admin/profile?seconds=0", headers=ADMIN).status_code == 400
+    assert (
+        client.post("/api/admin/profile?interval_ms=0", headers=ADMIN).status_code
+        == 400
+    )
+    with frontend.stack_sampler._busy:
+        assert client.post("/api/admin/profile", headers=ADMIN).status_code == 409
+
+
+def test_profiling_is_off_without_a_token(client):
+    assert client.post("/api/admin/profile", headers=ADMIN).status_code == 404
@@ -0,0 +1,267 @@
+import pytest
+
+from db_pool import PoolTimeout
+from db_replicas import ReplicaSet, parse_endpoints
+
+
+class Cursor:
+    def __init__(self, server):
+        self.server = server
+        self.description = None
+        self.rows = []
+
+    def execute(self, statement):
+        if statement not in self.server.statements:
+            raise RuntimeError(f"syntax error near {statement!r}")
+        self.description = [("Slave_IO_Running",), ("Seconds_Behind_Master",)]
+        self.rows = [("Yes", self.server.lag)] if self.server.replicating else []
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class Connection:
+    def __init__(self, server):
+        self.server = server
+
+    def cursor(self):
+        return Cursor(self.server)
+
+    def close(self):
+        pass
+
+
+class Server:
+    """Pool stand-in for one database server whose state the test controls"""
+
+    def __init__(self, name, lag=0):
+        self.name = name
+        self.lag = lag
+        self.replicating = True
+        self.error = None
+        self.statements = ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS")
+        self.checkouts = 0
+
+    def acquire(self):
+        if self.error is not None:
+            raise self.error
+        self.checkouts += 1
+        return Connection(self)
+
+    def dispose(self):
+        pass
+
+    def stats(self):
+        return {"checkouts": self.checkouts}
+
+
+def served_by(replicas, reads):
+    servers = [replicas.primary] + [replica.pool for replica in replicas.replicas]
+    before = {server.name: server.checkouts for server in servers}
+    for _ in range(reads):
+        replicas.acquire().close()
+    return {
+        server.name: server.checkouts - before[server.name]
+        for server in servers
+        if server.checkouts > before[server.name]
+    }
+
+
+@pytest.fixture
+def replicas():
+    replica_set = ReplicaSet(
+        Server("primary"),
+        {"a": Server("a"), "b": Server("b")},
+        max_lag=5,
+        check_interval=0,
+    )
+    replica_set.start()
+    return replica_set
+
+
+def test_parse_endpoints():
+    assert parse_endpoints(" db1:3307, db2 ,", 3306) == [("db1", 3307), ("db2", 3306)]
+    assert parse_endpoints("", 3306) == []
+
+
+def test_reads_go_round_robin_over_healthy_replicas(replicas):
+    assert replicas.stats()["healthy"] == 2
+    assert served_by(replicas, 4) == {"a": 2, "b": 2}
+
+
+def test_lagging_or_stopped_replicas_leave_the_rotation(replicas):
+    first, second = (replica.pool for replica in replicas.replicas)
+    first.lag = 30
+    second.lag = None
+    replicas.check_all()
+    assert replicas.stats()["healthy"] == 0
+    assert "behind" in replicas.replicas[0].error
+    assert replicas.replicas[1].error == "replication is stopped"
+    assert served_by(replicas, 2) == {"primary": 2}
+    assert replicas.stats()["primary_reads"] == 2
+
+    first.lag = 1
+    replicas.check_all()
+    assert served_by(replicas, 2) == {"a": 2}
+
+
+def test_server_that_is_not_a_replica_is_unhealthy(replicas):
+    replicas.replicas[0].pool.replicating = False
+    assert not replicas.check(replicas.replicas[0])
+    assert replicas.replicas[0].error == "not configured as a replica"
+
+
+def test_older_servers_fall_back_to_show_slave_status():
+    server = Server("old")
+    server.statements = ("SHOW SLAVE STATUS",)
+    replica_set = ReplicaSet(Server("primary"), {"old": server}, check_interval=0)
+    replica_set.start()
+    assert replica_set.replicas[0].healthy
+
+
+def test_failed_checkout_takes_a_replica_out_at_once(replicas):
+    replicas.replicas[0].pool.error = OSError("connection refused")
+    assert served_by(replicas, 3) == {"b": 3}
+    assert not replicas.replicas[0].healthy
+
+
+def test_busy_replica_is_skipped_but_stays_in_rotation(replicas):
+    replicas.replicas[0].pool.error = PoolTimeout("busy")
+    assert served_by(replicas, 2) == {"b": 2}
+    assert replicas.replicas[0].healthy
+
+
+class Database:
+    """Backend selector stand-in that records which pool each checkout wants"""
+
+    def __init__(self):
+        self.primary = object()
+        self.readonly = []
+
+    def current(self):
+        return self.primary
+
+    def connect(self, readonly=False):
+        self.readonly.append(readonly)
+        return None
+
+
+@pytest.fixture
+def with_replicas(frontend, monkeypatch):
+    replica_set = ReplicaSet(Server("primary"), {}, check_interval=0)
+    monkeypatch.setattr(frontend, "mysql_replicas", replica_set)
+    return replica_set
+
+
+def test_writes_set_the_read_primary_cookie(client, with_replicas, frontend):
+    response = client.post(
+        "/api/notes", json={"title": "t", "content": "c", "author": "amr"}
+    )
+    cookie = response.headers["Set-Cookie"]
+    assert cookie.startswith(f"{frontend.READ_PRIMARY_COOKIE}=1")
+    assert f"Max-Age={frontend.DB_READ_STICKY_SECONDS}" in cookie
+    assert "HttpOnly" in cookie
+
+    assert "Set-Cookie" not in client.get("/api/notes").headers
+    rejected = client.post("/api/notes", json={"title": "t"})
+    assert rejected.status_code == 400
+    assert "Set-Cookie" not in rejected.headers
+
+
+def test_no_cookie_without_replicas(client):
+    response = client.post(
+        "/api/notes", json={"title": "t", "content": "c", "author": "amr"}
+    )
+    assert "Set-Cookie" not in response.headers
+
+
+def test_cookie_sends_reads_to_the_primary(with_replicas, frontend, monkeypatch):
+    database = Database()
+    monkeypatch.setattr(frontend, "database", database)
+    cookie = {"Cookie": f"{frontend.READ_PRIMARY_COOKIE}=1"}
+
+    with frontend.app.test_request_context("/api/notes"):
+        frontend.get_db_connection(readonly=True)
+    with frontend.app.test_request_context("/api/notes", headers=cookie):
+        frontend.get_db_connection(readonly=True)
+    # Outside a request (background threads) nothing is pinned
+    frontend.get_db_connection(readonly=True)
+    assert database.readonly == [True, False, True]
+
+
+def test_cookie_is_ignored_while_serving_from_the_fallback(
+    with_replicas, frontend, monkeypatch
+):
+    database = Database()
+    database.current = lambda: object()
+    monkeypatch.setattr(frontend, "database", database)
+    cookie = {"Cookie": f"{frontend.READ_PRIMARY_COOKIE}=1"}
+    with frontend.app.test_request_context("/api/notes", headers=cookie):
+        frontend.get_db_connection(readonly=True)
+    assert database.readonly == [True]
+
+
+def test_pinned_reads_neither_read_nor_fill_the_cache(
+    client, create_note, with_replicas, frontend, monkeypatch
+):
+    # Serve "from the primary" so that the cookie pins reads
+    monkeypatch.setattr(frontend.database, "primary", frontend.database.current())
+    other = frontend.app.test_client()
+    create_note("first")
+    assert other.get("/api/notes").headers["X-Cache"] == "MISS"
+    assert other.get("/api/notes").headers["X-Cache"] == "HIT"
+
+    # The writer holds the cookie its write set
+    pinned = client.get("/api/notes")
+    assert "X-Cache" not in pinned.headers
+    assert [note["title"] for note in pinned.get_json()] == ["first"]
+    assert other.get("/api/notes").headers["X-Cache"] == "HIT"
+
+
+def test_writes_record_the_version_they_produced(
+    client, create_note, with_replicas, frontend, monkeypatch
+):
+    monkeypatch.setattr(frontend, "last_write_version", 0)
+    create_note("first")
+    version = int(client.get("/api/notes").headers["X-Notes-Version"])
+    assert frontend.last_write_version == version
+    assert frontend.predates_last_write(f"v{version - 1}")
+    assert not frontend.predates_last_write(f"v{version}")
+
+
+def test_bulk_import_records_the_version_it_produced(
+    client, with_replicas, frontend, monkeypatch
+):
+    monkeypatch.setattr(frontend, "last_write_version", 0)
+    notes = [{"title": title, "content": "c", "author": "amr"} for title in "ab"]
+    response = client.post("/api/notes/bulk", json=notes)
+    assert frontend.READ_PRIMARY_COOKIE in response.headers["Set-Cookie"]
+    version = int(client.get("/api/notes").headers["X-Notes-Version"])
+    assert frontend.last_write_version == version
+
+
+def test_partly_applied_bulk_delete_still_pins_reads(
+    client, with_replicas, frontend, monkeypatch
+):
+    notes = [{"title": title, "content": "c", "author": "amr"} for title in "ab"]
+    ids = client.post("/api/notes/bulk", json=notes).get_json()["ids"]
+    monkeypatch.setattr(frontend, "last_write_version", 0)
+    monkeypatch.setattr(frontend, "BULK_BATCH_SIZE", 1)
+    modify_notes = frontend.modify_notes
+
+    def fail_after_the_first_chunk(*args, **kwargs):
+        if frontend.last_write_version:
+            raise RuntimeError("lost the connection")
+        return modify_notes(*args, **kwargs)
+
+    monkeypatch.setattr(frontend, "modify_notes", fail_after_the_first_chunk)
+    other = frontend.app.test_client()
+    response = other.delete("/api/notes/bulk", json={"ids": ids})
+    assert response.status_code == 500
+    assert response.get_json()["affected"] == 1
+    assert frontend.READ_PRIMARY_COOKIE in response.headers["Set-Cookie"]
+    version = int(other.get("/api/notes").headers["X-Notes-Version"])
+    assert frontend.last_write_version == version
@@ -0,0 +1,31 @@
+import time
+
+from response_cache import LocalCache
+
+
+def test_entries_expire_after_the_ttl():
+    cache = LocalCache(ttl=0.05)
+    cache.set("key", "value", cache.generation())
+    assert cache.get("key") == "value"
+    time.sleep(0.06)
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LocalCache(max_entries=2)
+    generation = cache.generation()
+    cache.set("a", 1, generation)
+    cache.set("b", 2, generation)
+    cache.get("a")
+    cache.set("c", 3, generation)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_result_read_before_a_write_is_not_stored():
+    cache = LocalCache()
+    generation = cache.generation()
+    cache.invalidate()
+    cache.set("key", "stale", generation)
+    assert cache.get("key") is None
@@ -0,0 +1,80 @@
+def search(client, query, **params):
+    extra = "".join(f"&{name}={value}" for name, value in params.items())
+    response = client.get(f"/api/search?q={query}{extra}")
+    assert response.status_code == 200
+    return [note["title"] for note in response.get_json()]
+
+
+def test_every_term_matches_as_a_prefix(client, create_note):
+    create_note("garden plans")
+    create_note("garden tools")
+    create_note("kitchen tools")
+    assert sorted(search(client, "gard")) == ["garden plans", "garden tools"]
+    assert search(client, "gard tool") == ["garden tools"]
+    assert search(client, "plans tools") == []
+
+
+def test_content_and_author_are_indexed(client, create_note):
+    create_note("first", content="tomatoes need sun", author="sara")
+    create_note("second")
+    assert search(client, "tomato") == ["first"]
+    assert search(client, "sara") == ["first"]
+
+
+def test_index_follows_updates_and_deletes(client, create_note):
+    note_id = create_note("garden plans")
+    client.put(
+        f"/api/notes/{note_id}",
+        json={"title": "orchard plans", "content": "c", "author": "amr"},
+    )
+    assert search(client, "garden") == []
+    assert search(client, "orchard") == ["orchard plans"]
+    client.delete(f"/api/notes/{note_id}")
+    assert search(client, "orchard") == []
+
+
+def test_query_syntax_is_not_passed_through(client, create_note):
+    create_note("garden plans")
+    # Quotes and operators are not FTS syntax: OR is just another term
+    assert search(client, 'garden" OR "x') == []
+    assert search(client, "garden*") == ["garden plans"]
+
+
+def test_limit_caps_the_results(client, create_note):
+    for index in range(3):
+        create_note(f"garden {index}")
+    assert len(search(client, "garden", limit=2)) == 2
+    assert client.get("/api/search?q=garden&limit=0").status_code == 400
+
+
+def test_falls_back_to_like_without_the_index(
+    client, create_note, frontend, monkeypatch
+):
+    monkeypatch.setitem(frontend.schema_features, ("sqlite", "fts"), False)
+    create_note("garden plans")
+    # LIKE matches inside words, which the prefix index does not
+    assert search(client, "arden") == ["garden plans"]
+
+
+def test_fts_expression_dialects(frontend):
+    assert frontend.fts_expression(["gard", "tool"], "sqlite") == '"gard"* "tool"*'
+    assert frontend.fts_expression(["gard", "tool"], "mysql") == "+gard* +tool*"
+
+
+def test_mysql_expression_drops_words_the_index_lacks(frontend):
+    assert frontend.fts_expression(["the", "garden", "of", "ok"], "mysql") == (
+        "+garden*"
+    )
+    assert frontend.fts_expression(["The", "to", "ab"], "mysql") is None
+    # FTS5 indexes every word
+    assert frontend.fts_expression(["the", "ok"], "sqlite") == '"the"* "ok"*'
+
+
+def test_search_without_indexable_words_falls_back_to_like(
+    client, create_note, frontend, monkeypatch
+):
+    create_note("garden plans")
+    monkeypatch.setattr(frontend, "fts_expression", lambda terms, db_type: None)
+    assert [note["title"] for note in client.get("/api/search?q=arden").get_json()] == [
+        "garden plans"
+    ]
@@ -0,0 +1,65 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+
+from serialization import (
+    ORJSON_AVAILABLE,
+    OrjsonProvider,
+    db_timestamp,
+    json_provider,
+    map_notes,
+)
+
+
+def test_rows_map_to_notes_with_iso_timestamps():
+    fields = ["id", "title", "created_at", "updated_at"]
+    rows = [
+        (1, "sqlite", "2024-01-02 03:04:05", None),
+        (2, "mysql", datetime(2024, 1, 2, 3, 4, 5), datetime(2024, 1, 2, 3, 4, 6)),
+    ]
+    assert map_notes(rows, fields) == [
+        {
+            "id": 1,
+            "title": "sqlite",
+            "created_at": "2024-01-02T03:04:05",
+            "updated_at": None,
+        },
+        {
+            "id": 2,
+            "title": "mysql",
+            "created_at": "2024-01-02T03:04:05",
+            "updated_at": "2024-01-02T03:04:06",
+        },
+    ]
+    assert db_timestamp("2024-01-02T03:04:05") == "2024-01-02 03:04:05"
+
+
+@pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+def test_orjson_provider_keeps_field_order_and_utf8():
+    app = Flask(__name__)
+    provider = json_provider(app, "auto")
+    assert isinstance(provider, OrjsonProvider)
+    assert provider.dumps({"title": "ملاحظة", "id": 1}) == '{"title":"ملاحظة","id":1}'
+    # Types orjson lacks fall back to Flask's conversions
+    assert provider.dumps({"size": Decimal("1.50")}) == '{"size":"1.50"}'
+    with app.app_context():
+        response = provider.response([1, 2])
+        assert response.mimetype == "application/json"
+        assert response.data == b"[1,2]"
+
+
+def test_json_encoder_can_be_forced(monkeypatch):
+    app = Flask(__name__)
+    assert not isinstance(json_provider(app, "json"), OrjsonProvider)
+    monkeypatch.setattr("serialization.ORJSON_AVAILABLE", False)
+    with pytest.raises(RuntimeError):
+        json_provider(app, "orjson")
+
+
+def test_api_notes_use_the_mapping(client, create_note):
+    create_note("first")
+    (note,) = client.get("/api/notes?fields=title,created_at").get_json()
+    assert list(note) == ["title", "created_at"]
+    assert "T" in note["created_at"]
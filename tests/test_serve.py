@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+import serve
+
+
+def test_uvicorn_workers_run_the_asgi_app(monkeypatch):
+    monkeypatch.setattr(serve, "WEB_WORKER_CLASS", "uvicorn")
+    options = serve.server_options()
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert "threads" not in options
+    # The lifespan startup initialises the worker instead
+    assert "post_worker_init" not in options
+
+    from asgi import application
+
+    assert serve.NoteAppServer(options).load() is application
+
+
+def test_uvicorn_keeps_the_events_stream_limit(monkeypatch):
+    monkeypatch.setattr(serve, "WEB_WORKER_CLASS", "uvicorn")
+    monkeypatch.delenv("EVENTS_MAX_STREAMS", raising=False)
+    serve.worker_environment()
+    assert "EVENTS_MAX_STREAMS" not in os.environ
+
+
+def test_gevent_workers_take_connections(monkeypatch):
+    monkeypatch.setattr(serve, "WEB_WORKER_CLASS", "gevent")
+    options = serve.server_options()
+    assert options["worker_class"] == "gevent"
+    assert options["worker_connections"] == serve.WEB_WORKER_CONNECTIONS
+    assert "threads" not in options
+    assert "preload_app" not in options
+
+
+def test_gthread_workers_take_threads(monkeypatch):
+    monkeypatch.setattr(serve, "WEB_WORKER_CLASS", "gthread")
+    options = serve.server_options()
+    assert options["worker_class"] == "gthread"
+    assert options["threads"] == serve.WEB_THREADS
+    assert options["post_worker_init"] is serve.post_worker_init
+
+
+def test_gevent_requires_mysql(monkeypatch):
+    monkeypatch.setattr(serve, "WEB_WORKER_CLASS", "gevent")
+    monkeypatch.setenv("DB_TYPE", "sqlite")
+    with pytest.raises(SystemExit):
+        serve.worker_environment()
+
+
+def test_gevent_runs_the_pure_python_driver(monkeypatch):
+    monkeypatch.setattr(serve, "WEB_WORKER_CLASS", "gevent")
+    monkeypatch.setenv("DB_TYPE", "mysql")
+    monkeypatch.delenv("DB_MYSQL_USE_PURE", raising=False)
+    serve.worker_environment()
+    assert os.environ["DB_MYSQL_USE_PURE"] == "true"
+
+
+def test_gthread_keeps_threads_for_requests(monkeypatch):
+    monkeypatch.setattr(serve, "WEB_WORKER_CLASS", "gthread")
+    monkeypatch.setattr(serve, "WEB_THREADS", 10)
+    monkeypatch.delenv("EVENTS_MAX_STREAMS", raising=False)
+    serve.worker_environment()
+    assert os.environ["EVENTS_MAX_STREAMS"] == "5"
+
+    monkeypatch.setenv("EVENTS_MAX_STREAMS", "8")
+    serve.worker_environment()
+    assert os.environ["EVENTS_MAX_STREAMS"] == "8"
+
+
+def test_init_worker_drops_inherited_connections(client, frontend):
+    pool = frontend.database.current().pool
+    client.get("/api/notes")
+    assert pool.stats()["idle"] > 0
+    frontend.init_worker()
+    assert pool.stats()["idle"] == 0
+    assert client.get("/api/notes").status_code == 200
@@ -0,0 +1,97 @@
+import io
+import json
+import os
+import sqlite3
+
+import pytest
+
+import snapshots
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshots, "MANIFEST_DIR", str(tmp_path / "manifests"))
+    monkeypatch.setattr(snapshots, "store", snapshots.ChunkStore(str(tmp_path / "c")))
+    # One chunk per database page
+    monkeypatch.setattr(snapshots, "SNAPSHOT_CHUNK_SIZE", 4096)
+    return tmp_path
+
+
+def note_titles(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT title FROM notes ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_snapshots_store_only_changed_pages(
+    client, create_note, frontend, snapshot_dir
+):
+    for index in range(100):
+        create_note(f"note {index}", content=f"words {index} " * 200)
+    first = snapshots.create_snapshot(frontend, "sqlite")
+    assert first["new_chunks"] > 0
+
+    create_note("one more")
+    second = snapshots.create_snapshot(frontend, "sqlite")
+    assert 0 < second["new_chunks"] < len(second["chunks"]) / 2
+    assert [m["id"] for m in snapshots.load_manifests()] == [first["id"], second["id"]]
+
+    rebuilt = str(snapshot_dir / "rebuilt.db")
+    snapshots.rebuild(snapshots.load_manifest(second["id"]), rebuilt)
+    assert note_titles(rebuilt)[-1] == "one more"
+    snapshots.rebuild(snapshots.load_manifest(first["id"]), rebuilt)
+    assert "one more" not in note_titles(rebuilt)
+
+
+def test_verify_reports_damaged_and_missing_chunks(
+    client, create_note, frontend, snapshot_dir
+):
+    create_note()
+    manifest = snapshots.create_snapshot(frontend, "sqlite")
+    assert snapshots.verify([manifest]) == {}
+
+    damaged, missing = manifest["chunks"][:2]
+    with open(snapshots.store.path(damaged), "wb") as chunk:
+        chunk.write(b"garbage")
+    snapshots.store.remove(missing)
+    problems = snapshots.verify([manifest])[manifest["id"]]
+    assert any("corrupt" in problem for problem in problems)
+    assert any("missing" in problem for problem in problems)
+    with pytest.raises((ValueError, FileNotFoundError)):
+        snapshots.rebuild(manifest, str(snapshot_dir / "rebuilt.db"))
+
+
+def test_prune_drops_old_snapshots_and_their_unused_chunks(snapshot_dir, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_KEEP", 1)
+    os.makedirs(snapshots.MANIFEST_DIR)
+    for index, data in enumerate((b"old", b"new")):
+        digest, _ = snapshots.store.put(data)
+        manifest = {
+            "id": f"sqlite_2024010{index + 1}_000000",
+            "backend": "sqlite",
+            "created_at": f"2024-01-0{index + 1}T00:00:00",
+            "chunks": [digest],
+        }
+        snapshots.write_manifest(manifest)
+
+    removed, unused = snapshots.prune_snapshots()
+    assert removed == ["sqlite_20240101_000000"]
+    assert unused == 1
+    (kept,) = snapshots.load_manifests()
+    assert snapshots.store.get(kept["chunks"][0]) == b"new"
+
+
+def test_line_chunks_cut_where_the_content_says(monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_MIN_CHUNK", 64)
+    monkeypatch.setattr(snapshots, "SNAPSHOT_LINE_DIVISOR", 4)
+    rows = [json.dumps({"id": index}).encode() + b"\n" for index in range(500)]
+    before = list(snapshots.line_chunks(io.BytesIO(b"".join(rows))))
+    assert b"".join(before) == b"".join(rows)
+
+    rows[250] = b'{"id": 250, "edited": true}\n'
+    after = list(snapshots.line_chunks(io.BytesIO(b"".join(rows))))
+    # Only the chunk around the edited row differs
+    assert len(set(after) - set(before)) == 1
@@ -0,0 +1,73 @@
+import sqlite3
+import time
+
+import pytest
+
+from sqlite_tuning import WalCheckpointer
+
+
+def pragma(conn, name):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def test_connections_are_tuned(frontend):
+    for readonly in (False, True):
+        conn = frontend.get_db_connection(readonly=readonly)
+        try:
+            assert pragma(conn, "journal_mode") == "wal"
+            assert pragma(conn, "synchronous") == 1  # NORMAL
+            assert pragma(conn, "busy_timeout") == frontend.SQLITE_BUSY_TIMEOUT
+        finally:
+            conn.close()
+
+
+def test_read_connections_cannot_write(frontend):
+    conn = frontend.get_db_connection(readonly=True)
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            conn.execute("DELETE FROM notes")
+    finally:
+        conn.close()
+
+
+def test_reads_do_not_wait_for_the_writer(client, create_note, frontend):
+    create_note("committed")
+    writer = frontend.get_db_connection()
+    try:
+        writer.execute(
+            "INSERT INTO notes (title, content, author) VALUES ('pending', 'c', 'amr')"
+        )
+        started = time.monotonic()
+        response = client.get("/api/notes?fields=title")
+        assert time.monotonic() - started < 1
+        assert response.get_json() == [{"title": "committed"}]
+    finally:
+        writer.rollback()
+        writer.close()
+
+
+def test_reads_and_writes_use_separate_pools(client):
+    pools = client.get("/api/stats").get_json()["pools"]
+    assert pools["sqlite"]["max_size"] == 1
+    assert "sqlite_read" in pools
+
+
+def test_checkpoint_reports_the_wal(frontend, create_note):
+    create_note()
+    checkpointer = WalCheckpointer(frontend.database.fallback.pool, interval=0)
+    busy, wal_pages, checkpointed = checkpointer.checkpoint()
+    assert busy == 0
+    assert checkpointed <= wal_pages
+    stats = checkpointer.stats()
+    assert stats["runs"] == 1
+    assert not stats["running"]
+
+
+def test_unknown_checkpoint_mode_is_rejected(frontend):
+    with pytest.raises(ValueError):
+        WalCheckpointer(frontend.database.fallback.pool, mode="SOMETIMES")
@@ -0,0 +1,45 @@
+import json
+
+
+def connections_in_use(client):
+    pools = client.get("/api/stats").get_json()["pools"]
+    return sum(pool["in_use"] for pool in pools.values())
+
+
+def test_ndjson_listing_streams_one_note_per_line(client, create_note, frontend):
+    created = [create_note(f"note {index}") for index in range(5)]
+    frontend.STREAM_BATCH_SIZE, batch_size = 2, frontend.STREAM_BATCH_SIZE
+    try:
+        with client.get("/api/notes?format=ndjson&fields=id,title") as response:
+            lines = response.get_data(as_text=True).splitlines()
+    finally:
+        frontend.STREAM_BATCH_SIZE = batch_size
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["id"] for line in lines] == list(reversed(created))
+
+
+def test_accept_header_selects_ndjson(client, create_note):
+    create_note()
+    headers = {"Accept": "application/x-ndjson"}
+    with client.get("/api/notes", headers=headers) as response:
+        assert response.mimetype == "application/x-ndjson"
+        assert len(response.get_data(as_text=True).splitlines()) == 1
+
+
+def test_stream_flag_sends_a_chunked_json_array(client, create_note):
+    for index in range(3):
+        create_note(f"note {index}")
+    with client.get("/api/notes?stream=1&fields=title") as response:
+        assert response.is_streamed
+        assert response.get_json() == [{"title": f"note {i}"} for i in (2, 1, 0)]
+
+    with client.get("/api/notes?stream=1&after=2000-01-01T00:00:00,1") as empty:
+        assert empty.get_json() == []
+
+
+def test_streamed_response_releases_its_connection(client, create_note):
+    create_note()
+    in_use = connections_in_use(client)
+    with client.get("/api/notes?format=ndjson") as response:
+        response.get_data()
+    assert connections_in_use(client) == in_use
@@ -0,0 +1,79 @@
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+
+from tracing import RequestTracer, TracingMiddleware, redact_params
+
+
+@pytest.fixture
+def traced(frontend, monkeypatch):
+    """Client for the app with every request traced; yields the records"""
+    tracer = RequestTracer(sample_rate=1)
+    records = []
+    monkeypatch.setattr(tracer, "emit", records.append)
+    monkeypatch.setattr(frontend, "tracer", tracer)
+    for backend in (frontend.database.primary, frontend.database.fallback):
+        if backend is not None:
+            for pool in backend.pools().values():
+                monkeypatch.setattr(pool, "observers", pool.observers + (tracer,))
+    client = Client(TracingMiddleware(frontend.app.wsgi_app, tracer), Response)
+    return client, records
+
+
+def test_traced_request_lists_its_spans(client, create_note, traced):
+    create_note()
+    app_client, records = traced
+    response = app_client.get("/api/notes?limit=5")
+    response.close()
+
+    (record,) = records
+    assert record["type"] == "trace"
+    assert record["trace_id"] == response.headers["X-Trace-Id"]
+    assert record["route"] == "/api/notes"
+    assert record["status"] == 200
+    assert record["bytes"] == len(response.data)
+    names = [span["name"] for span in record["spans"]]
+    assert {"connect", "query", "serialize", "jsonify"} <= set(names)
+    assert set(record["phases_ms"]) == set(names)
+
+
+def test_streamed_request_is_traced_until_closed(client, create_note, traced):
+    create_note()
+    app_client, records = traced
+    response = app_client.get("/api/notes?format=ndjson")
+    assert records == []
+    response.close()
+    assert records[0]["bytes"] == len(response.data)
+
+
+def test_slow_query_log_redacts_parameters():
+    tracer = RequestTracer(slow_query_ms=5)
+    records = []
+    tracer.emit = records.append
+    tracer.query(
+        "sqlite", "SELECT  *\n FROM notes WHERE title = ?", ("x",), 0.001, 1, None
+    )
+    tracer.query(
+        "sqlite", "SELECT * FROM notes WHERE title = ?", ("secret",), 0.01, 1, None
+    )
+    (record,) = records
+    assert record["type"] == "slow_query"
+    assert record["sql"] == "SELECT * FROM notes WHERE title = ?"
+    assert record["params"] == ["<str:6>"]
+    assert "trace_id" not in record
+
+
+def test_redaction_keeps_only_types_and_sizes():
+    assert redact_params([("title", 5, None)]) == {
+        "rows": 1,
+        "first": ["<str:5>", "<int>", None],
+    }
+    assert redact_params({"q": b"abc"}) == {"q": "<bytes:3>"}
+    assert redact_params(row for row in ()) == "<generator>"
+
+
+def test_unsampled_requests_carry_no_trace_id(client, frontend):
+    tracer = RequestTracer(sample_rate=0, slow_query_ms=1000)
+    app_client = Client(TracingMiddleware(frontend.app.wsgi_app, tracer), Response)
+    response = app_client.get("/api/notes")
+    assert "X-Trace-Id" not in response.headers
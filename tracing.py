@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Per-request tracing and a slow-query log, written as JSON lines
+
+A traced request produces one ``{"type": "trace", ...}`` record listing
+its spans (connection checkout, every statement, and whatever the app
+wraps in ``tracer.span()``) with per-phase totals. Independently, every
+statement slower than the threshold produces a ``{"type": "slow_query",
+...}`` record. Parameter values are never written, only their types and
+sizes.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from db_pool import statement_type
+from metrics import ROUTE_KEY, MeteredBody
+
+MAX_SQL_LENGTH = 2000
+
+# The request being traced. A context variable rather than a thread-local,
+# so it follows a request that asgi.py moves between threads
+current_trace = ContextVar("current_trace", default=None)
+
+
+def redact(value):
+    """A value's type and size, standing in for the value itself"""
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    return f"<{type(value).__name__}>"
+
+
+def redact_params(params):
+    """Redacted parameters; for executemany the first row and the row count"""
+    if params is None:
+        return None
+    if isinstance(params, (list, tuple)) and params:
+        if isinstance(params[0], (list, tuple, dict)):
+            return {"rows": len(params), "first": redact(params[0])}
+    if isinstance(params, (list, tuple, dict)):
+        return redact(params)
+    # A generator handed to executemany: don't consume it
+    return f"<{type(params).__name__}>"
+
+
+def compact_sql(sql):
+    sql = re.sub(r"\s+", " ", sql).strip()
+    if len(sql) > MAX_SQL_LENGTH:
+        sql = sql[:MAX_SQL_LENGTH] + "..."
+    return sql
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 3)
+
+
+class Trace:
+    """Spans of one request"""
+
+    def __init__(self, environ, sampled, max_spans):
+        self.id = uuid.uuid4().hex[:16]
+        self.environ = environ
+        self.sampled = sampled
+        self.max_spans = max_spans
+        self.started = time.perf_counter()
+        self.spans = []
+        self.phases = {}
+        self.dropped = 0
+
+    @property
+    def route(self):
+        return self.environ.get(ROUTE_KEY) or "unmatched"
+
+    def add(self, name, seconds, **attrs):
+        self.phases[name] = self.phases.get(name, 0.0) + (seconds or 0.0)
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return
+        span = {
+            "name": name,
+            "end_ms": milliseconds(time.perf_counter() - self.started),
+        }
+        if seconds is not None:
+            span["duration_ms"] = milliseconds(seconds)
+        span.update(attrs)
+        self.spans.append(span)
+
+    def span(self, name, attrs):
+        return Span(self, name, attrs)
+
+
+class Span:
+    """Times a ``with`` block into its trace"""
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        attrs = dict(self.attrs)
+        if exc is not None:
+            attrs["error"] = str(exc)
+        self.trace.add(self.name, time.perf_counter() - self.started, **attrs)
+
+
+class RequestTracer:
+    """Collects traces and slow queries; also a connection pool observer
+
+    ``sample_rate`` is the fraction of requests traced (0 disables
+    tracing); statements taking at least ``slow_query_ms`` are logged
+    (0 disables the slow-query log). Records go to ``path``, or to stderr
+    when it is empty.
+    """
+
+    def __init__(self, sample_rate=0.0, slow_query_ms=0.0, path="", max_spans=200):
+        self.sample_rate = sample_rate
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.max_spans = max_spans
+
+        self.logger = logging.getLogger("noteapp.trace")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if self.enabled and not self.logger.handlers:
+            handler = (
+                logging.FileHandler(path, encoding="utf-8")
+                if path
+                else logging.StreamHandler(sys.stderr)
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or self.slow_query_seconds > 0
+
+    def emit(self, record):
+        record = dict(
+            {
+                "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "pid": os.getpid(),
+            },
+            **record,
+        )
+        self.logger.info(json.dumps(record, default=str))
+
+    @property
+    def current(self):
+        return current_trace.get()
+
+    def begin(self, environ):
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        trace = Trace(environ, sampled, self.max_spans)
+        current_trace.set(trace)
+        return trace
+
+    def end(self, trace, status, size):
+        if current_trace.get() is trace:
+            current_trace.set(None)
+        if not trace.sampled:
+            return
+        record = {
+            "type": "trace",
+            "trace_id": trace.id,
+            "method": trace.environ.get("REQUEST_METHOD"),
+            "route": trace.route,
+            "path": trace.environ.get("PATH_INFO"),
+            "status": status,
+            "bytes": size,
+            "duration_ms": milliseconds(time.perf_counter() - trace.started),
+            "phases_ms": {
+                name: milliseconds(seconds) for name, seconds in trace.phases.items()
+            },
+            "spans": trace.spans,
+        }
+        if trace.dropped:
+            record["dropped_spans"] = trace.dropped
+        self.emit(record)
+
+    def span(self, name, **attrs):
+        """Context manager timing a phase of the current traced request"""
+        trace = self.current
+        if trace is None or not trace.sampled:
+            return nullcontext()
+        return trace.span(name, attrs)
+
+    # Connection pool observer
+    def connection_acquired(self, pool, db_type, seconds):
+        trace = self.current
+        if trace is not None and trace.sampled:
+            trace.add("connect", seconds, pool=pool)
+
+    def connection_failed(self, pool, db_type, error):
+        trace = self.current
+        if trace is not None and trace.sampled:
+            trace.add("connect", None, pool=pool, error=str(error))
+
+    def query(self, db_type, sql, params, seconds, rows, error):
+        trace = self.current
+        if trace is not None and trace.sampled:
+            attrs = {"statement": statement_type(sql), "rows": rows}
+            if error is not None:
+                attrs["error"] = str(error)
+            trace.add("query", seconds, **attrs)
+        if self.slow_query_seconds and seconds >= self.slow_query_seconds:
+            record = {
+                "type": "slow_query",
+                "backend": db_type,
+                "duration_ms": milliseconds(seconds),
+                "rows": rows,
+                "sql": compact_sql(sql),
+                "params": redact_params(params),
+            }
+            if error is not None:
+                record["error"] = str(error)
+            if trace is not None:
+                record.update(trace_id=trace.id, route=trace.route)
+            self.emit(record)
+
+
+class TracingMiddleware:
+    """WSGI middleware opening a trace per request, closed with the body"""
+
+    def __init__(self, app, tracer):
+        self.app = app
+        self.tracer = tracer
+
+    def __call__(self, environ, start_response):
+        trace = self.tracer.begin(environ)
+        status = [500]
+
+        def recording_start_response(status_line, headers, exc_info=None):
+            status[0] = int(status_line.split(" ", 1)[0])
+            if trace.sampled:
+                headers.append(("X-Trace-Id", trace.id))
+            return start_response(status_line, headers, exc_info)
+
+        try:
+            body = self.app(environ, recording_start_response)
+        except Exception:
+            self.tracer.end(trace, 500, 0)
+            raise
+        return MeteredBody(body, lambda size: self.tracer.end(trace, status[0], size))
@@ -9,4 +9,4 @@ while [ ! -f "/shared/notes.db" ]; do
 done
 
 echo "Database is ready! Starting Flask app..."
-python frontend.py 
\ No newline at end of file
+python serve.py 
\ No newline at end of file